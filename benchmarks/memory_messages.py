@@ -0,0 +1,53 @@
+"""
+Compares the memory used by 10k conversation messages stored as dicts and in a Conversation, before and
+after its history was serialized with `to_json`, which caches the JSON of every message.
+
+Run with `python -m benchmarks.memory_messages` from the repository root.
+"""
+import tracemalloc
+
+from openai_functools.utils.conversation import Conversation, Message
+
+MESSAGE_COUNT = 10_000
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return after - before
+
+
+def build_message_dicts():
+    return [
+        {"role": "assistant", "content": contents[i], "name": "weather_bot"}
+        for i in range(MESSAGE_COUNT)
+    ]
+
+
+def build_conversation(serialize: bool = False):
+    conversation = Conversation()
+    for i in range(MESSAGE_COUNT):
+        conversation.append(Message("assistant", contents[i], "weather_bot"))
+    if serialize:
+        conversation.to_json()
+        # only the JSON cached per message is kept, not the one of the whole history
+        conversation._json = None
+    return conversation
+
+
+# the contents are created up front, so only the containers are measured
+contents = [f"The weather in location {i} is sunny." for i in range(MESSAGE_COUNT)]
+
+
+if __name__ == "__main__":
+    dict_bytes = measure(build_message_dicts)
+    message_bytes = measure(build_conversation)
+    serialized_bytes = measure(lambda: build_conversation(serialize=True))
+    print(f"{MESSAGE_COUNT} messages as dicts:              {dict_bytes / 1024:8.1f} KiB")
+    print(f"{MESSAGE_COUNT} messages in a Conversation:     {message_bytes / 1024:8.1f} KiB")
+    print(f"{MESSAGE_COUNT} messages after to_json():       {serialized_bytes / 1024:8.1f} KiB")
+    print(f"reduction:                             {1 - message_bytes / dict_bytes:8.1%}")
@@ -0,0 +1,314 @@
+"""
+Offline benchmarks for metadata generation, registration, descriptions and dispatch.
+
+Run with `python -m benchmarks.run` from the repository root. Use `--output` to save the results as
+JSON and `--compare` to compare them with saved results; the run fails if a benchmark got slower than
+the allowed threshold.
+"""
+import argparse
+import enum
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest.mock import MagicMock
+
+from openai_functools import (
+    FunctionsOrchestrator,
+    SchemaCache,
+    extract_openai_function_metadata,
+    invalidate_metadata_cache,
+)
+from openai_functools.openai_types import clear_type_schema_cache
+
+FUNCTION_TEMPLATE = '''
+def {name}(location: str, days: int = 1, unit: str = "celsius", detailed: bool = False):
+    """
+    Get the weather forecast number {index}.
+
+    :param location: The city and state, e.g. San Francisco, CA.
+    :param days: The number of days to forecast.
+    :param unit: The unit of the temperatures.
+    :param detailed: Whether to include hourly details.
+    """
+    return location
+'''
+
+
+ANNOTATED_FUNCTION_TEMPLATE = '''
+def {name}(self, address: Address, unit: Unit = Unit.CELSIUS, hours: Optional[List[int]] = None):
+    """
+    Get the weather forecast number {index}.
+
+    :param address: The address to forecast.
+    :param unit: The unit of the temperatures.
+    :param hours: The hours of the day to include.
+    """
+    return address
+'''
+
+
+class Unit(enum.Enum):
+    CELSIUS = "celsius"
+    FAHRENHEIT = "fahrenheit"
+
+
+@dataclass
+class Address:
+    street: str
+    city: str
+    zip_code: Optional[str] = None
+
+
+def make_functions(count: int, prefix: str = "get_weather") -> List[Callable]:
+    namespace: Dict[str, Callable] = {}
+    for index in range(count):
+        exec(FUNCTION_TEMPLATE.format(name=f"{prefix}_{index}", index=index), namespace)
+    return [namespace[f"{prefix}_{index}"] for index in range(count)]
+
+
+def make_class(method_count: int) -> type:
+    methods = {function.__name__: function for function in make_functions(method_count)}
+    # methods need a self parameter, which the generated functions use as location
+    return type("LargeService", (), methods)
+
+
+def make_annotated_class(method_count: int) -> type:
+    namespace: Dict[str, object] = {"Address": Address, "Unit": Unit, "List": List, "Optional": Optional}
+    for index in range(method_count):
+        exec(ANNOTATED_FUNCTION_TEMPLATE.format(name=f"forecast_{index}", index=index), namespace)
+    methods = {f"forecast_{index}": namespace[f"forecast_{index}"] for index in range(method_count)}
+    return type("AnnotatedService", (), methods)
+
+
+def make_tool_calls_response(tool_calls: List[Tuple[str, str, str]]) -> MagicMock:
+    mock_response = MagicMock()
+    mock_response.choices[0].message.function_call = None
+    mock_tool_calls = []
+    for tool_call_id, name, arguments in tool_calls:
+        mock_tool_call = MagicMock()
+        mock_tool_call.id = tool_call_id
+        mock_tool_call.function.name = name
+        mock_tool_call.function.arguments = arguments
+        mock_tool_calls.append(mock_tool_call)
+    mock_response.choices[0].message.tool_calls = mock_tool_calls
+    return mock_response
+
+
+def measure(
+    function: Callable[[], object], setup: Callable[[], object] = lambda: None, repeat: int = 7, number: int = 1
+) -> Dict[str, float]:
+    """Returns the minimum and median seconds per call of `function` over `repeat` runs of `number` calls."""
+    timings = []
+    for _ in range(repeat):
+        setup()
+        started_at = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started_at) / number)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def bench_metadata() -> Dict[str, Dict[str, float]]:
+    functions = make_functions(100, prefix="metadata")
+
+    def extract_all():
+        for function in functions:
+            extract_openai_function_metadata(function)
+
+    return {
+        "extract_metadata/100 functions/uncached": measure(
+            extract_all, setup=invalidate_metadata_cache
+        ),
+        "extract_metadata/100 functions/cached": measure(extract_all, number=100),
+    }
+
+
+def bench_registration() -> Dict[str, Dict[str, float]]:
+    large_class = make_class(500)
+    instance = large_class()
+
+    def register(lazy: bool) -> Callable[[], object]:
+        return lambda: FunctionsOrchestrator(lazy=lazy).register_instance(instance)
+
+    return {
+        "register_instance/500 methods/uncached": measure(
+            register(False), setup=invalidate_metadata_cache
+        ),
+        "register_instance/500 methods/cached": measure(register(False)),
+        "register_instance/500 methods/lazy": measure(register(True)),
+    }
+
+
+def bench_cached_cold_start() -> Dict[str, Dict[str, float]]:
+    instance = make_annotated_class(500)()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "schemas.json")
+    schema_cache = SchemaCache(path, autosave=False)
+    FunctionsOrchestrator(schema_cache=schema_cache).register_instance(instance)
+    schema_cache.save()
+
+    def cold_start():
+        # a new process: nothing is cached in memory, but the cache file exists
+        invalidate_metadata_cache()
+        clear_type_schema_cache()
+
+    def register(path: Optional[str]) -> Callable[[], object]:
+        def run():
+            schema_cache = SchemaCache(path, autosave=False) if path else None
+            FunctionsOrchestrator(schema_cache=schema_cache).register_instance(instance)
+
+        return run
+
+    results = {
+        "cold_start/500 annotated methods/uncached": measure(register(None), setup=cold_start),
+        "cold_start/500 annotated methods/schema cache": measure(register(path), setup=cold_start),
+    }
+    os.remove(path)
+    os.rmdir(directory)
+    return results
+
+
+def bench_bulk_registration() -> Dict[str, Dict[str, float]]:
+    classes = [type(f"Service{index}", (make_class(20),), {}) for index in range(5)]
+    few = [service_class() for service_class in classes]
+    many = [service_class() for service_class in classes for _ in range(100)]
+
+    def register(instances: List[object]) -> Callable[[], object]:
+        return lambda: FunctionsOrchestrator().register_instances_all(instances)
+
+    return {
+        "register_instances_all/5 instances/uncached": measure(
+            register(few), setup=invalidate_metadata_cache
+        ),
+        "register_instances_all/500 instances of 5 classes/uncached": measure(
+            register(many), setup=invalidate_metadata_cache
+        ),
+    }
+
+
+def bench_descriptions() -> Dict[str, Dict[str, float]]:
+    results = {}
+    for count in (10, 100, 1000):
+        orchestrator = FunctionsOrchestrator(functions=make_functions(count, prefix=f"tools{count}"))
+        selected = [spec.name for spec in list(orchestrator.function_specs)[::10]]
+
+        def rebuild(orchestrator=orchestrator):
+            orchestrator._version += 1
+
+        results[f"create_tools_descriptions/{count} tools/rebuild"] = measure(
+            orchestrator.create_tools_descriptions, setup=rebuild
+        )
+        results[f"create_tools_descriptions/{count} tools/cached"] = measure(
+            orchestrator.create_tools_descriptions, number=100
+        )
+        results[f"create_tools_descriptions/{count} tools/10% selected"] = measure(
+            lambda: orchestrator.create_tools_descriptions(selected), number=100
+        )
+    return results
+
+
+def bench_dispatch() -> Dict[str, Dict[str, float]]:
+    functions = make_functions(8, prefix="dispatch")
+    results = {}
+    for count in (8, 64):
+        response = make_tool_calls_response(
+            [
+                (f"call_{index}", functions[index % 8].__name__, '{"location": "Boston", "days": 3}')
+                for index in range(count)
+            ]
+        )
+        with FunctionsOrchestrator(functions=functions, max_workers=8) as orchestrator:
+            results[f"call_function/{count} tool calls/sequential"] = measure(
+                lambda: orchestrator.call_function(response), number=10
+            )
+            results[f"call_function/{count} tool calls/concurrent"] = measure(
+                lambda: orchestrator.call_function(response, concurrent=True), number=10
+            )
+    return results
+
+
+def bench_tool_selection() -> Dict[str, Dict[str, float]]:
+    orchestrator = FunctionsOrchestrator(functions=make_functions(1000, prefix="select"))
+    query = "What is the weather forecast for the next 3 days in Boston in celsius?"
+    return {
+        "select_tools/1000 tools/build index": measure(
+            lambda: orchestrator.tool_index, setup=lambda: setattr(orchestrator, "_tool_index", None)
+        ),
+        "select_tools/1000 tools/top 10": measure(
+            lambda: orchestrator.select_tools(query, top_k=10), number=100
+        ),
+    }
+
+
+BENCHMARKS = (
+    bench_metadata,
+    bench_registration,
+    bench_cached_cold_start,
+    bench_bulk_registration,
+    bench_descriptions,
+    bench_dispatch,
+    bench_tool_selection,
+)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Returns the names of the benchmarks whose minimum time grew by more than `threshold` over the baseline."""
+    regressions = []
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+        ratio = timing["min"] / baseline[name]["min"]
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:60} {ratio:6.2f}x {marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="save the results as JSON to this path")
+    parser.add_argument("--compare", help="compare with results saved by a previous run")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown before a regression is flagged"
+    )
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for benchmark in BENCHMARKS:
+        for name, timing in benchmark().items():
+            if args.filter in name:
+                results[name] = timing
+                print(f"{name:60} {timing['min'] * 1e6:12.1f} us  (median {timing['median'] * 1e6:.1f} us)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        print()
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import json
+import os
+
+from openai import OpenAI
+
+client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+
+from openai_functools import ConversationRunner, FunctionsOrchestrator
+from openai_functools.utils.conversation import Conversation
+
+
+def get_current_weather(location, unit="fahrenheit"):
+    """Get the current weather in a given location"""
+    weather_info = {
+        "location": location,
+        "temperature": "72",
+        "unit": unit,
+        "forecast": ["sunny", "windy"],
+    }
+    return json.dumps(weather_info)
+
+
+def get_weather_next_day(location, unit="fahrenheit"):
+    """Get the weather forecast for the next day in a given location"""
+    weather_info = {
+        "location": location,
+        "temperature": "65",
+        "unit": unit,
+        "forecast": ["cloudy"],
+    }
+    return json.dumps(weather_info)
+
+
+orchestrator = FunctionsOrchestrator()
+orchestrator.register_all([get_current_weather, get_weather_next_day])
+
+
+if __name__ == "__main__":
+    runner = ConversationRunner(
+        orchestrator, client, model="gpt-3.5-turbo-1106", max_iterations=5
+    )
+    conversation = Conversation()
+    conversation.add_message(
+        "user", "What's the weather like in Boston today, and tomorrow in Tokyo?"
+    )
+    # Calls the model and the requested functions until the model answers
+    runner.run(conversation)
+    conversation.display_conversation()
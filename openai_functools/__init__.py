@@ -1,10 +1,39 @@
+from .argument_validator import ArgumentValidator, InvalidArgumentsError
 from .function_spec import FunctionSpec
 from .functions_orchestrator import FunctionsOrchestrator
-from .metadata_generator import extract_openai_function_metadata, openai_function
+from .instrumentation import (
+    HistogramCollector,
+    Instrumentation,
+    OpenTelemetryInstrumentation,
+    ToolCallEvent,
+)
+from .metadata_generator import (
+    extract_openai_function_metadata,
+    invalidate_metadata_cache,
+    openai_function,
+)
+from .result_cache import InMemoryResultCacheBackend, ResultCache, ResultCacheBackend
+from .runner import ConversationRunner, MaxIterationsExceededError
+from .schema_cache import SchemaCache
+from .streaming import ToolCallStreamAccumulator
 
 __all__ = [
     "openai_function",
     "extract_openai_function_metadata",
+    "invalidate_metadata_cache",
     "FunctionsOrchestrator",
     "FunctionSpec",
+    "ArgumentValidator",
+    "InvalidArgumentsError",
+    "ResultCache",
+    "ResultCacheBackend",
+    "InMemoryResultCacheBackend",
+    "SchemaCache",
+    "ConversationRunner",
+    "MaxIterationsExceededError",
+    "ToolCallStreamAccumulator",
+    "Instrumentation",
+    "ToolCallEvent",
+    "HistogramCollector",
+    "OpenTelemetryInstrumentation",
 ]
@@ -0,0 +1,390 @@
+"""Validation of the arguments of tool calls against the generated function metadata."""
+import collections.abc
+import dataclasses
+import enum
+import inspect
+import threading
+import types
+import typing
+from typing import Any, Callable, Dict, Mapping, Optional, Union
+
+from openai_functools.metadata_generator import get_signature
+from openai_functools.utils.frozen import thaw
+
+
+class InvalidArgumentsError(ValueError):
+    """Raised when the arguments of a function call do not match the function's parameters."""
+
+
+_MISSING = object()
+
+
+def _coerce_string(value: Any) -> Any:
+    if isinstance(value, str):
+        return value
+    return _MISSING
+
+
+def _coerce_integer(value: Any) -> Any:
+    if isinstance(value, bool):
+        return _MISSING
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return _MISSING
+    return _MISSING
+
+
+def _coerce_number(value: Any) -> Any:
+    if isinstance(value, bool):
+        return _MISSING
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return _MISSING
+    return _MISSING
+
+
+def _coerce_boolean(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return _MISSING
+
+
+def _coerce_array(value: Any) -> Any:
+    return value if isinstance(value, list) else _MISSING
+
+
+def _coerce_object(value: Any) -> Any:
+    return value if isinstance(value, dict) else _MISSING
+
+
+def _coerce_null(value: Any) -> Any:
+    return value if value is None else _MISSING
+
+
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+    "array": _coerce_array,
+    "object": _coerce_object,
+    "null": _coerce_null,
+}
+
+
+def _get_coercer(schema_type: Any) -> Optional[Callable[[Any], Any]]:
+    if not isinstance(schema_type, list):
+        return _COERCERS.get(schema_type)
+
+    # a union of types, e.g. ["string", "null"] for Optional[str]: values of any of the types are kept as
+    # they are, otherwise the first successful coercion is used
+    coercers = [_COERCERS[name] for name in schema_type if name in _COERCERS]
+    if len(coercers) < len(schema_type):
+        return None
+
+    def coerce(value: Any) -> Any:
+        for coercer in coercers:
+            if coercer(value) is value:
+                return value
+        for coercer in coercers:
+            coerced = coercer(value)
+            if coerced is not _MISSING:
+                return coerced
+        return _MISSING
+
+    return coerce
+
+
+def _get_signature_parameters(function: Callable) -> Mapping[str, inspect.Parameter]:
+    try:
+        return get_signature(function).parameters
+    except (TypeError, ValueError):
+        # no signature, e.g. some builtins
+        return {}
+
+
+def _get_parameter_converter(parameter: Optional[inspect.Parameter]) -> Optional[Callable[[Any], Any]]:
+    if parameter is None or parameter.annotation is inspect.Parameter.empty or isinstance(parameter.annotation, str):
+        return None
+    return get_converter(parameter.annotation)
+
+
+_ARRAY_ORIGINS = (
+    list,
+    collections.abc.Sequence,
+    collections.abc.MutableSequence,
+    collections.abc.Iterable,
+)
+_SET_ORIGINS = (set, frozenset, collections.abc.Set, collections.abc.MutableSet)
+_MAPPING_ORIGINS = (dict, collections.abc.Mapping, collections.abc.MutableMapping)
+_UNION_ORIGINS = (Union, types.UnionType) if hasattr(types, "UnionType") else (Union,)
+
+# the converters of annotations, None if their values are used as decoded
+_converters: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+_converters_lock = threading.Lock()
+
+
+def get_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Returns a function that rebuilds the value of an annotated type from its decoded JSON.
+
+    Enums are rebuilt from their values, dataclasses and pydantic models from objects, also inside
+    lists, sets, dicts, tuples and unions.
+
+    Args:
+        annotation (Any): The annotation of a parameter.
+
+    Returns:
+        Optional[Callable[[Any], Any]]: The converter, None if decoded values are used as they are.
+    """
+    try:
+        return _converters[annotation]
+    except KeyError:
+        pass
+    except TypeError:
+        # unhashable, e.g. Annotated with unhashable metadata
+        return _build_converter(annotation)
+    with _converters_lock:
+        # a placeholder, so recursive dataclasses look up their own converter when they are called
+        _converters.setdefault(annotation, None)
+    converter = _converters[annotation] = _build_converter(annotation)
+    return converter
+
+
+def _build_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is not None and hasattr(typing, "Annotated") and origin is typing.Annotated:
+        return get_converter(args[0])
+    if origin in _UNION_ORIGINS:
+        return _build_union_converter(args)
+    if origin in _ARRAY_ORIGINS or origin in _SET_ORIGINS:
+        if not args or get_converter(args[0]) is None:
+            return None
+        container = set if origin in _SET_ORIGINS else list
+        return lambda value: (
+            container(get_converter(args[0])(item) for item in value) if isinstance(value, list) else value
+        )
+    if origin is tuple:
+        return _build_tuple_converter(args)
+    if origin in _MAPPING_ORIGINS:
+        if len(args) != 2 or get_converter(args[1]) is None:
+            return None
+        return lambda value: (
+            {key: get_converter(args[1])(item) for key, item in value.items()} if isinstance(value, dict) else value
+        )
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, enum.Enum):
+        return lambda value: value if isinstance(value, annotation) else annotation(value)
+    if dataclasses.is_dataclass(annotation):
+        return _build_dataclass_converter(annotation)
+    if hasattr(annotation, "model_validate"):
+        return lambda value: annotation.model_validate(value) if isinstance(value, dict) else value
+    if hasattr(annotation, "__fields__") and hasattr(annotation, "parse_obj"):
+        return lambda value: annotation.parse_obj(value) if isinstance(value, dict) else value
+    return None
+
+
+def _build_union_converter(args: Any) -> Optional[Callable[[Any], Any]]:
+    converters = [get_converter(arg) for arg in args if arg is not type(None)]
+    if all(converter is None for converter in converters):
+        return None
+
+    def convert(value: Any) -> Any:
+        if value is None:
+            return value
+        for converter in converters:
+            if converter is not None:
+                try:
+                    return converter(value)
+                except (TypeError, ValueError):
+                    continue
+        return value
+
+    return convert
+
+
+def _build_tuple_converter(args: Any) -> Optional[Callable[[Any], Any]]:
+    if len(args) == 2 and args[1] is Ellipsis:
+        if get_converter(args[0]) is None:
+            return None
+        return lambda value: (
+            tuple(get_converter(args[0])(item) for item in value) if isinstance(value, list) else value
+        )
+    if all(get_converter(arg) is None for arg in args):
+        return None
+    return lambda value: (
+        tuple(
+            item if get_converter(arg) is None else get_converter(arg)(item) for arg, item in zip(args, value)
+        )
+        if isinstance(value, list)
+        else value
+    )
+
+
+def _build_dataclass_converter(dataclass: type) -> Callable[[Any], Any]:
+    try:
+        hints = typing.get_type_hints(dataclass)
+    except Exception:
+        # forward references that cannot be resolved, e.g. to classes local to a function
+        hints = dict(getattr(dataclass, "__annotations__", {}))
+    fields = {field.name: hints.get(field.name, Any) for field in dataclasses.fields(dataclass) if field.init}
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        arguments = {}
+        for name, item in value.items():
+            converter = get_converter(fields[name]) if name in fields else None
+            arguments[name] = item if converter is None else converter(item)
+        return dataclass(**arguments)
+
+    return convert
+
+
+class ArgumentValidator:
+    """
+    Validates and coerces decoded tool call arguments against a function's parameters schema.
+
+    The schema is compiled once into a checker per property, so validating a call only does the
+    work its arguments need. If the function is given, the types of its parameters without annotation
+    are not checked, as their schema type is only a placeholder, values of Enums, dataclasses and
+    pydantic models are rebuilt from their JSON, see `get_converter`, and `*args` and `**kwargs` are
+    optional, with unknown arguments passed to `**kwargs`.
+    """
+
+    def __init__(self, parameters: Dict[str, Any], function: Optional[Callable] = None) -> None:
+        """
+        Compiles the validator for a parameters schema.
+
+        Args:
+            parameters (Dict[str, Any]): The "parameters" object of the function metadata.
+            function (Optional[Callable]): The function the parameters were generated from.
+        """
+        signature_parameters = _get_signature_parameters(function) if function is not None else {}
+        # *args and **kwargs are listed in the schema, but are not arguments of their own
+        variadic = {
+            name
+            for name, parameter in signature_parameters.items()
+            if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        }
+        self._accepts_any = any(
+            parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in signature_parameters.values()
+        )
+        properties = {
+            name: schema for name, schema in parameters.get("properties", {}).items() if name not in variadic
+        }
+        self._required = tuple(name for name in parameters.get("required", ()) if name not in variadic)
+        self._checkers = {
+            name: self._compile_property(name, schema, signature_parameters.get(name))
+            for name, schema in properties.items()
+        }
+        self._defaults = {
+            name: schema["default"]
+            for name, schema in properties.items()
+            if "default" in schema and name not in self._required
+        }
+        # schema defaults are JSON, e.g. the value of an Enum, and are rebuilt like arguments
+        self._converters = {
+            name: converter
+            for name, converter in (
+                (name, _get_parameter_converter(signature_parameters.get(name))) for name in self._defaults
+            )
+            if converter is not None
+        }
+
+    def __call__(self, arguments: Any) -> Dict[str, Any]:
+        """
+        Validates and coerces the arguments of a call.
+
+        Args:
+            arguments (Any): The decoded arguments of the call.
+
+        Returns:
+            Dict[str, Any]: The arguments to call the function with, including defaults.
+        """
+        if not isinstance(arguments, dict):
+            raise InvalidArgumentsError(
+                f"Expected the arguments to be an object, got {type(arguments).__name__}."
+            )
+
+        missing = [name for name in self._required if name not in arguments]
+        if missing:
+            raise InvalidArgumentsError(f"Missing required arguments {missing}.")
+
+        checkers = self._checkers
+        validated = {}
+        for name, value in arguments.items():
+            checker = checkers.get(name)
+            if checker is not None:
+                validated[name] = checker(value)
+            elif self._accepts_any:
+                # collected by the **kwargs of the function
+                validated[name] = value
+            else:
+                raise InvalidArgumentsError(f'Unexpected argument "{name}".')
+
+        for name, default in self._defaults.items():
+            if name not in validated:
+                converter = self._converters.get(name)
+                validated[name] = thaw(default) if converter is None else converter(thaw(default))
+        return validated
+
+    @staticmethod
+    def _compile_property(
+        name: str, schema: Dict[str, Any], parameter: Optional[inspect.Parameter] = None
+    ) -> Callable[[Any], Any]:
+        # string annotations that could not be resolved are not checked either
+        annotated = parameter is None or (
+            parameter.annotation is not inspect.Parameter.empty and not isinstance(parameter.annotation, str)
+        )
+        coerce: Optional[Callable[[Any], Any]] = _get_coercer(schema.get("type")) if annotated else None
+        convert = _get_parameter_converter(parameter)
+        enum = schema.get("enum")
+        if enum is not None:
+            try:
+                allowed = frozenset(enum)
+            except TypeError:
+                allowed = list(enum)
+
+        def check(value: Any) -> Any:
+            if coerce is not None:
+                coerced = coerce(value)
+                if coerced is _MISSING:
+                    raise InvalidArgumentsError(
+                        f'Argument "{name}" should be of type "{schema["type"]}", got {value!r}.'
+                    )
+                value = coerced
+            if enum is not None:
+                try:
+                    is_allowed = value in allowed
+                except TypeError:
+                    is_allowed = False
+                if not is_allowed:
+                    raise InvalidArgumentsError(
+                        f'Argument "{name}" should be one of {list(enum)}, got {value!r}.'
+                    )
+            if convert is not None:
+                try:
+                    value = convert(value)
+                except (TypeError, ValueError) as error:
+                    type_name = getattr(parameter.annotation, "__name__", repr(parameter.annotation))
+                    raise InvalidArgumentsError(
+                        f'Argument "{name}" is not a valid {type_name}: {error}'
+                    ) from error
+            return value
+
+        return check
@@ -1,13 +1,138 @@
-from dataclasses import dataclass
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from openai_functools.argument_validator import ArgumentValidator
+from openai_functools.metadata_generator import extract_openai_function_metadata
+from openai_functools.process_pool import FunctionReference, function_reference
+from openai_functools.schema_cache import SchemaCache
+
+
+EXECUTION_POLICIES: Tuple[str, ...] = ("inline", "thread", "process")
 
 
-@dataclass
 class FunctionSpec:
-    func_name: str
-    func_ref: Callable
-    parameters: Dict[str, Any]
+    """
+    The specification of a registered function.
+
+    The metadata of the function is generated the first time `parameters` is accessed, unless it is
+    passed in. Specifications are stored with __slots__ to keep large registries small.
+
+    The execution policy determines where the function runs when it is called concurrently: "inline" in the
+    calling thread (or event loop), "thread" on the orchestrator's thread pool, or "process" on its process
+    pool, which is also used for sequential calls.
+    """
+
+    __slots__ = (
+        "func_name",
+        "func_ref",
+        "_parameters",
+        "is_coroutine",
+        "argument_validator",
+        "schema_cache",
+        "_execution",
+        "process_reference",
+        "on_change",
+    )
+
+    def __init__(
+        self,
+        func_name: str,
+        func_ref: Callable,
+        parameters: Optional[Dict[str, Any]] = None,
+        is_coroutine: bool = False,
+        argument_validator: Optional[ArgumentValidator] = None,
+        schema_cache: Optional[SchemaCache] = None,
+        execution: str = "thread",
+    ) -> None:
+        self.func_name = func_name
+        self.func_ref = func_ref
+        self._parameters = parameters
+        self.is_coroutine = is_coroutine
+        self.argument_validator = argument_validator
+        self.schema_cache = schema_cache
+        self.process_reference: Optional[FunctionReference] = None
+        # called with the spec when its parameters are replaced, e.g. to rebuild cached tool descriptions
+        self.on_change: Optional[Callable[["FunctionSpec"], None]] = None
+        self.execution = execution
 
     @property
     def name(self) -> str:
         return self.func_name
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        if self._parameters is None:
+            self._parameters = extract_openai_function_metadata(
+                self.func_ref, self.schema_cache, self.func_name
+            )
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: Dict[str, Any]) -> None:
+        self._parameters = parameters
+        self.argument_validator = None
+        if self.on_change is not None:
+            self.on_change(self)
+
+    @property
+    def execution(self) -> str:
+        return self._execution
+
+    @execution.setter
+    def execution(self, execution: str) -> None:
+        if execution not in EXECUTION_POLICIES:
+            raise ValueError(
+                f'Unknown execution policy "{execution}", expected one of {list(EXECUTION_POLICIES)}.'
+            )
+        if execution == "process":
+            if self.is_coroutine:
+                raise ValueError(
+                    f'Coroutine function "{self.func_name}" cannot be executed in a process.'
+                )
+            self.process_reference = function_reference(self.func_ref)
+        else:
+            self.process_reference = None
+        self._execution = execution
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the metadata of the function has been generated."""
+        return self._parameters is not None
+
+    def validate_arguments(self, arguments: Any) -> Dict[str, Any]:
+        """
+        Validates and coerces the decoded arguments of a call to this function.
+
+        Args:
+            arguments (Any): The decoded arguments of the call.
+
+        Returns:
+            Dict[str, Any]: The arguments to call the function with.
+        """
+        if self.argument_validator is None:
+            self.argument_validator = ArgumentValidator(self.parameters["parameters"], self.func_ref)
+        return self.argument_validator(arguments)
+
+    def warm(self) -> None:
+        """Generates the metadata and argument validator of the function if they do not exist yet."""
+        if self.argument_validator is None:
+            self.argument_validator = ArgumentValidator(self.parameters["parameters"], self.func_ref)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FunctionSpec):
+            return NotImplemented
+        # the parameters are compared last, as comparing them generates the metadata of lazy specs
+        if (self.func_name, self.func_ref, self.is_coroutine, self.execution) != (
+            other.func_name,
+            other.func_ref,
+            other.is_coroutine,
+            other.execution,
+        ):
+            return False
+        return self.parameters == other.parameters
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(func_name={self.func_name!r}, func_ref={self.func_ref!r}, "
+            f"parameters={self._parameters!r}, is_coroutine={self.is_coroutine!r}, "
+            f"execution={self.execution!r})"
+        )
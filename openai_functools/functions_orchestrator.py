@@ -1,11 +1,85 @@
+import asyncio
+import functools
+import inspect
 import json
-from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from openai_functools.argument_validator import ArgumentValidator, InvalidArgumentsError
 from openai_functools.function_spec import FunctionSpec
+from openai_functools.instrumentation import (
+    Instrumentation,
+    ToolCallEvent,
+    notify,
+    result_size,
+)
 from openai_functools.metadata_generator import (
     construct_function_name,
     extract_openai_function_metadata,
 )
+from openai_functools.minification import (
+    DEFAULT_MAX_DESCRIPTION_LENGTH,
+    estimate_payload_tokens,
+    estimate_text_tokens,
+    minify_metadata,
+)
+from openai_functools.process_pool import call_in_worker
+from openai_functools.result_cache import (
+    InMemoryResultCacheBackend,
+    ResultCache,
+    ResultCacheBackend,
+)
+from openai_functools.result_processing import ResultProcessor, apply_processors
+from openai_functools.schema_cache import SchemaCache
+from openai_functools.schema_interning import SchemaInterner, definitions_report
+from openai_functools.tool_index import ToolIndex
+from openai_functools.utils.frozen import FrozenDict, FrozenList
+
+
+class CallStart:
+    """
+    The time a submitted tool call started running, from which its timeout is measured.
+
+    A call that has not started yet can be cancelled, so that it never starts.
+    """
+
+    __slots__ = ("event", "time", "cancelled", "_lock")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.time: Optional[float] = None
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def set(self) -> bool:
+        """Marks the call as started, and returns whether it may run, i.e. was not cancelled."""
+        with self._lock:
+            if not self.cancelled and self.time is None:
+                self.time = time.monotonic()
+        self.event.set()
+        return not self.cancelled
+
+    def cancel(self) -> bool:
+        """Cancels the call if it has not started yet, and returns whether it was cancelled."""
+        with self._lock:
+            if self.time is None:
+                self.cancelled = True
+        self.event.set()
+        return self.cancelled
+
+
+def _get_method_names(cls: type) -> Tuple[str, ...]:
+    """Returns the names of the methods of a class, without evaluating properties or other descriptors."""
+    names = []
+    for name in dir(cls):
+        if name.startswith("__"):
+            continue
+        attribute = inspect.getattr_static(cls, name)
+        if isinstance(attribute, (staticmethod, classmethod)) or callable(attribute):
+            names.append(name)
+    return tuple(names)
 
 
 class FunctionsOrchestrator:
@@ -14,15 +88,95 @@ class FunctionsOrchestrator:
     """
 
     _functions: Dict[str, FunctionSpec]
+    _tool_descriptions: Dict[str, FrozenDict]
+    _compact_tool_descriptions: Dict[str, FrozenDict]
+    _tools_payload: Optional[Tuple[int, FrozenList, bytes]]
+    _compact_tools_payload: Optional[Tuple[int, FrozenList, bytes]]
+    _tool_index: Optional[Tuple[int, ToolIndex]]
+    _tool_sets: Dict[str, Tuple[str, ...]]
+    _tool_set_payloads: Dict[str, Tuple[FrozenList, FrozenList]]
+    _result_caches: Dict[str, ResultCache]
 
-    def __init__(self, functions: Optional[List[Callable]] = None) -> None:
+    def __init__(
+        self,
+        functions: Optional[List[Callable]] = None,
+        concurrent: bool = False,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[futures.Executor] = None,
+        json_loads: Callable[[str], Any] = json.loads,
+        lazy: bool = False,
+        schema_cache: Union[SchemaCache, str, None] = None,
+        instrumentation: Optional[List[Instrumentation]] = None,
+        result_processors: Optional[List[ResultProcessor]] = None,
+        process_workers: Optional[int] = None,
+        namespace: Optional[str] = None,
+        shared_definitions: bool = False,
+        max_description_length: int = DEFAULT_MAX_DESCRIPTION_LENGTH,
+    ) -> None:
         """
         Initializes the FunctionsOrchestrator with an optional list of functions.
 
         Args:
             functions (Optional[List[Callable]]): A list of functions to be registered.
+            concurrent (bool): Whether parallel tool calls are executed concurrently by default.
+            max_workers (Optional[int]): The maximum number of tool calls executed at once in concurrent mode.
+            timeout (Optional[float]): The maximum number of seconds a single tool call may run in concurrent mode,
+                measured from when it starts running.
+            executor (Optional[futures.Executor]): An executor to run concurrent tool calls on. If None, a thread pool
+                is created on first use and shut down by `shutdown`.
+            json_loads (Callable[[str], Any]): The function used to decode the arguments of function calls,
+                e.g. `orjson.loads` for a faster decoder.
+            lazy (bool): Whether to defer generating the metadata of a function until it is first needed, so
+                registering a function only records a reference to it. See `warm`.
+            schema_cache (Union[SchemaCache, str, None]): A cache file, or its path, to load generated metadata from
+                and save it to. If None, the file named by the OPENAI_FUNCTOOLS_SCHEMA_CACHE environment variable
+                is used, if set. With a cache, argument validators are built when a function is first called.
+            instrumentation (Optional[List[Instrumentation]]): Hooks that are notified of every function call.
+            result_processors (Optional[List[ResultProcessor]]): Processors applied to the results of all functions,
+                e.g. `result_processing.truncate(...)` to bound their size.
+            process_workers (Optional[int]): The number of worker processes for functions with the "process"
+                execution policy. If None, the number of CPUs is used.
+            namespace (Optional[str]): A prefix for the names of all registered functions, e.g. the name of the
+                service they belong to.
+            shared_definitions (bool): Whether sub-schemas that are repeated within the parameters of a tool are
+                moved to shared definitions in the tool descriptions, see `shared_definitions_report`.
+            max_description_length (int): The maximum length of descriptions in compact tool descriptions.
         """
         self._functions = {}
+        self._version = 0
+        self._tool_descriptions = {}
+        self._compact_tool_descriptions = {}
+        self._tools_payload = None
+        self._compact_tools_payload = None
+        self._tool_index = None
+        self._tool_sets = {}
+        self._tool_set_payloads = {}
+        self._result_caches = {}
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._json_loads = json_loads
+        self.lazy = lazy
+        if isinstance(schema_cache, str):
+            schema_cache = SchemaCache.open(schema_cache)
+        elif schema_cache is None:
+            schema_cache = SchemaCache.from_environment()
+        self.schema_cache = schema_cache
+        self._instrumentations = list(instrumentation or ())
+        self._result_processors = list(result_processors or ())
+        self._function_result_processors: Dict[str, List[ResultProcessor]] = {}
+        self.process_workers = process_workers
+        self._process_pool: Optional[futures.ProcessPoolExecutor] = None
+        self.namespace = namespace
+        self._instances_by_alias: Dict[str, Any] = {}
+        self._aliases_by_instance: Dict[int, str] = {}
+        # the last number given to an alias derived from a class name
+        self._alias_numbers: Dict[str, int] = {}
+        self._schema_interner = SchemaInterner() if shared_definitions else None
+        self.max_description_length = max_description_length
 
         if functions is not None:
             for function in functions:
@@ -59,86 +213,325 @@ class FunctionsOrchestrator:
         """
         return self._functions.values()
 
-    def register(self, function: Callable) -> None:
+    def register(
+        self, function: Callable, execution: str = "thread", alias: Optional[str] = None
+    ) -> None:
         """
         Registers a function.
 
         Args:
             function (Callable): The function to be registered.
+            execution (str): Where the function runs: "inline", "thread" or "process", see `FunctionSpec`.
+            alias (Optional[str]): For a method, the alias of its instance, see `register_instance`.
         """
-        self._add_function(function)
+        self._add_function(function, execution, alias)
 
-    def register_all(self, functions: List[Callable]) -> None:
+    def register_all(self, functions: List[Callable], execution: str = "thread") -> None:
         """
         Registers a list of functions.
 
         Args:
             functions (List[Callable]): The list of functions to be registered.
+            execution (str): Where the functions run: "inline", "thread" or "process", see `FunctionSpec`.
         """
 
         for function in functions:
-            self._add_function(function)
+            self._add_function(function, execution)
+
+    def set_execution(self, function_name: str, execution: str) -> None:
+        """
+        Changes where a registered function runs.
 
-    def register_instance(self, instance: Any) -> None:
+        Args:
+            function_name (str): The name of the registered function.
+            execution (str): "inline", "thread" or "process", see `FunctionSpec`.
+        """
+        if function_name not in self._functions:
+            raise ValueError(
+                f'Function "{function_name}" is not registered with the orchestrator.'
+            )
+        self._functions[function_name].execution = execution
+
+    def register_instance(self, instance: Any, alias: Optional[str] = None) -> None:
         """
         Registers all methods of a single instance.
 
+        The methods are named after the alias of the instance, e.g. `donald__quack`. Without an alias the
+        name of the class is used for the first instance of a class, and numbered for further instances,
+        e.g. `Duck__quack` and `Duck_2__quack`, so the names are the same in every process that registers
+        the instances in the same order.
+
         Args:
             instance (Any): The instance whose methods are to be registered.
+            alias (Optional[str]): The name that qualifies the methods of the instance.
         """
-
+        alias = self._get_instance_alias(instance, alias)
+        methods = []
         for method_name in dir(instance):
             method = getattr(instance, method_name)
             if not method_name.startswith("__") and callable(method):
-                self._add_function(getattr(instance, method_name))
+                methods.append((method, construct_function_name(method, alias, self.namespace)))
+        self._add_methods(methods)
 
-    def register_instances_all(self, instances: List[Any]):
+    def register_instances_all(self, instances: Union[List[Any], Dict[str, Any]]) -> None:
         """
         Registers all methods of all instances.
 
+        The methods of a class are looked up on the class once, so properties and other descriptors are
+        not evaluated, and callables assigned to an instance are taken from its `__dict__`. The metadata
+        and argument validator of a method are generated once and shared by all instances of the class,
+        so further instances of a class only cost adding their functions.
+
         Args:
-            instances (Any): The instances whose methods are to be registered.
+            instances (Union[List[Any], Dict[str, Any]]): The instances whose methods are to be registered,
+                or a dictionary mapping aliases to instances.
         """
+        if isinstance(instances, dict):
+            aliased = list(instances.items())
+        else:
+            aliased = [(None, instance) for instance in instances]
 
-        for instance in instances:
-            self.register_instance(instance)
+        method_names: Dict[type, Tuple[str, ...]] = {}
+        methods: List[Tuple[Callable, str]] = []
+        for alias, instance in aliased:
+            owner = instance if isinstance(instance, type) else type(instance)
+            names = method_names.get(owner)
+            if names is None:
+                names = method_names[owner] = _get_method_names(owner)
+            if owner is not instance:
+                assigned = [
+                    name
+                    for name, value in getattr(instance, "__dict__", {}).items()
+                    if not name.startswith("__") and callable(value)
+                ]
+                if assigned:
+                    names = sorted(set(names).union(assigned))
+            alias = self._get_instance_alias(instance, alias)
+            for method_name in names:
+                method = getattr(instance, method_name)
+                methods.append((method, construct_function_name(method, alias, self.namespace)))
+        self._add_methods(methods)
 
-    def _add_function(self, function: Callable) -> None:
+    def _add_methods(self, methods: List[Tuple[Callable, str]]) -> None:
+        """Adds named methods, sharing argument validators between the methods of instances of a class."""
+        function_names = set()
+        for _, function_name in methods:
+            if function_name in self._functions or function_name in function_names:
+                raise ValueError(f'Function "{function_name}" is already registered.')
+            function_names.add(function_name)
+
+        argument_validators: Dict[int, Tuple[Any, ArgumentValidator]] = {}
+        for method, function_name in methods:
+            self._add_named_function(
+                method, function_name, argument_validators=argument_validators
+            )
+
+    def _get_instance_alias(self, instance: Any, alias: Optional[str] = None) -> str:
+        """Returns the alias of an instance, assigning the given alias or one derived from its class."""
+        assigned = self._aliases_by_instance.get(id(instance))
+        if alias is None:
+            if assigned is not None:
+                return assigned
+            base = (instance if isinstance(instance, type) else type(instance)).__name__
+            alias = base
+            number = self._alias_numbers.get(base, 1)
+            if number > 1:
+                alias = f"{base}_{number}"
+            while alias in self._instances_by_alias:
+                number += 1
+                alias = f"{base}_{number}"
+            self._alias_numbers[base] = number
+        elif assigned is not None and assigned != alias:
+            raise ValueError(f'The instance is already registered with the alias "{assigned}".')
+        elif self._instances_by_alias.get(alias, instance) is not instance:
+            raise ValueError(f'The alias "{alias}" is already used by another instance.')
+
+        # the orchestrator keeps the instances alive through their bound methods, so ids are not reused
+        self._instances_by_alias[alias] = instance
+        self._aliases_by_instance[id(instance)] = alias
+        return alias
+
+    def _add_function(
+        self, function: Callable, execution: str = "thread", alias: Optional[str] = None
+    ) -> None:
         if not callable(function):
             raise TypeError(f'Function "{function}" is not callable.')
 
-        function_name = construct_function_name(function)
+        owner = getattr(function, "__self__", None)
+        if owner is not None and not inspect.ismodule(owner):
+            alias = self._get_instance_alias(owner, alias)
+        function_name = construct_function_name(function, alias, self.namespace)
+        self._add_named_function(function, function_name, execution)
+
+    def _add_named_function(
+        self,
+        function: Callable,
+        function_name: str,
+        execution: str = "thread",
+        argument_validators: Optional[Dict[int, Tuple[Any, ArgumentValidator]]] = None,
+    ) -> None:
         if function_name in self._functions:
-            raise ValueError(f'Function "{function.__name__}" is already registered.')
+            raise ValueError(f'Function "{function_name}" is already registered.')
+
+        spec = self._create_function_spec(
+            function, self.lazy, self.schema_cache, function_name, argument_validators
+        )
+        spec.execution = execution
+        spec.on_change = self._invalidate_function
+        self._functions[function_name] = spec
+        self._version += 1
 
-        self._functions[function_name] = self._create_function_spec(function)
+    def _invalidate_function(self, spec: FunctionSpec) -> None:
+        """Discards the cached tool descriptions of a function whose parameters were replaced."""
+        self._tool_descriptions.pop(spec.name, None)
+        self._compact_tool_descriptions.pop(spec.name, None)
+        self._tool_set_payloads.clear()
+        self._version += 1
 
-    def function(self, func: Optional[Callable] = None):
+    def warm(self, background: bool = False) -> Optional[futures.Future]:
+        """
+        Generates the metadata, argument validators and tools payload of all registered functions.
+
+        This is useful with `lazy=True`, to move the generation out of the first requests.
+
+        Args:
+            background (bool): Whether to generate on the orchestrator's executor instead of the calling thread.
+
+        Returns:
+            Optional[futures.Future]: A future that completes once everything is generated, if run in the background.
+        """
+        if background:
+            return self._get_executor().submit(self.warm)
+        for spec in list(self._functions.values()):
+            spec.warm()
+        self._get_tools_payload()
+        if self.schema_cache is not None:
+            self.schema_cache.save()
+        return None
+
+    def add_result_processor(
+        self, processor: ResultProcessor, function_name: Optional[str] = None
+    ) -> None:
+        """
+        Adds a processor that is applied to function results before they are returned.
+
+        Processors of a function are applied before the processors of all functions, in the order they were added.
+
+        Args:
+            processor (ResultProcessor): The processor, e.g. from `openai_functools.result_processing`.
+            function_name (Optional[str]): The name of the registered function to process the results of. If None,
+                the results of all functions are processed.
+        """
+        if function_name is None:
+            self._result_processors = self._result_processors + [processor]
+            return
+        if function_name not in self._functions:
+            raise ValueError(
+                f'Function "{function_name}" is not registered with the orchestrator.'
+            )
+        processors = self._function_result_processors.get(function_name, [])
+        self._function_result_processors[function_name] = processors + [processor]
+
+    def add_instrumentation(self, instrumentation: Instrumentation) -> None:
+        """
+        Adds hooks that are notified of every function call, e.g. a `HistogramCollector`.
+
+        Args:
+            instrumentation (Instrumentation): The hooks to add.
+        """
+        self._instrumentations = self._instrumentations + [instrumentation]
+
+    def remove_instrumentation(self, instrumentation: Instrumentation) -> None:
+        """
+        Removes hooks added with `add_instrumentation`.
+
+        Args:
+            instrumentation (Instrumentation): The hooks to remove.
+        """
+        self._instrumentations = [
+            existing for existing in self._instrumentations if existing is not instrumentation
+        ]
+
+    def cache_results(
+        self,
+        function_name: str,
+        ttl: Optional[float] = None,
+        maxsize: Optional[int] = 128,
+        backend: Optional[ResultCacheBackend] = None,
+    ) -> ResultCache:
+        """
+        Enables caching of the results of a registered function, keyed by its canonicalized arguments.
+
+        Only use this for functions whose result depends on their arguments alone, e.g. read-only lookups.
+
+        Args:
+            function_name (str): The name of the registered function.
+            ttl (Optional[float]): The number of seconds a result is cached. If None, results do not expire.
+            maxsize (Optional[int]): The maximum number of cached results of the in-process store.
+            backend (Optional[ResultCacheBackend]): A store for the results, e.g. one shared between processes.
+                If None, an in-process least recently used store of `maxsize` results is used.
+
+        Returns:
+            ResultCache: The cache of the function.
+        """
+        if function_name not in self._functions:
+            raise ValueError(
+                f'Function "{function_name}" is not registered with the orchestrator.'
+            )
+        if backend is None:
+            backend = InMemoryResultCacheBackend(maxsize=maxsize)
+        result_cache = ResultCache(function_name, ttl=ttl, backend=backend)
+        self._result_caches[function_name] = result_cache
+        return result_cache
+
+    @property
+    def result_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the hit and miss counters of the result caches.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The counters of every cached function keyed by function name.
+        """
+        return {
+            function_name: result_cache.stats
+            for function_name, result_cache in self._result_caches.items()
+        }
+
+    def function(self, func: Optional[Callable] = None, execution: str = "thread"):
         """
         Registers a function if provided, otherwise returns a decorator for function registration.
 
         Args:
             func (Optional[Callable]): The function to be registered, if provided.
+            execution (str): Where the function runs: "inline", "thread" or "process", see `FunctionSpec`.
 
         Returns:
             Callable: The registered function or a decorator for function registration.
         """
         if func is not None:
-            self.register(func)
+            self.register(func, execution)
             return func
 
         def wrapper(f):
-            self.register(f)
+            self.register(f, execution)
             return f
 
         return wrapper
 
-    def call_function(self, openai_response: dict) -> dict:
+    def call_function(
+        self, openai_response: dict, concurrent: Optional[bool] = None
+    ) -> dict:
         """
         Calls a function based on the OpenAI response.
 
+        In concurrent mode the tool calls of a response are executed on the orchestrator's executor.
+        A tool call that fails or exceeds the timeout does not affect the others: its exception is
+        returned in place of its result.
+
         Args:
             openai_response (dict): The OpenAI response containing the function call information.
+            concurrent (Optional[bool]): Whether to execute tool calls concurrently. If None, the
+                orchestrator's default is used.
 
         Returns:
             dict: The responses from the called function.
@@ -146,29 +539,392 @@ class FunctionsOrchestrator:
         response_message = openai_response.choices[0].message
 
         if function_call := response_message.function_call:
-            function_name = function_call.name
-            function_args = json.loads(function_call.arguments)
-            function = self._functions[function_name]
-
-            if function is None:
-                raise ValueError(
-                    f'Function "{function_name}" is not '
-                    f"registered with the orchestrator."
-                )
-            return function.func_ref(**function_args)
+            return self._invoke(function_call.name, function_call.arguments)
         elif tool_calls := response_message.tool_calls:
+            if concurrent is None:
+                concurrent = self.concurrent
+            if concurrent:
+                return self._call_tools_concurrently(tool_calls)
+
             function_responses = {}
             for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                function = self._functions[function_name]
-                function_responses[tool_call.id] = function.func_ref(**function_args)
+                function_responses[tool_call.id] = self._invoke(
+                    tool_call.function.name, tool_call.function.arguments
+                )
             return function_responses
         else:
             raise ValueError(
                 f'Function call information not found in response message "{response_message}".'
             )
 
+    def _invoke(self, function_name: str, arguments: str) -> Any:
+        """
+        Calls a registered function with its JSON encoded arguments, reporting the call to the instrumentation.
+
+        Args:
+            function_name (str): The name of the registered function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        if not self._instrumentations:
+            return self._call(function_name, arguments)
+
+        event = ToolCallEvent(function_name, len(arguments))
+        notify(self._instrumentations, "before_call", event)
+        started_at = time.perf_counter()
+        try:
+            result = self._call(function_name, arguments)
+        except Exception as error:
+            event.duration = time.perf_counter() - started_at
+            event.error = error
+            notify(self._instrumentations, "on_error", event)
+            raise
+        event.duration = time.perf_counter() - started_at
+        event.result_size = result_size(result)
+        notify(self._instrumentations, "after_call", event)
+        return result
+
+    def _call(self, function_name: str, arguments: str) -> Any:
+        """
+        Calls a registered function with its JSON encoded arguments.
+
+        Args:
+            function_name (str): The name of the registered function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        function = self._functions[function_name]
+        function_args = self._decode_arguments(function, arguments)
+        if function.is_coroutine:
+            raise TypeError(
+                f'Function "{function_name}" is a coroutine function, use acall_function to call it.'
+            )
+
+        result_cache = self._result_caches.get(function_name)
+        if result_cache is None:
+            return self._process_result(function_name, self._execute(function, function_args))
+
+        key = result_cache.make_key(function_args)
+        is_cached, result = result_cache.lookup(key)
+        if not is_cached:
+            result = self._process_result(function_name, self._execute(function, function_args))
+            result_cache.store(key, result)
+        return result
+
+    def _execute(self, function: FunctionSpec, function_args: Dict[str, Any]) -> Any:
+        """Calls a function in the calling thread, or in a worker process if that is its execution policy."""
+        if function.execution == "process":
+            return (
+                self._get_process_pool()
+                .submit(call_in_worker, function.process_reference, function_args)
+                .result()
+            )
+        return function.func_ref(**function_args)
+
+    def _process_result(self, function_name: str, result: Any) -> Any:
+        """Applies the result processors of a function, then the ones of all functions, to its result."""
+        return apply_processors(
+            result,
+            self._function_result_processors.get(function_name),
+            self._result_processors,
+        )
+
+    def _call_and_process(self, function: FunctionSpec, function_args: Dict[str, Any]) -> Any:
+        return self._process_result(function.name, function.func_ref(**function_args))
+
+    def _get_process_pool(self) -> futures.ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = futures.ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    def _decode_arguments(self, function: FunctionSpec, arguments: str) -> Dict[str, Any]:
+        """
+        Decodes and validates the JSON encoded arguments of a call before the function is called.
+
+        Args:
+            function (FunctionSpec): The specification of the called function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            Dict[str, Any]: The arguments to call the function with.
+        """
+        try:
+            decoded = self._json_loads(arguments)
+        except ValueError as error:
+            raise InvalidArgumentsError(
+                f'Arguments of function "{function.name}" are not valid JSON: {error}'
+            ) from error
+        try:
+            return function.validate_arguments(decoded)
+        except InvalidArgumentsError as error:
+            raise InvalidArgumentsError(
+                f'Invalid arguments for function "{function.name}": {error}'
+            ) from None
+
+    async def acall_function(
+        self, openai_response: dict, max_concurrency: Optional[int] = None
+    ) -> dict:
+        """
+        Calls a function based on the OpenAI response from within an event loop.
+
+        Coroutine functions are awaited, other functions are run on the orchestrator's executor so they
+        do not block the event loop. The tool calls of a response are executed concurrently; a tool call
+        that fails or exceeds the timeout has its exception returned in place of its result.
+
+        Args:
+            openai_response (dict): The OpenAI response containing the function call information.
+            max_concurrency (Optional[int]): The maximum number of tool calls executed at once. If None,
+                `max_workers` is used, and if that is None as well the number is not limited.
+
+        Returns:
+            dict: The responses from the called function.
+        """
+        response_message = openai_response.choices[0].message
+
+        if function_call := response_message.function_call:
+            return await self._ainvoke(function_call.name, function_call.arguments)
+        elif tool_calls := response_message.tool_calls:
+            limit = max_concurrency if max_concurrency is not None else self.max_workers
+            semaphore = asyncio.Semaphore(limit) if limit else None
+
+            async def run(tool_call: Any) -> Any:
+                try:
+                    if semaphore is None:
+                        return await self._ainvoke_with_timeout(tool_call)
+                    async with semaphore:
+                        return await self._ainvoke_with_timeout(tool_call)
+                except Exception as error:
+                    return error
+
+            results = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+            return {
+                tool_call.id: result for tool_call, result in zip(tool_calls, results)
+            }
+        else:
+            raise ValueError(
+                f'Function call information not found in response message "{response_message}".'
+            )
+
+    async def _ainvoke_with_timeout(self, tool_call: Any) -> Any:
+        coroutine = self._ainvoke(tool_call.function.name, tool_call.function.arguments)
+        if self.timeout is None:
+            return await coroutine
+        try:
+            return await asyncio.wait_for(coroutine, self.timeout)
+        except asyncio.TimeoutError:
+            raise futures.TimeoutError(
+                f'Tool call "{tool_call.id}" did not complete within {self.timeout} seconds.'
+            ) from None
+
+    async def _ainvoke(self, function_name: str, arguments: str) -> Any:
+        """
+        Calls or awaits a registered function with its JSON encoded arguments, reporting the call to the
+        instrumentation.
+
+        Args:
+            function_name (str): The name of the registered function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        if not self._instrumentations:
+            return await self._acall(function_name, arguments)
+
+        event = ToolCallEvent(function_name, len(arguments))
+        notify(self._instrumentations, "before_call", event)
+        started_at = time.perf_counter()
+        try:
+            result = await self._acall(function_name, arguments)
+        except Exception as error:
+            event.duration = time.perf_counter() - started_at
+            event.error = error
+            notify(self._instrumentations, "on_error", event)
+            raise
+        event.duration = time.perf_counter() - started_at
+        event.result_size = result_size(result)
+        notify(self._instrumentations, "after_call", event)
+        return result
+
+    async def _acall(self, function_name: str, arguments: str) -> Any:
+        """
+        Calls or awaits a registered function with its JSON encoded arguments.
+
+        Args:
+            function_name (str): The name of the registered function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        function = self._functions[function_name]
+        function_args = self._decode_arguments(function, arguments)
+
+        result_cache = self._result_caches.get(function_name)
+        if result_cache is not None:
+            key = result_cache.make_key(function_args)
+            is_cached, result = result_cache.lookup(key)
+            if is_cached:
+                return result
+
+        if function.is_coroutine:
+            result = self._process_result(
+                function_name, await function.func_ref(**function_args)
+            )
+        elif function.execution == "inline":
+            result = self._call_and_process(function, function_args)
+        elif function.execution == "process":
+            loop = asyncio.get_running_loop()
+            result = self._process_result(
+                function_name,
+                await loop.run_in_executor(
+                    self._get_process_pool(),
+                    functools.partial(call_in_worker, function.process_reference, function_args),
+                ),
+            )
+        else:
+            # results are processed on the executor as well, as consuming a generator runs the function
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(self._call_and_process, function, function_args),
+            )
+
+        if result_cache is not None:
+            result_cache.store(key, result)
+        return result
+
+    def submit(self, function_name: str, arguments: str) -> futures.Future:
+        """
+        Starts calling a registered function on the orchestrator's executor.
+
+        Functions with the "inline" execution policy are called right away, in the calling thread.
+
+        Args:
+            function_name (str): The name of the registered function.
+            arguments (str): The JSON encoded arguments of the call.
+
+        Returns:
+            futures.Future: The future of the result of the call.
+        """
+        return self._submit(function_name, arguments)[0]
+
+    def _submit(self, function_name: str, arguments: str) -> Tuple[futures.Future, CallStart]:
+        """Starts calling a registered function, see `submit`, and returns when the call started running."""
+        start = CallStart()
+        function = self._functions.get(function_name)
+        if function is not None and function.execution == "inline":
+            start.set()
+            future = futures.Future()
+            try:
+                future.set_result(self._invoke(function_name, arguments))
+            except Exception as error:
+                future.set_exception(error)
+            return future, start
+        future = self._get_executor().submit(self._start_and_invoke, start, function_name, arguments)
+        # calls that never run, e.g. because they were cancelled, count as started when they complete
+        future.add_done_callback(lambda _: start.event.set())
+        return future, start
+
+    def _start_and_invoke(self, start: CallStart, function_name: str, arguments: str) -> Any:
+        if not start.set():
+            raise futures.CancelledError()
+        return self._invoke(function_name, arguments)
+
+    def _call_tools_concurrently(self, tool_calls: List[Any]) -> dict:
+        """
+        Executes tool calls on the executor and collects their results by tool call id.
+
+        Args:
+            tool_calls (List[Any]): The tool calls of a response message.
+
+        Returns:
+            dict: The result, or the raised exception, of every tool call keyed by its id.
+        """
+        pending = {
+            tool_call.id: self._submit(tool_call.function.name, tool_call.function.arguments)
+            for tool_call in tool_calls
+        }
+        return self._collect_results(pending)
+
+    def _collect_results(
+        self, pending: Dict[str, Tuple[futures.Future, CallStart]]
+    ) -> dict:
+        """
+        Waits for submitted tool calls, each for at most the timeout since it started running.
+
+        Time a tool call spends queued behind `max_workers` other calls does not count against its timeout,
+        like in `acall_function`. A tool call that has not started once the batch had the time to run all
+        calls one after another, i.e. the timeout times the number of calls, is cancelled and never starts,
+        so a tool that hangs cannot block the calls queued behind it indefinitely.
+
+        Args:
+            pending (Dict[str, Tuple[futures.Future, CallStart]]): The future and start of every tool call
+                keyed by its id.
+
+        Returns:
+            dict: The result, or the raised exception, of every tool call keyed by its id.
+        """
+        function_responses = {}
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout * len(pending)
+        for tool_call_id, (future, start) in pending.items():
+            remaining = None
+            if deadline is not None:
+                start.event.wait(max(0.0, deadline - time.monotonic()))
+                if start.cancel():
+                    future.cancel()
+                    function_responses[tool_call_id] = futures.TimeoutError(
+                        f'Tool call "{tool_call_id}" did not start within {self.timeout * len(pending)} seconds.'
+                    )
+                    continue
+                started_at = start.time if start.time is not None else time.monotonic()
+                remaining = max(0.0, started_at + self.timeout - time.monotonic())
+            try:
+                function_responses[tool_call_id] = future.result(timeout=remaining)
+            except futures.TimeoutError:
+                future.cancel()
+                function_responses[tool_call_id] = futures.TimeoutError(
+                    f'Tool call "{tool_call_id}" did not complete within {self.timeout} seconds.'
+                )
+            except Exception as error:
+                function_responses[tool_call_id] = error
+        return function_responses
+
+    def _get_executor(self) -> futures.Executor:
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="openai-functools",
+            )
+            self._owns_executor = True
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the executor created by the orchestrator for concurrent tool calls, and its worker processes.
+
+        Args:
+            wait (bool): Whether to wait for running tool calls to complete.
+        """
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+    def __enter__(self) -> "FunctionsOrchestrator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
     def _create_function_specs(self, functions: List[Callable]) -> List[FunctionSpec]:
         """
         Creates function specifications for a list of functions.
@@ -179,23 +935,69 @@ class FunctionsOrchestrator:
         Returns:
             List[FunctionSpec]: The list of created function specifications.
         """
-        return [self._create_function_spec(function) for function in functions]
+        return [
+            self._create_function_spec(
+                function,
+                self.lazy,
+                self.schema_cache,
+                construct_function_name(function, namespace=self.namespace),
+            )
+            for function in functions
+        ]
 
     @staticmethod
-    def _create_function_spec(function: Callable) -> FunctionSpec:
+    def _create_function_spec(
+        function: Callable,
+        lazy: bool = False,
+        schema_cache: Optional[SchemaCache] = None,
+        name: Optional[str] = None,
+        argument_validators: Optional[Dict[int, Tuple[Any, ArgumentValidator]]] = None,
+    ) -> FunctionSpec:
         """
         Creates a function specification for a function.
 
         Args:
             function (Callable): The function for which to create a specification.
+            lazy (bool): Whether to defer generating the metadata until it is first needed.
+            schema_cache (Optional[SchemaCache]): A cache file to load the metadata from and save it to.
+            name (Optional[str]): The name of the function. If None, it is constructed from the function.
+            argument_validators (Optional[Dict[int, Tuple[Any, ArgumentValidator]]]): Argument validators
+                to share between functions with the same parameters, keyed by the id of the parameters.
 
         Returns:
             FunctionSpec: The created function specification.
         """
+        if name is None:
+            name = construct_function_name(function)
+        if lazy:
+            return FunctionSpec(
+                func_name=name,
+                func_ref=function,
+                is_coroutine=inspect.iscoroutinefunction(function),
+                schema_cache=schema_cache,
+            )
+        parameters = extract_openai_function_metadata(function, schema_cache, name)
+        if schema_cache is not None:
+            # the schema cache is for fast cold starts, the validator is built when the function is first called
+            argument_validator = None
+        elif argument_validators is None:
+            argument_validator = ArgumentValidator(parameters["parameters"], function)
+        else:
+            # the shared parameters are kept alive with the validator, so their id is not reused
+            shared = argument_validators.get(id(parameters["parameters"]))
+            if shared is None:
+                shared = argument_validators[id(parameters["parameters"])] = (
+                    parameters["parameters"],
+                    ArgumentValidator(parameters["parameters"], function),
+                )
+            argument_validator = shared[1]
         return FunctionSpec(
-            func_name=construct_function_name(function),
+            func_name=name,
             func_ref=function,
-            parameters=extract_openai_function_metadata(function),
+            parameters=parameters,
+            is_coroutine=inspect.iscoroutinefunction(function),
+            argument_validator=argument_validator,
+            schema_cache=schema_cache,
         )
 
     @property
@@ -209,47 +1011,278 @@ class FunctionsOrchestrator:
         return [spec.parameters for spec in self._functions.values()]
 
     def create_function_descriptions(
-        self, selected_functions: Optional[List[str]] = None
+        self,
+        selected_functions: Optional[List[str]] = None,
+        tool_set: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Creates descriptions for the selected functions. This should be used when calling ChatCompletion.create with the functions argument.
 
         Args:
             selected_functions (Optional[List[str]]): The list of selected function names. If None, descriptions for all registered functions are created.
+            tool_set (Optional[str]): The name of a tool set defined with `define_tool_set` to create descriptions for.
 
         Returns:
             List[Dict[str, Any]]: The list of created function descriptions.
         """
+        if tool_set is not None:
+            return list(self._get_tool_set(tool_set)[0])
         specs = (
             self._functions.values()
             if selected_functions is None
-            else [
-                spec
-                for spec in self._functions.values()
-                if spec.name in selected_functions
-            ]
+            else self._select_specs(selected_functions)
         )
         return [spec.parameters for spec in specs]
 
     def create_tools_descriptions(
-        self, selected_functions: Optional[List[str]] = None
+        self,
+        selected_functions: Optional[List[str]] = None,
+        tool_set: Optional[str] = None,
+        compact: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Creates descriptions for the selected functions. This should be used when calling ChatCompletion.create with the tools argument.
 
         Args:
             selected_functions (Optional[List[str]]): The list of selected function names. If None, descriptions for all registered functions are created.
+            tool_set (Optional[str]): The name of a tool set defined with `define_tool_set` to create descriptions for.
+            compact (bool): Whether to create compact descriptions, without descriptions that repeat a name, with
+                descriptions shortened to `max_description_length` and without empty keys.
 
         Returns:
             List[Dict[str, Any]]: The list of created tool descriptions.
         """
-        specs = (
-            self._functions.values()
-            if selected_functions is None
-            else [
-                spec
-                for spec in self._functions.values()
-                if spec.name in selected_functions
-            ]
+        if compact:
+            if tool_set is not None:
+                specs = self._get_tool_set_specs(tool_set)
+            elif selected_functions is None:
+                return list(self._get_tools_payload(compact=True)[1])
+            else:
+                specs = self._select_specs(selected_functions)
+            return [self._get_tool_description(spec, compact=True) for spec in specs]
+        if tool_set is not None:
+            return list(self._get_tool_set(tool_set)[1])
+        if selected_functions is None:
+            return list(self.tools_payload)
+        return [
+            self._get_tool_description(spec)
+            for spec in self._select_specs(selected_functions)
+        ]
+
+    def estimate_tool_tokens(
+        self,
+        selected_functions: Optional[List[str]] = None,
+        tool_set: Optional[str] = None,
+        compact: bool = False,
+        token_estimator: Callable[[str], int] = estimate_text_tokens,
+    ) -> Dict[str, Any]:
+        """
+        Estimates the prompt tokens that the tool descriptions of the selected functions cost on every request.
+
+        Args:
+            selected_functions (Optional[List[str]]): The list of selected function names. If None, all registered functions are estimated.
+            tool_set (Optional[str]): The name of a tool set defined with `define_tool_set` to estimate.
+            compact (bool): Whether to estimate the compact tool descriptions.
+            token_estimator (Callable[[str], int]): Estimates the tokens of a text. By default ~4 characters
+                are counted per token, pass e.g. a tiktoken encoder's `lambda text: len(encoding.encode(text))`
+                for exact counts.
+
+        Returns:
+            Dict[str, Any]: The estimated tokens of each tool keyed by function name, and of the whole payload.
+        """
+        return estimate_payload_tokens(
+            self.create_tools_descriptions(selected_functions, tool_set, compact),
+            token_estimator,
         )
-        return [{"type": "function", "function": spec.parameters} for spec in specs]
+
+    def select_tools(self, query: str, top_k: int = 10, min_score: float = 0.0) -> List[str]:
+        """
+        Selects the registered functions that are most relevant to a query, e.g. the message of a user.
+
+        Functions are ranked with BM25 over their names, descriptions and parameters, see `tool_index`.
+        The result can be passed to `create_tools_descriptions` to send only relevant tools.
+
+        Args:
+            query (str): The query.
+            top_k (int): The maximum number of functions to select.
+            min_score (float): The minimum relevance score of a selected function.
+
+        Returns:
+            List[str]: The names of the selected functions, most relevant first.
+        """
+        return [name for name, _ in self.tool_index.search(query, top_k, min_score)]
+
+    @property
+    def tool_index(self) -> ToolIndex:
+        """
+        Returns the relevance index of the registered functions.
+
+        The index is built once per registry version, which generates the metadata of lazily registered
+        functions.
+
+        Returns:
+            ToolIndex: The index.
+        """
+        tool_index = self._tool_index
+        if tool_index is None or tool_index[0] != self._version:
+            version = self._version
+            documents = {
+                spec.name: self._get_index_document(spec.parameters)
+                for spec in list(self._functions.values())
+            }
+            tool_index = self._tool_index = (version, ToolIndex(documents))
+        return tool_index[1]
+
+    @staticmethod
+    def _get_index_document(metadata: Dict[str, Any]) -> str:
+        parts = [metadata["name"], metadata.get("description") or ""]
+        for name, schema in metadata["parameters"].get("properties", {}).items():
+            parts.append(name)
+            description = schema.get("description")
+            if description and description != name:
+                parts.append(description)
+        return " ".join(parts)
+
+    def define_tool_set(self, name: str, function_names: List[str]) -> None:
+        """
+        Defines a named, reusable subset of the registered functions.
+
+        The descriptions of a tool set are built once, so requesting them by name is a lookup.
+
+        Args:
+            name (str): The name of the tool set.
+            function_names (List[str]): The names of the registered functions in the tool set.
+        """
+        function_names = tuple(dict.fromkeys(function_names))
+        unknown = [
+            function_name
+            for function_name in function_names
+            if function_name not in self._functions
+        ]
+        if unknown:
+            raise ValueError(
+                f'Functions {unknown} of tool set "{name}" are not registered with the orchestrator.'
+            )
+        self._tool_sets[name] = function_names
+        self._tool_set_payloads.pop(name, None)
+
+    @property
+    def tool_sets(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Returns the defined tool sets.
+
+        Returns:
+            Dict[str, Tuple[str, ...]]: The function names of every tool set keyed by tool set name.
+        """
+        return dict(self._tool_sets)
+
+    def _select_specs(self, selected_functions: List[str]) -> List[FunctionSpec]:
+        functions = self._functions
+        return [
+            functions[function_name]
+            for function_name in dict.fromkeys(selected_functions)
+            if function_name in functions
+        ]
+
+    def _get_tool_set_specs(self, name: str) -> List[FunctionSpec]:
+        if name not in self._tool_sets:
+            raise ValueError(f'Tool set "{name}" is not defined.')
+        return [self._functions[function_name] for function_name in self._tool_sets[name]]
+
+    def _get_tool_set(self, name: str) -> Tuple[FrozenList, FrozenList]:
+        payloads = self._tool_set_payloads.get(name)
+        if payloads is None:
+            specs = self._get_tool_set_specs(name)
+            payloads = self._tool_set_payloads[name] = (
+                FrozenList(spec.parameters for spec in specs),
+                FrozenList(self._get_tool_description(spec) for spec in specs),
+            )
+        return payloads
+
+    @property
+    def registry_version(self) -> int:
+        """
+        Returns a number that changes every time the registered functions change.
+
+        Returns:
+            int: The version of the function registry.
+        """
+        return self._version
+
+    @property
+    def tools_payload(self) -> FrozenList:
+        """
+        Returns the immutable tool descriptions of all registered functions.
+
+        The payload is built once per registry version, so repeated access is a lookup.
+
+        Returns:
+            FrozenList: The tool descriptions.
+        """
+        return self._get_tools_payload()[1]
+
+    @property
+    def tools_payload_json(self) -> bytes:
+        """
+        Returns the tool descriptions of all registered functions serialized as JSON.
+
+        Returns:
+            bytes: The JSON encoded tool descriptions.
+        """
+        return self._get_tools_payload()[2]
+
+    def _get_tools_payload(self, compact: bool = False) -> Tuple[int, FrozenList, bytes]:
+        tools_payload = self._compact_tools_payload if compact else self._tools_payload
+        if tools_payload is None or tools_payload[0] != self._version:
+            version = self._version
+            payload = FrozenList(
+                self._get_tool_description(spec, compact)
+                for spec in list(self._functions.values())
+            )
+            payload_json = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            tools_payload = (version, payload, payload_json)
+            if compact:
+                self._compact_tools_payload = tools_payload
+            else:
+                self._tools_payload = tools_payload
+        return tools_payload
+
+    def shared_definitions_report(self) -> Dict[str, Any]:
+        """
+        Reports how much shared definitions shrink the tool descriptions of all registered functions.
+
+        If the orchestrator does not use shared definitions, the report shows what they would save.
+
+        Returns:
+            Dict[str, Any]: The original, deduplicated and saved bytes of the JSON payload, and the number of
+                references to each shared definition.
+        """
+        interner = self._schema_interner or SchemaInterner()
+        specs = list(self._functions.values())
+        return definitions_report(
+            [FrozenDict(type="function", function=spec.parameters) for spec in specs],
+            [
+                FrozenDict(type="function", function=self._deduplicate(spec.parameters, interner))
+                for spec in specs
+            ],
+        )
+
+    def _get_tool_description(self, spec: FunctionSpec, compact: bool = False) -> FrozenDict:
+        tool_descriptions = self._compact_tool_descriptions if compact else self._tool_descriptions
+        tool_description = tool_descriptions.get(spec.name)
+        if tool_description is None:
+            function = spec.parameters
+            if self._schema_interner is not None:
+                function = self._deduplicate(function, self._schema_interner)
+            if compact:
+                function = minify_metadata(function, self.max_description_length)
+            tool_description = FrozenDict(type="function", function=function)
+            tool_descriptions[spec.name] = tool_description
+        return tool_description
+
+    @staticmethod
+    def _deduplicate(metadata: Dict[str, Any], interner: SchemaInterner) -> Dict[str, Any]:
+        parameters = interner.deduplicate(metadata["parameters"])
+        if parameters is metadata["parameters"]:
+            return metadata
+        return FrozenDict(metadata, parameters=parameters)
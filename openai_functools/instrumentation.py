@@ -0,0 +1,258 @@
+"""Hooks to measure the latency and throughput of the registered functions."""
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class ToolCallEvent:
+    """
+    Describes a call of a registered function to instrumentation hooks.
+
+    `duration` is set once the call completed, together with `result_size` or `error`. Hooks can
+    keep per-call state, e.g. a span, in `context`.
+    """
+
+    __slots__ = (
+        "function_name",
+        "argument_size",
+        "duration",
+        "result_size",
+        "error",
+        "context",
+    )
+
+    def __init__(self, function_name: str, argument_size: int) -> None:
+        self.function_name = function_name
+        self.argument_size = argument_size
+        self.duration: Optional[float] = None
+        self.result_size: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.context: Dict[str, Any] = {}
+
+
+class Instrumentation:
+    """
+    Base class for instrumentation hooks, whose methods do nothing by default.
+
+    Hooks are called from the thread, or event loop, that executes the call and should be quick.
+    """
+
+    def before_call(self, event: ToolCallEvent) -> None:
+        """Called before a registered function is called."""
+
+    def after_call(self, event: ToolCallEvent) -> None:
+        """Called after a registered function returned."""
+
+    def on_error(self, event: ToolCallEvent) -> None:
+        """Called after a call failed, including calls with invalid arguments."""
+
+
+def result_size(result: Any) -> Optional[int]:
+    """
+    Returns the size of a result that is a string or bytes, without serializing other results.
+
+    Args:
+        result (Any): The result of a call.
+
+    Returns:
+        Optional[int]: The length of the result, or None for other types.
+    """
+    if isinstance(result, (str, bytes, bytearray)):
+        return len(result)
+    return None
+
+
+# exponential latency buckets from 1ms to ~65s
+DEFAULT_BUCKETS = tuple(0.001 * 2**exponent for exponent in range(17))
+
+
+class _FunctionHistogram:
+    __slots__ = ("counts", "calls", "errors", "total_duration", "argument_bytes", "result_bytes")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.counts = [0] * (bucket_count + 1)
+        self.calls = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.argument_bytes = 0
+        self.result_bytes = 0
+
+
+class HistogramCollector(Instrumentation):
+    """Collects a latency histogram and call, error and size counters per function in memory."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initializes the collector.
+
+        Args:
+            buckets (Sequence[float]): The ascending upper bounds, in seconds, of the latency buckets.
+        """
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, _FunctionHistogram] = {}
+        self._lock = threading.Lock()
+
+    def after_call(self, event: ToolCallEvent) -> None:
+        self._record(event)
+
+    def on_error(self, event: ToolCallEvent) -> None:
+        self._record(event)
+
+    def _record(self, event: ToolCallEvent) -> None:
+        bucket = bisect.bisect_left(self.buckets, event.duration)
+        with self._lock:
+            histogram = self._histograms.get(event.function_name)
+            if histogram is None:
+                histogram = self._histograms[event.function_name] = _FunctionHistogram(
+                    len(self.buckets)
+                )
+            histogram.counts[bucket] += 1
+            histogram.calls += 1
+            histogram.total_duration += event.duration
+            histogram.argument_bytes += event.argument_size
+            if event.error is not None:
+                histogram.errors += 1
+            elif event.result_size is not None:
+                histogram.result_bytes += event.result_size
+
+    def percentile(self, function_name: str, percentile: float) -> Optional[float]:
+        """
+        Estimates a latency percentile of a function as the upper bound of the bucket it falls in.
+
+        Args:
+            function_name (str): The name of the function.
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            Optional[float]: The latency in seconds, None if the function was not called, or infinity if it
+                falls beyond the last bucket.
+        """
+        histogram = self._histograms.get(function_name)
+        if histogram is None or histogram.calls == 0:
+            return None
+        threshold = histogram.calls * percentile / 100
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return bound
+        return float("inf")
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarizes the collected measurements.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The calls, errors, mean and percentile latencies and sizes per function.
+        """
+        with self._lock:
+            function_names = list(self._histograms)
+        summary = {}
+        for function_name in function_names:
+            histogram = self._histograms[function_name]
+            summary[function_name] = {
+                "calls": histogram.calls,
+                "errors": histogram.errors,
+                "mean_duration": histogram.total_duration / histogram.calls,
+                "p50_duration": self.percentile(function_name, 50),
+                "p95_duration": self.percentile(function_name, 95),
+                "p99_duration": self.percentile(function_name, 99),
+                "argument_bytes": histogram.argument_bytes,
+                "result_bytes": histogram.result_bytes,
+            }
+        return summary
+
+    def reset(self) -> None:
+        """Discards the collected measurements."""
+        with self._lock:
+            self._histograms.clear()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Reports calls to OpenTelemetry as spans and metrics.
+
+    Requires the `opentelemetry-api` package. Without a configured SDK the API is a no-op.
+    """
+
+    def __init__(self, meter: Any = None, tracer: Any = None, trace: bool = True) -> None:
+        """
+        Initializes the adapter.
+
+        Args:
+            meter (Any): The meter to create the instruments with. If None, the global meter provider is used.
+            tracer (Any): The tracer to create spans with. If None, the global tracer provider is used.
+            trace (bool): Whether to create a span per call.
+        """
+        try:
+            from opentelemetry import metrics
+            from opentelemetry import trace as otel_trace
+        except ImportError as error:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires the opentelemetry-api package."
+            ) from error
+
+        meter = meter if meter is not None else metrics.get_meter("openai_functools")
+        self._tracer = None
+        if trace:
+            self._tracer = (
+                tracer if tracer is not None else otel_trace.get_tracer("openai_functools")
+            )
+        self._status_error = otel_trace.StatusCode.ERROR
+        self._duration = meter.create_histogram(
+            "openai_functools.tool_call.duration",
+            unit="s",
+            description="Duration of calls of registered functions",
+        )
+        self._argument_size = meter.create_histogram(
+            "openai_functools.tool_call.argument_size",
+            unit="By",
+            description="Size of the JSON arguments of calls of registered functions",
+        )
+        self._result_size = meter.create_histogram(
+            "openai_functools.tool_call.result_size",
+            unit="By",
+            description="Size of the results of calls of registered functions",
+        )
+        self._errors = meter.create_counter(
+            "openai_functools.tool_call.errors",
+            description="Failed calls of registered functions",
+        )
+
+    def before_call(self, event: ToolCallEvent) -> None:
+        if self._tracer is not None:
+            span = self._tracer.start_span(f"tool_call {event.function_name}")
+            span.set_attribute("openai_functools.function_name", event.function_name)
+            span.set_attribute("openai_functools.argument_size", event.argument_size)
+            event.context["otel_span"] = span
+
+    def after_call(self, event: ToolCallEvent) -> None:
+        attributes = {"function_name": event.function_name}
+        self._duration.record(event.duration, attributes)
+        self._argument_size.record(event.argument_size, attributes)
+        if event.result_size is not None:
+            self._result_size.record(event.result_size, attributes)
+        span = event.context.get("otel_span")
+        if span is not None:
+            if event.result_size is not None:
+                span.set_attribute("openai_functools.result_size", event.result_size)
+            span.end()
+
+    def on_error(self, event: ToolCallEvent) -> None:
+        attributes = {
+            "function_name": event.function_name,
+            "error_type": type(event.error).__name__,
+        }
+        self._duration.record(event.duration, attributes)
+        self._errors.add(1, attributes)
+        span = event.context.get("otel_span")
+        if span is not None:
+            span.record_exception(event.error)
+            span.set_status(self._status_error)
+            span.end()
+
+
+def notify(instrumentations: List[Instrumentation], hook: str, event: ToolCallEvent) -> None:
+    """Calls a hook of every instrumentation."""
+    for instrumentation in instrumentations:
+        getattr(instrumentation, hook)(event)
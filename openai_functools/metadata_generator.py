@@ -1,30 +1,192 @@
+import enum
 import inspect
+import re
 import typing
-from functools import wraps
-from typing import Any, Callable
+import weakref
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
 
 from docstring_parser import parse
 
-from openai_functools.openai_types import python_type_to_openapi_type
+from openai_functools.openai_types import type_to_schema
+from openai_functools.schema_cache import SchemaCache
+from openai_functools.utils.frozen import FrozenDict, freeze
 
 
-def openai_function(func: Callable) -> Callable:
-    """Wrapper for functions to add .openai_metadata property"""
-    func.openai_metadata = extract_openai_function_metadata(func)
+class _CachedMetadata:
+    """Name independent metadata of a function, plus the metadata most recently built from it."""
 
-    @wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        return func(*args, **kwargs)
+    __slots__ = ("description", "parameters", "metadata")
 
-    return wrapper
+    def __init__(self, description: Optional[str], parameters: FrozenDict) -> None:
+        self.description = description
+        self.parameters = parameters
+        self.metadata: Optional[FrozenDict] = None
 
 
-def extract_openai_function_metadata(func: Callable) -> dict:
-    """Extracts function metadata using function signature, docstring, ..."""
+# Keyed on the underlying function (the __func__ of bound methods) and whether it is bound, so that
+# all instances of a class share one entry and entries vanish together with their function.
+_metadata_cache: "weakref.WeakKeyDictionary[Callable, Dict[bool, _CachedMetadata]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def openai_function(func: Optional[Callable] = None, *, lazy: bool = False) -> Callable:
+    """
+    Decorator for functions to add .openai_metadata property
+
+    The function itself is returned, so calling it has no overhead. With `lazy=True` the metadata is
+    generated the first time it is accessed instead of when the function is decorated.
+    """
+
+    def decorate(function: Callable) -> Callable:
+        function.openai_metadata = (
+            LazyMetadata(function) if lazy else extract_openai_function_metadata(function)
+        )
+        return function
+
+    if func is None:
+        return decorate
+    return decorate(func)
+
+
+class LazyMetadata(Mapping):
+    """Read-only mapping of the metadata of a function, generated when it is first accessed."""
+
+    __slots__ = ("_func", "_metadata")
+
+    def __init__(self, func: Callable) -> None:
+        self._func = func
+        self._metadata: Optional[dict] = None
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = extract_openai_function_metadata(self._func)
+        return self._metadata
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._metadata is not None
+
+    def __getitem__(self, key: str) -> Any:
+        return self.metadata[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.metadata)
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def __repr__(self) -> str:
+        if self._metadata is None:
+            return f"{type(self).__name__}(<not loaded: {self._func!r}>)"
+        return f"{type(self).__name__}({self._metadata!r})"
+
+
+def extract_openai_function_metadata(
+    func: Callable, schema_cache: Optional[SchemaCache] = None, name: Optional[str] = None
+) -> dict:
+    """
+    Extracts function metadata using function signature, docstring, ...
+
+    The result is cached per function and returned as an immutable dict, see `invalidate_metadata_cache`.
+    If a schema cache is given, metadata that is not cached in memory is loaded from, or stored in, it.
+    The name defaults to `construct_function_name(func)`.
+    """
+    function_name = name if name is not None else construct_function_name(func)
+    cached = _get_cached_metadata(func, schema_cache)
+
+    metadata = cached.metadata
+    if metadata is None or metadata["name"] != function_name:
+        metadata = FrozenDict(
+            name=function_name,
+            description=cached.description or function_name,
+            parameters=cached.parameters,
+        )
+        cached.metadata = metadata
+    return metadata
+
+
+def invalidate_metadata_cache(func: Optional[Callable] = None) -> None:
+    """
+    Discards cached function metadata, e.g. after a function's docstring or signature changed.
+
+    Args:
+        func (Optional[Callable]): The function whose metadata to discard. If None, the whole cache is cleared.
+    """
+    if func is None:
+        _metadata_cache.clear()
+        return
+    try:
+        _metadata_cache.pop(getattr(func, "__func__", func), None)
+    except TypeError:
+        pass
+
+
+def _get_cached_metadata(
+    func: Callable, schema_cache: Optional[SchemaCache] = None
+) -> _CachedMetadata:
+    key = getattr(func, "__func__", func)
+    is_bound = hasattr(func, "__self__")
+    try:
+        entries = _metadata_cache.get(key)
+    except TypeError:
+        # not weak referenceable or not hashable, e.g. builtins
+        return _build_metadata(func)
+
+    if entries is None:
+        entries = _metadata_cache[key] = {}
+    cached = entries.get(is_bound)
+    if cached is None:
+        cached = entries[is_bound] = _load_or_build_metadata(func, is_bound, schema_cache)
+    return cached
+
+
+def _load_or_build_metadata(
+    func: Callable, is_bound: bool, schema_cache: Optional[SchemaCache]
+) -> _CachedMetadata:
+    if schema_cache is None:
+        return _build_metadata(func)
+
+    loaded = schema_cache.load(func, is_bound)
+    if loaded is not None:
+        description, parameters = loaded
+        return _CachedMetadata(description, freeze(parameters))
+
+    cached = _build_metadata(func)
+    schema_cache.store(func, is_bound, cached.description, cached.parameters)
+    return cached
+
+
+def get_signature(func: Callable) -> inspect.Signature:
+    """
+    Returns the signature of a function, with string annotations resolved where possible.
+
+    String annotations, e.g. of modules using `from __future__ import annotations`, are evaluated in the
+    globals of the function one by one, so one name that cannot be resolved does not keep the others
+    from being resolved. Annotations that cannot be resolved stay strings.
+    """
     sig = inspect.signature(func)
+    if not any(isinstance(param.annotation, str) for param in sig.parameters.values()):
+        return sig
+    target = func if inspect.isfunction(func) or inspect.ismethod(func) else type(func).__call__
+    namespace = getattr(inspect.unwrap(target), "__globals__", {})
+    parameters = []
+    for param in sig.parameters.values():
+        if isinstance(param.annotation, str):
+            try:
+                param = param.replace(annotation=eval(param.annotation, namespace))
+            except Exception:
+                pass
+        parameters.append(param)
+    return sig.replace(parameters=parameters)
+
+
+def _build_metadata(func: Callable) -> _CachedMetadata:
+    sig = get_signature(func)
     params = sig.parameters
     properties = {}
-    function_name = construct_function_name(func)
 
     # assumes the format from https://pypi.org/project/docstring-parser/
     docstring = parse(func.__doc__ if func.__doc__ else "")
@@ -33,18 +195,14 @@ def extract_openai_function_metadata(func: Callable) -> dict:
     for name, param in params.items():
         properties[name] = extract_parameter_properties(param, docstring_params)
 
-    metadata = {
-        "name": function_name,
-        "description": docstring.short_description or function_name,
-        "parameters": {
-            "type": "object",
-            "properties": properties,
-            "required": [
-                name for name, param in params.items() if param.default == param.empty
-            ],
-        },
+    parameters = {
+        "type": "object",
+        "properties": properties,
+        "required": [
+            name for name, param in params.items() if param.default == param.empty
+        ],
     }
-    return metadata
+    return _CachedMetadata(docstring.short_description, freeze(parameters))
 
 
 # FIXME I believe this is in broken state, check py version thing? - Jakob 101023
@@ -66,28 +224,55 @@ def extract_parameter_properties(
     """Extracts types of function parameters. Defaults to string if None found."""
     name = param.name
 
-    properties = {
-        "type": python_type_to_openapi_type(param.annotation)
-        if param.annotation != param.empty
-        else "string"  # make this configurable?
-    }
+    if param.annotation != param.empty:
+        properties = dict(type_to_schema(param.annotation))
+    else:
+        properties = {"type": "string"}  # make this configurable?
 
-    properties["description"] = docstring_params.get(name, name)
+    # descriptions from the docstring take precedence over those of Annotated types
+    if name in docstring_params or "description" not in properties:
+        properties["description"] = docstring_params.get(name, name)
 
     if isinstance(param.default, typing._LiteralGenericAlias):
         properties["enum"] = list(param.default.__args__)
         properties["default"] = param.default.__args__[0]
     else:
         if param.default != param.empty:
-            properties["default"] = param.default
+            default = param.default
+            properties["default"] = default.value if isinstance(default, enum.Enum) else default
 
     return properties
 
 
-def construct_function_name(func: Callable) -> str:
-    """Constructs a function name to uniquely identify a function or a method of an instance"""
-    if not hasattr(func, "__self__"):
-        return func.__name__
-    else:
-        # A hash is used to uniquely identify an instance
-        return f"{func.__self__.__hash__()}__{func.__name__}"
+# the names OpenAI accepts for functions
+_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+
+def construct_function_name(
+    func: Callable, alias: Optional[str] = None, namespace: Optional[str] = None
+) -> str:
+    """
+    Constructs a function name to uniquely identify a function or a method of an instance.
+
+    Methods are qualified by the name of their class, or by the alias of their instance, e.g. `Duck__quack`
+    or `donald__quack`, so the names are the same in every process. An optional namespace is prepended
+    in the same way.
+
+    Args:
+        func (Callable): The function or method.
+        alias (Optional[str]): The name that qualifies a method instead of its class.
+        namespace (Optional[str]): A prefix for the name, e.g. of the service the function belongs to.
+
+    Returns:
+        str: The name of the function.
+    """
+    for prefix in (alias, namespace):
+        if prefix is not None and not _NAME_PATTERN.match(prefix):
+            raise ValueError(
+                f'Invalid name prefix "{prefix}", only letters, digits, underscores and dashes are allowed.'
+            )
+    owner = getattr(func, "__self__", None)
+    if alias is None and owner is not None and not inspect.ismodule(owner):
+        # classmethods are bound to the class itself
+        alias = (owner if isinstance(owner, type) else type(owner)).__name__
+    return "__".join(part for part in (namespace, alias, func.__name__) if part is not None)
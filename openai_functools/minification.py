@@ -0,0 +1,123 @@
+"""Compact tool descriptions and estimates of the prompt tokens they cost."""
+import json
+from typing import Any, Callable, Dict, List
+
+from openai_functools.openai_types import map_sub_schemas
+from openai_functools.utils.frozen import FrozenDict, freeze
+
+DEFAULT_MAX_DESCRIPTION_LENGTH = 200
+
+# keys that are dropped when empty, as an empty value means the same as a missing one
+_OPTIONAL_KEYS = frozenset(("description", "required", "properties", "$defs"))
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Roughly estimates the number of tokens of a text, at ~4 characters per token."""
+    return (len(text) + 3) // 4
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.replace("_", " ").split()).lower()
+
+
+def shorten_description(description: str, max_length: int) -> str:
+    """
+    Shortens a description to at most `max_length` characters.
+
+    Args:
+        description (str): The description, e.g. the short description of a docstring.
+        max_length (int): The maximum length.
+
+    Returns:
+        str: The first sentences that fit, or else the words that fit followed by "...".
+    """
+    description = " ".join(description.split())
+    if len(description) <= max_length:
+        return description
+    cut = description[: max_length + 1]
+    sentence_end = cut.rfind(". ")
+    if sentence_end >= max_length // 2:
+        return cut[: sentence_end + 1]
+    # one character more, so a word that ends exactly at the limit is kept
+    cut = description[: max_length - 2]
+    word_end = cut.rfind(" ")
+    cut = cut[:word_end] if word_end > 0 else cut[:-1]
+    return cut.rstrip(",;:") + "..."
+
+
+def _is_redundant(description: Any, name: str) -> bool:
+    return isinstance(description, str) and _normalize(description) == _normalize(name)
+
+
+def _drop_redundant_description(schema: Any, name: str) -> Any:
+    if not isinstance(schema, dict) or not _is_redundant(schema.get("description"), name):
+        return schema
+    return {key: value for key, value in schema.items() if key != "description"}
+
+
+def _minify_schema(schema: Dict[str, Any], max_description_length: int) -> Dict[str, Any]:
+    minified = map_sub_schemas(
+        schema, lambda sub_schema: _minify_schema(sub_schema, max_description_length)
+    )
+    properties = minified.get("properties")
+    if isinstance(properties, dict):
+        minified["properties"] = {
+            name: _drop_redundant_description(property_schema, name)
+            for name, property_schema in properties.items()
+        }
+    description = minified.get("description")
+    if isinstance(description, str):
+        minified["description"] = shorten_description(description, max_description_length)
+    return {
+        key: value
+        for key, value in minified.items()
+        if key != "title" and (key not in _OPTIONAL_KEYS or value not in ("", [], {}, None))
+    }
+
+
+def minify_metadata(
+    metadata: Dict[str, Any], max_description_length: int = DEFAULT_MAX_DESCRIPTION_LENGTH
+) -> FrozenDict:
+    """
+    Creates a compact version of the metadata of a function for the tools payload.
+
+    Descriptions that only repeat the name of the function or parameter are dropped, long descriptions
+    are shortened, and titles as well as empty descriptions, `required` lists and `properties` are removed.
+
+    Args:
+        metadata (Dict[str, Any]): The metadata of the function.
+        max_description_length (int): The maximum length of a description.
+
+    Returns:
+        FrozenDict: The compact metadata.
+    """
+    minified = {"name": metadata["name"]}
+    description = metadata.get("description")
+    if description and not _is_redundant(description, metadata["name"]):
+        minified["description"] = shorten_description(description, max_description_length)
+    minified["parameters"] = _minify_schema(metadata["parameters"], max_description_length)
+    return freeze(minified)
+
+
+def estimate_payload_tokens(
+    tools: List[Dict[str, Any]], token_estimator: Callable[[str], int] = estimate_text_tokens
+) -> Dict[str, Any]:
+    """
+    Estimates the prompt tokens of tool descriptions.
+
+    Args:
+        tools (List[Dict[str, Any]]): The tool descriptions.
+        token_estimator (Callable[[str], int]): Estimates the tokens of a text, e.g. with a real tokenizer.
+
+    Returns:
+        Dict[str, Any]: The estimated tokens of the JSON of each tool keyed by function name, and of
+            the whole payload.
+    """
+    per_tool = {
+        tool["function"]["name"]: token_estimator(json.dumps(tool, separators=(",", ":")))
+        for tool in tools
+    }
+    return {
+        "tools": per_tool,
+        "total": token_estimator(json.dumps(tools, separators=(",", ":"))),
+    }
@@ -1,18 +1,391 @@
 """Types module for openapi_functools """
+import collections.abc
+import dataclasses
+import enum
+import json
+import threading
+import types
+import typing
+from typing import Any, Callable, Dict, Optional, Union
+
+from openai_functools.utils.frozen import FrozenDict, freeze
+
+SchemaBuilder = Callable[[Any], Dict[str, Any]]
+
+# the JSON schema type of the values of Literals and Enums
+_VALUE_TYPES = ((bool, "boolean"), (int, "integer"), (float, "number"), (str, "string"))
+
+_PRIMITIVE_SCHEMAS: Dict[Any, Dict[str, Any]] = {
+    str: {"type": "string"},
+    int: {"type": "integer"},
+    float: {"type": "number"},
+    bool: {"type": "boolean"},
+    list: {"type": "array"},
+    tuple: {"type": "array"},
+    set: {"type": "array", "uniqueItems": True},
+    frozenset: {"type": "array", "uniqueItems": True},
+    dict: {"type": "object"},
+    bytes: {"type": "string"},
+    type(None): {"type": "null"},
+    Any: {},
+}
+
+# keys whose values are a sub-schema, a list of sub-schemas or sub-schemas keyed by name
+_SUB_SCHEMA_KEYS = ("items", "additionalProperties")
+_SUB_SCHEMA_LIST_KEYS = ("anyOf", "oneOf", "allOf", "prefixItems")
+_SUB_SCHEMA_MAP_KEYS = ("properties", "$defs")
+
+# the schemas of types that are not primitive, memoized per type object
+_schemas: Dict[Any, FrozenDict] = {}
+_schemas_lock = threading.Lock()
+# the names of the classes the memoized schemas were built from, keyed by their canonical JSON
+_schema_names: Dict[str, str] = {}
+# types whose schema is being built, to stop at recursive dataclasses and TypedDicts
+_building = threading.local()
 
 
 def python_type_to_openapi_type(python_type: type) -> str:
-    if python_type == str:
-        return "string"
-    elif python_type == int:
-        return "integer"
-    elif python_type == float:
-        return "number"
-    elif python_type == bool:
-        return "boolean"
-    elif python_type == list:
-        return "array"
-    elif python_type == dict:
-        return "object"
+    """
+    Returns the JSON schema type name of a Python type.
+
+    Args:
+        python_type (type): The type, e.g. an annotation.
+
+    Returns:
+        str: The name of the type, "string" if the type has no single JSON type.
+    """
+    schema_type = type_to_schema(python_type).get("type")
+    return schema_type if isinstance(schema_type, str) else "string"
+
+
+def type_to_schema(python_type: Any) -> FrozenDict:
+    """
+    Returns the JSON schema of a Python type, e.g. a parameter annotation.
+
+    Supports primitives, nested generics such as `List[Dict[str, int]]`, unions and `Optional`, `Literal`,
+    `Annotated` (string metadata becomes the description), enums, dataclasses, TypedDicts and pydantic
+    models. Other types are described as strings. Schemas are memoized per type object and immutable.
+
+    Args:
+        python_type (Any): The type.
+
+    Returns:
+        FrozenDict: The JSON schema.
+    """
+    try:
+        schema = _schemas.get(python_type)
+    except TypeError:
+        # unhashable, e.g. Annotated with unhashable metadata
+        return freeze(_build_schema(python_type))
+    if schema is None:
+        building = _get_building()
+        schema = freeze(_build_schema(python_type))
+        if not building:
+            # schemas built while another one is being built may be cut at a recursive type
+            with _schemas_lock:
+                schema = _schemas.setdefault(python_type, schema)
+                if isinstance(python_type, type) and python_type not in _PRIMITIVE_SCHEMAS:
+                    _schema_names.setdefault(canonical_json(schema), python_type.__name__)
+    return schema
+
+
+def canonical_json(schema: Any) -> str:
+    """Serializes a schema so that structurally identical schemas serialize identically."""
+    return json.dumps(schema, sort_keys=True, separators=(",", ":"))
+
+
+def map_sub_schemas(schema: Dict[str, Any], function: Callable[[dict], Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of a schema whose direct sub-schemas are replaced by the result of a function.
+
+    Args:
+        schema (Dict[str, Any]): The schema.
+        function (Callable[[dict], Any]): Called with every direct sub-schema, e.g. each property.
+
+    Returns:
+        Dict[str, Any]: The copy of the schema.
+    """
+    mapped = {}
+    for key, value in schema.items():
+        if key in _SUB_SCHEMA_KEYS and isinstance(value, dict):
+            value = function(value)
+        elif key in _SUB_SCHEMA_LIST_KEYS and isinstance(value, list):
+            value = [function(item) if isinstance(item, dict) else item for item in value]
+        elif key in _SUB_SCHEMA_MAP_KEYS and isinstance(value, dict):
+            value = {
+                name: function(item) if isinstance(item, dict) else item
+                for name, item in value.items()
+            }
+        mapped[key] = value
+    return mapped
+
+
+def schema_type_name(schema: Any) -> Optional[str]:
+    """
+    Returns the name of the class a schema was generated from, e.g. to name a shared definition.
+
+    Args:
+        schema (Any): The schema.
+
+    Returns:
+        Optional[str]: The name of the class, or None if the schema was not generated from a class.
+    """
+    return _schema_names.get(canonical_json(schema))
+
+
+def register_schema_names(names: Dict[str, str]) -> None:
+    """
+    Records the names of the classes schemas were generated from, e.g. when the schemas were loaded from a cache.
+
+    Args:
+        names (Dict[str, str]): The names of the classes, keyed by the canonical JSON of their schemas.
+    """
+    with _schemas_lock:
+        for key, name in names.items():
+            _schema_names.setdefault(key, name)
+
+
+def register_type_schema(python_type: Any, schema: Union[Dict[str, Any], SchemaBuilder]) -> None:
+    """
+    Registers the JSON schema of a type, or of all subclasses of a class, that is not supported otherwise.
+
+    Args:
+        python_type (Any): The type, or the origin of a generic type, e.g. `collections.deque`.
+        schema (Union[Dict[str, Any], SchemaBuilder]): The schema, or a function that returns the schema of
+            the type, or of a parameterization of it, e.g. `deque[int]`.
+    """
+    _TYPE_BUILDERS[python_type] = schema if callable(schema) else (lambda _: dict(schema))
+    clear_type_schema_cache()
+
+
+def clear_type_schema_cache() -> None:
+    """Discards the memoized schemas, e.g. after the type hints of a dataclass changed."""
+    with _schemas_lock:
+        _schemas.clear()
+        _schema_names.clear()
+
+
+def _get_building() -> set:
+    building = getattr(_building, "types", None)
+    if building is None:
+        building = _building.types = set()
+    return building
+
+
+def _build_schema(python_type: Any) -> Dict[str, Any]:
+    primitive = _PRIMITIVE_SCHEMAS.get(python_type) if _is_hashable(python_type) else None
+    if primitive is not None:
+        return dict(primitive)
+
+    origin = typing.get_origin(python_type)
+    if origin is not None:
+        builder = _ORIGIN_BUILDERS.get(origin) or _TYPE_BUILDERS.get(origin)
+        if builder is not None:
+            return builder(python_type)
+        return _build_schema(origin)
+
+    if isinstance(python_type, type):
+        for base in python_type.__mro__:
+            builder = _TYPE_BUILDERS.get(base)
+            if builder is not None:
+                return builder(python_type)
+        for predicate, builder in _CLASS_BUILDERS:
+            if predicate(python_type):
+                return _build_guarded(python_type, builder)
+
+    return {"type": "string"}  # default
+
+
+def _is_hashable(python_type: Any) -> bool:
+    try:
+        hash(python_type)
+    except TypeError:
+        return False
+    return True
+
+
+def _build_guarded(python_type: type, builder: SchemaBuilder) -> Dict[str, Any]:
+    building = _get_building()
+    if python_type in building:
+        return {"type": "object"}
+    building.add(python_type)
+    try:
+        return builder(python_type)
+    finally:
+        building.discard(python_type)
+
+
+def _value_type(values: list) -> Dict[str, Any]:
+    for value_type, name in _VALUE_TYPES:
+        if all(type(value) is value_type for value in values):
+            return {"type": name}
+    return {}
+
+
+def _build_array(python_type: Any) -> Dict[str, Any]:
+    args = typing.get_args(python_type)
+    schema = _build_schema(typing.get_origin(python_type))
+    if args:
+        schema["items"] = type_to_schema(args[0])
+    return schema
+
+
+def _build_tuple(python_type: Any) -> Dict[str, Any]:
+    args = typing.get_args(python_type)
+    if not args:
+        return {"type": "array"}
+    if len(args) == 2 and args[1] is Ellipsis:
+        return {"type": "array", "items": type_to_schema(args[0])}
+    return {
+        "type": "array",
+        "prefixItems": [type_to_schema(arg) for arg in args],
+        "minItems": len(args),
+        "maxItems": len(args),
+    }
+
+
+def _build_mapping(python_type: Any) -> Dict[str, Any]:
+    args = typing.get_args(python_type)
+    schema = {"type": "object"}
+    if len(args) == 2 and args[1] is not Any:
+        schema["additionalProperties"] = type_to_schema(args[1])
+    return schema
+
+
+def _build_union(python_type: Any) -> Dict[str, Any]:
+    schemas = [type_to_schema(arg) for arg in typing.get_args(python_type)]
+    if all(set(schema) == {"type"} and isinstance(schema["type"], str) for schema in schemas):
+        return {"type": [schema["type"] for schema in schemas]}
+    return {"anyOf": schemas}
+
+
+def _build_literal(python_type: Any) -> Dict[str, Any]:
+    values = [
+        value.value if isinstance(value, enum.Enum) else value
+        for value in typing.get_args(python_type)
+    ]
+    return dict(_value_type(values), enum=values)
+
+
+def _build_annotated(python_type: Any) -> Dict[str, Any]:
+    schema = dict(type_to_schema(python_type.__origin__))
+    for metadata in python_type.__metadata__:
+        if isinstance(metadata, str):
+            schema["description"] = metadata
+    return schema
+
+
+def _build_enum(python_type: type) -> Dict[str, Any]:
+    values = [member.value for member in python_type]
+    return dict(_value_type(values), enum=values)
+
+
+def _build_object(python_type: type, required: Any) -> Dict[str, Any]:
+    try:
+        hints = typing.get_type_hints(python_type, include_extras=True)
+    except Exception:
+        # forward references that cannot be resolved, e.g. to classes local to a function
+        hints = dict(getattr(python_type, "__annotations__", {}))
+    return {
+        "type": "object",
+        "properties": {name: type_to_schema(hint) for name, hint in hints.items()},
+        "required": [name for name in hints if name in required],
+    }
+
+
+def _build_dataclass(python_type: type) -> Dict[str, Any]:
+    schema = _build_object(python_type, ())
+    fields = [field for field in dataclasses.fields(python_type) if field.init]
+    schema["properties"] = {
+        field.name: schema["properties"][field.name] for field in fields
+    }
+    schema["required"] = [
+        field.name
+        for field in fields
+        if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING
+    ]
+    return schema
+
+
+def _build_typed_dict(python_type: type) -> Dict[str, Any]:
+    return _build_object(python_type, python_type.__required_keys__)
+
+
+def _build_pydantic_model(python_type: type) -> Dict[str, Any]:
+    # pydantic 2 and 1 respectively, pydantic is not imported so it stays optional
+    if hasattr(python_type, "model_json_schema"):
+        schema = python_type.model_json_schema()
     else:
-        return "string"  # default
+        schema = python_type.schema()
+    definitions = {**schema.pop("$defs", {}), **schema.pop("definitions", {})}
+    return _inline_references(schema, definitions, ())
+
+
+def _inline_references(schema: Any, definitions: Dict[str, Any], resolving: tuple) -> Any:
+    """Replaces local references by the definitions they refer to, so the schema can be embedded."""
+    if isinstance(schema, list):
+        return [_inline_references(item, definitions, resolving) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    reference = schema.get("$ref")
+    if isinstance(reference, str) and reference.startswith(("#/$defs/", "#/definitions/")):
+        name = reference.rsplit("/", 1)[1]
+        if name in resolving or name not in definitions:
+            return {"type": "object"}
+        return _inline_references(definitions[name], definitions, resolving + (name,))
+    return {
+        key: _inline_references(value, definitions, resolving) for key, value in schema.items()
+    }
+
+
+def _is_pydantic_model(python_type: type) -> bool:
+    return hasattr(python_type, "model_json_schema") or (
+        hasattr(python_type, "__fields__") and hasattr(python_type, "schema")
+    )
+
+
+def _is_typed_dict(python_type: type) -> bool:
+    return issubclass(python_type, dict) and hasattr(python_type, "__required_keys__")
+
+
+# builders for the origins of generic types, e.g. list for List[int]
+_ORIGIN_BUILDERS: Dict[Any, SchemaBuilder] = {
+    list: _build_array,
+    set: _build_array,
+    frozenset: _build_array,
+    collections.abc.Sequence: _build_array,
+    collections.abc.MutableSequence: _build_array,
+    collections.abc.Set: _build_array,
+    collections.abc.MutableSet: _build_array,
+    collections.abc.Iterable: _build_array,
+    tuple: _build_tuple,
+    dict: _build_mapping,
+    collections.abc.Mapping: _build_mapping,
+    collections.abc.MutableMapping: _build_mapping,
+    Union: _build_union,
+    typing.Literal: _build_literal,
+}
+# X | Y unions are new in Python 3.10 and Annotated in 3.9
+if hasattr(types, "UnionType"):
+    _ORIGIN_BUILDERS[types.UnionType] = _build_union
+if hasattr(typing, "Annotated"):
+    _ORIGIN_BUILDERS[typing.Annotated] = _build_annotated
+
+# builders for classes and their subclasses, extended by register_type_schema
+_TYPE_BUILDERS: Dict[Any, SchemaBuilder] = {
+    enum.Enum: _build_enum,
+}
+
+# builders for classes that are recognized by their attributes rather than a base class
+_CLASS_BUILDERS = (
+    (dataclasses.is_dataclass, _build_dataclass),
+    (_is_typed_dict, _build_typed_dict),
+    (_is_pydantic_model, _build_pydantic_model),
+)
+
+# abstract collections without parameters, e.g. a plain Sequence annotation
+for _origin, _builder in list(_ORIGIN_BUILDERS.items()):
+    if _builder is _build_array and _origin not in _PRIMITIVE_SCHEMAS:
+        _PRIMITIVE_SCHEMAS[_origin] = {"type": "array"}
+    elif _builder is _build_mapping and _origin not in _PRIMITIVE_SCHEMAS:
+        _PRIMITIVE_SCHEMAS[_origin] = {"type": "object"}
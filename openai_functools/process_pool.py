@@ -0,0 +1,65 @@
+"""Dispatch of function calls to worker processes by the qualified name of the function."""
+import importlib
+from typing import Any, Callable, Dict, Tuple
+
+FunctionReference = Tuple[str, str]
+
+# functions resolved by a worker process, so each one is imported once per worker
+_resolved_functions: Dict[FunctionReference, Callable] = {}
+
+
+def function_reference(func: Callable) -> FunctionReference:
+    """
+    Returns the module and qualified name by which a worker process can import a function.
+
+    Args:
+        func (Callable): The function.
+
+    Returns:
+        FunctionReference: The module and qualified name of the function.
+
+    Raises:
+        ValueError: If the function cannot be imported by name, e.g. a bound method, lambda or nested function.
+    """
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if hasattr(func, "__self__") or module is None or qualname is None or "<" in qualname:
+        raise ValueError(
+            f'Function "{getattr(func, "__name__", func)}" cannot be executed in a process, only functions '
+            f"defined at the top level of a module or class can be."
+        )
+    return module, qualname
+
+
+def resolve(reference: FunctionReference) -> Callable:
+    """
+    Imports the function a reference refers to.
+
+    Args:
+        reference (FunctionReference): The module and qualified name of the function.
+
+    Returns:
+        Callable: The function.
+    """
+    func = _resolved_functions.get(reference)
+    if func is None:
+        module, qualname = reference
+        func = importlib.import_module(module)
+        for name in qualname.split("."):
+            func = getattr(func, name)
+        _resolved_functions[reference] = func
+    return func
+
+
+def call_in_worker(reference: FunctionReference, arguments: Dict[str, Any]) -> Any:
+    """
+    Calls a function by reference, in a worker process.
+
+    Args:
+        reference (FunctionReference): The module and qualified name of the function.
+        arguments (Dict[str, Any]): The validated arguments of the call.
+
+    Returns:
+        Any: The return value of the function, which must be picklable.
+    """
+    return resolve(reference)(**arguments)
@@ -0,0 +1,171 @@
+"""Memoization of the results of idempotent functions."""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResultCacheBackend(ABC):
+    """
+    Storage for cached function results.
+
+    Implement this interface to share cached results between processes, e.g. through Redis or memcached.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """
+        Returns the value stored for a key.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Any: The stored value.
+
+        Raises:
+            KeyError: If no value, or only an expired one, is stored for the key.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value for a key.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+            ttl (Optional[float]): The number of seconds after which the value expires. If None, it does not expire.
+        """
+
+    def clear(self) -> None:
+        """Removes all stored values."""
+
+
+class InMemoryResultCacheBackend(ResultCacheBackend):
+    """An in-process least recently used store with expiring entries."""
+
+    def __init__(self, maxsize: Optional[int] = 128) -> None:
+        """
+        Initializes the store.
+
+        Args:
+            maxsize (Optional[int]): The maximum number of stored values. If None, the size is not bounded.
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            expires_at, value = self._entries[key]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """
+    Caches the results of a function keyed by its canonicalized JSON arguments.
+
+    Only use it for functions whose result depends on their arguments alone, e.g. read-only lookups.
+    """
+
+    def __init__(
+        self,
+        function_name: str,
+        ttl: Optional[float] = None,
+        backend: Optional[ResultCacheBackend] = None,
+    ) -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            function_name (str): The name of the function, used to namespace the keys in a shared backend.
+            ttl (Optional[float]): The number of seconds a result is cached. If None, results do not expire.
+            backend (Optional[ResultCacheBackend]): The store for the results. If None, an in-process store is used.
+        """
+        self.function_name = function_name
+        self.ttl = ttl
+        self.backend = backend if backend is not None else InMemoryResultCacheBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, arguments: Dict[str, Any]) -> str:
+        """
+        Creates the cache key of a call.
+
+        Args:
+            arguments (Dict[str, Any]): The arguments of the call.
+
+        Returns:
+            str: The function name followed by the arguments as canonical JSON.
+        """
+        canonical_arguments = json.dumps(
+            arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+        return f"{self.function_name}:{canonical_arguments}"
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up the cached result of a call.
+
+        Args:
+            key (str): The cache key of the call.
+
+        Returns:
+            Tuple[bool, Any]: Whether the result was cached, and the result if it was.
+        """
+        try:
+            value = self.backend.get(key)
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def store(self, key: str, value: Any) -> None:
+        """
+        Caches the result of a call.
+
+        Args:
+            key (str): The cache key of the call.
+            value (Any): The result of the call.
+        """
+        self.backend.set(key, value, self.ttl)
+
+    def clear(self) -> None:
+        """Removes all cached results and resets the counters."""
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit and miss counters of the cache.
+
+        Returns:
+            Dict[str, int]: The number of hits and misses.
+        """
+        return {"hits": self.hits, "misses": self.misses}
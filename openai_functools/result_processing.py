@@ -0,0 +1,125 @@
+"""Post-processors that bound the size of function results before they are sent to the model."""
+from collections.abc import Iterator
+from typing import Any, Callable, Optional
+
+ResultProcessor = Callable[[Any], Any]
+
+DEFAULT_MARKER = "\n... [{omitted} bytes omitted] ...\n"
+
+
+def _cut(encoded: bytes, start: int, end: int) -> str:
+    # cutting inside a multi-byte character drops that character
+    return encoded[start:end].decode("utf-8", errors="ignore")
+
+
+def truncate(
+    max_bytes: int, mode: str = "head_tail", marker: str = DEFAULT_MARKER
+) -> ResultProcessor:
+    """
+    Creates a processor that truncates string results to at most `max_bytes` UTF-8 encoded bytes.
+
+    Args:
+        max_bytes (int): The maximum size of a result, excluding the marker.
+        mode (str): Which part to keep: "head", "tail", or "head_tail" to keep both ends.
+        marker (str): Inserted where the result was truncated, `{omitted}` is replaced by the number of omitted bytes.
+
+    Returns:
+        ResultProcessor: The processor. Results that are not strings are passed through.
+    """
+    if mode not in ("head", "tail", "head_tail"):
+        raise ValueError(f'Unknown truncation mode "{mode}".')
+
+    def process(result: Any) -> Any:
+        if not isinstance(result, str) or len(result) <= max_bytes // 4:
+            return result
+        encoded = result.encode("utf-8")
+        size = len(encoded)
+        if size <= max_bytes:
+            return result
+        omitted = marker.format(omitted=size - max_bytes)
+        if mode == "head":
+            return _cut(encoded, 0, max_bytes) + omitted
+        if mode == "tail":
+            return omitted + _cut(encoded, size - max_bytes, size)
+        head = max_bytes - max_bytes // 2
+        return _cut(encoded, 0, head) + omitted + _cut(encoded, size - (max_bytes - head), size)
+
+    return process
+
+
+def consume(
+    max_bytes: int, separator: str = "", marker: str = "\n... [truncated] ...\n"
+) -> ResultProcessor:
+    """
+    Creates a processor that lazily consumes results that are iterators, e.g. of generator functions.
+
+    Items are converted to strings and joined until `max_bytes` UTF-8 encoded bytes are reached, after which
+    the iterator is closed, so the rest of the output is never produced.
+
+    Args:
+        max_bytes (int): The maximum size of the joined result, excluding the marker.
+        separator (str): Inserted between the items.
+        marker (str): Appended if the iterator was not consumed completely.
+
+    Returns:
+        ResultProcessor: The processor. Results that are not iterators are passed through.
+    """
+
+    def process(result: Any) -> Any:
+        if not isinstance(result, Iterator):
+            return result
+        parts = []
+        size = 0
+        separator_size = len(separator.encode("utf-8"))
+        truncated = False
+        try:
+            for item in result:
+                part = item if isinstance(item, str) else str(item)
+                part_size = len(part.encode("utf-8")) + (separator_size if parts else 0)
+                if size + part_size > max_bytes:
+                    remaining = max_bytes - size - (separator_size if parts else 0)
+                    if remaining > 0:
+                        parts.append(_cut(part.encode("utf-8"), 0, remaining))
+                    truncated = True
+                    break
+                parts.append(part)
+                size += part_size
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        joined = separator.join(parts)
+        return joined + marker if truncated else joined
+
+    return process
+
+
+def summarize(
+    summarizer: Callable[[str], str], threshold_bytes: int
+) -> ResultProcessor:
+    """
+    Creates a processor that replaces string results larger than `threshold_bytes` by a summary.
+
+    Args:
+        summarizer (Callable[[str], str]): Summarizes a result, e.g. with a cheaper model.
+        threshold_bytes (int): The size above which results are summarized.
+
+    Returns:
+        ResultProcessor: The processor. Results that are not strings are passed through.
+    """
+
+    def process(result: Any) -> Any:
+        if isinstance(result, str) and len(result.encode("utf-8")) > threshold_bytes:
+            return summarizer(result)
+        return result
+
+    return process
+
+
+def apply_processors(result: Any, *processor_lists: Optional[list]) -> Any:
+    """Applies the processors of every list to a result, in order."""
+    for processors in processor_lists:
+        if processors:
+            for processor in processors:
+                result = processor(result)
+    return result
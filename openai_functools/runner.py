@@ -0,0 +1,205 @@
+import json
+from typing import Any, Callable, List, Optional
+
+from openai_functools.functions_orchestrator import FunctionsOrchestrator
+from openai_functools.streaming import ToolCallStreamAccumulator
+from openai_functools.utils.conversation import Conversation, Message
+
+
+class MaxIterationsExceededError(RuntimeError):
+    """Raised when the model still requests tool calls after the maximum number of iterations."""
+
+
+def format_tool_result(result: Any) -> str:
+    """
+    Formats the result of a tool call as the content of a tool message.
+
+    Args:
+        result (Any): The result of the tool call, or the exception it raised.
+
+    Returns:
+        str: The result as a string, JSON encoded unless it already is a string.
+    """
+    if isinstance(result, str):
+        return result
+    if isinstance(result, Exception):
+        return f"Error: {type(result).__name__}: {result}"
+    return json.dumps(result, default=str)
+
+
+class ConversationRunner:
+    """
+    Drives the function calling loop of a conversation to completion.
+
+    Each iteration sends the conversation to the model, executes the requested tool calls concurrently
+    with the orchestrator and adds their results to the conversation, until the model answers without
+    requesting tool calls. With `stream=True` each tool call is executed as soon as its arguments have
+    been streamed, while the model is still generating the rest of the response.
+    """
+
+    def __init__(
+        self,
+        orchestrator: FunctionsOrchestrator,
+        client: Any,
+        model: str,
+        max_iterations: int = 10,
+        tool_set: Optional[str] = None,
+        selected_functions: Optional[List[str]] = None,
+        result_formatter: Callable[[Any], str] = format_tool_result,
+        stream: bool = False,
+        compact_tools: bool = False,
+        top_k_tools: Optional[int] = None,
+        **request_options: Any,
+    ) -> None:
+        """
+        Initializes the runner.
+
+        Args:
+            orchestrator (FunctionsOrchestrator): The orchestrator with the registered functions.
+            client (Any): An OpenAI client, or any object with a compatible `chat.completions.create` method.
+                A callable accepting the same keyword arguments can be passed as well.
+            model (str): The model to use.
+            max_iterations (int): The maximum number of requests to the model per run.
+            tool_set (Optional[str]): The name of a tool set of the orchestrator to offer to the model.
+            selected_functions (Optional[List[str]]): The names of the functions to offer to the model. If neither
+                this nor `tool_set` is given, all registered functions are offered.
+            result_formatter (Callable[[Any], str]): Formats the result of a tool call as message content.
+            stream (bool): Whether to stream the responses of the model and execute tool calls while streaming.
+                Only supported by `run`.
+            compact_tools (bool): Whether to send compact tool descriptions, see `create_tools_descriptions`.
+            top_k_tools (Optional[int]): If set, only the functions most relevant to the latest user message are
+                offered to the model, at most this many, see `FunctionsOrchestrator.select_tools`.
+            **request_options (Any): Additional arguments for every request, e.g. `temperature`.
+        """
+        self.orchestrator = orchestrator
+        self.model = model
+        self.max_iterations = max_iterations
+        self.tool_set = tool_set
+        self.selected_functions = selected_functions
+        self.result_formatter = result_formatter
+        self.stream = stream
+        self.compact_tools = compact_tools
+        self.top_k_tools = top_k_tools
+        self.request_options = request_options
+        self._create = client if callable(client) else client.chat.completions.create
+
+    def run(self, conversation: Conversation) -> Any:
+        """
+        Runs the conversation until the model answers without requesting tool calls.
+
+        Args:
+            conversation (Conversation): The conversation, which is extended with the messages of the run.
+
+        Returns:
+            Any: The final response of the model, or when streaming the `ToolCallStreamAccumulator` of it.
+        """
+        for _ in range(self.max_iterations):
+            if self.stream:
+                accumulator = ToolCallStreamAccumulator(self.orchestrator)
+                for chunk in self._create(**self._request(conversation), stream=True):
+                    accumulator.add_chunk(chunk)
+                tool_calls = accumulator.tool_calls or None
+                conversation.append(
+                    Message("assistant", accumulator.content, tool_calls=tool_calls)
+                )
+                if tool_calls is None:
+                    return accumulator
+                results = accumulator.results()
+            else:
+                response = self._create(**self._request(conversation))
+                if not self._add_response(conversation, response):
+                    return response
+                results = self.orchestrator.call_function(response, concurrent=True)
+            self._add_results(conversation, results)
+        raise MaxIterationsExceededError(
+            f"The model still requested tool calls after {self.max_iterations} iterations."
+        )
+
+    async def arun(self, conversation: Conversation) -> Any:
+        """
+        Runs the conversation with an async client until the model answers without requesting tool calls.
+
+        Args:
+            conversation (Conversation): The conversation, which is extended with the messages of the run.
+
+        Returns:
+            Any: The final response of the model.
+        """
+        for _ in range(self.max_iterations):
+            response = await self._create(**self._request(conversation))
+            if not self._add_response(conversation, response):
+                return response
+            results = await self.orchestrator.acall_function(response)
+            self._add_results(conversation, results)
+        raise MaxIterationsExceededError(
+            f"The model still requested tool calls after {self.max_iterations} iterations."
+        )
+
+    def _request(self, conversation: Conversation) -> dict:
+        if self.top_k_tools is None:
+            tools = self.orchestrator.create_tools_descriptions(
+                self.selected_functions, tool_set=self.tool_set, compact=self.compact_tools
+            )
+        else:
+            tools = self.orchestrator.create_tools_descriptions(
+                self._select_tools(conversation), compact=self.compact_tools
+            )
+        request = dict(
+            self.request_options,
+            model=self.model,
+            messages=conversation.conversation_history,
+        )
+        # the API rejects an empty list of tools
+        if tools:
+            request["tools"] = tools
+        return request
+
+    def _select_tools(self, conversation: Conversation) -> List[str]:
+        query = next(
+            (
+                message.content
+                for message in reversed(conversation.messages)
+                if message.role == "user" and isinstance(message.content, str)
+            ),
+            "",
+        )
+        if self.tool_set is not None:
+            tool_sets = self.orchestrator.tool_sets
+            if self.tool_set not in tool_sets:
+                raise ValueError(f'Tool set "{self.tool_set}" is not defined.')
+            allowed = set(tool_sets[self.tool_set])
+        elif self.selected_functions is not None:
+            allowed = set(self.selected_functions)
+        else:
+            return self.orchestrator.select_tools(query, self.top_k_tools)
+        # rank all functions, as the most relevant ones may not be allowed
+        selected = self.orchestrator.select_tools(query, len(self.orchestrator.function_specs))
+        return [name for name in selected if name in allowed][: self.top_k_tools]
+
+    @staticmethod
+    def _add_response(conversation: Conversation, response: Any) -> bool:
+        """Adds the response message to the conversation and returns whether it requests tool calls."""
+        response_message = response.choices[0].message
+        tool_calls = response_message.tool_calls or None
+        if tool_calls is not None:
+            tool_calls = [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {
+                        "name": tool_call.function.name,
+                        "arguments": tool_call.function.arguments,
+                    },
+                }
+                for tool_call in tool_calls
+            ]
+        conversation.append(
+            Message("assistant", response_message.content, tool_calls=tool_calls)
+        )
+        return tool_calls is not None
+
+    def _add_results(self, conversation: Conversation, results: dict) -> None:
+        for tool_call_id, result in results.items():
+            conversation.append(
+                Message("tool", self.result_formatter(result), tool_call_id=tool_call_id)
+            )
@@ -0,0 +1,276 @@
+"""Persistent on-disk cache of generated function metadata, to speed up cold starts."""
+import atexit
+import dataclasses
+import enum
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import typing
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from openai_functools.openai_types import register_schema_names
+from openai_functools.schema_interning import definition_names
+from openai_functools.utils.frozen import FrozenDict, freeze
+
+SCHEMA_CACHE_ENVIRONMENT_VARIABLE = "OPENAI_FUNCTOOLS_SCHEMA_CACHE"
+
+# Bump whenever the generated metadata changes, so caches written by other versions are discarded.
+_FORMAT_VERSION = 3
+
+
+class SchemaCache:
+    """
+    Loads and saves the name independent metadata of functions from a JSON file.
+
+    Entries are keyed by the qualified name of a function and store a fingerprint of its signature,
+    code, docstring and the fields of the classes it is annotated with, e.g. of a dataclass, so stale
+    entries are detected and regenerated. Entries also store the names of the classes their
+    sub-schemas were generated from, to name shared definitions. The file is read once, when the
+    cache is opened, and written by `save`.
+    """
+
+    _instances: Dict[str, "SchemaCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str, autosave: bool = True) -> None:
+        """
+        Initializes the cache and loads the entries of its file, if it exists.
+
+        Args:
+            path (str): The path of the cache file.
+            autosave (bool): Whether to save changed entries when the interpreter exits.
+        """
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = self._read()
+        self._dirty = False
+        self._lock = threading.Lock()
+        if autosave:
+            atexit.register(self.save)
+
+    @classmethod
+    def open(cls, path: str) -> "SchemaCache":
+        """
+        Returns the cache of a file, shared by all callers within the process.
+
+        Args:
+            path (str): The path of the cache file.
+
+        Returns:
+            SchemaCache: The cache of the file.
+        """
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            schema_cache = cls._instances.get(path)
+            if schema_cache is None:
+                schema_cache = cls._instances[path] = cls(path)
+            return schema_cache
+
+    @classmethod
+    def from_environment(cls) -> Optional["SchemaCache"]:
+        """
+        Returns the cache of the file named by the OPENAI_FUNCTOOLS_SCHEMA_CACHE environment variable.
+
+        Returns:
+            Optional[SchemaCache]: The cache, or None if the environment variable is not set.
+        """
+        path = os.environ.get(SCHEMA_CACHE_ENVIRONMENT_VARIABLE)
+        return cls.open(path) if path else None
+
+    def load(self, func: Callable, is_bound: bool) -> Optional[Tuple[Optional[str], dict]]:
+        """
+        Looks up the metadata of a function.
+
+        Args:
+            func (Callable): The function.
+            is_bound (bool): Whether the function is a bound method, whose first parameter is not part of its metadata.
+
+        Returns:
+            Optional[Tuple[Optional[str], dict]]: The description and parameters of the function, or None if there
+                is no entry or it is stale.
+        """
+        key, fingerprint = self._key(func, is_bound)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        # the names of shared definitions, so tool descriptions are the same as when generated
+        register_schema_names(entry["names"])
+        return entry["description"], entry["parameters"]
+
+    def store(
+        self, func: Callable, is_bound: bool, description: Optional[str], parameters: dict
+    ) -> None:
+        """
+        Stores the metadata of a function.
+
+        Args:
+            func (Callable): The function.
+            is_bound (bool): Whether the function is a bound method.
+            description (Optional[str]): The description taken from the docstring of the function.
+            parameters (dict): The parameters schema of the function.
+        """
+        key, fingerprint = self._key(func, is_bound)
+        if key is None:
+            return
+        try:
+            # only keep entries that survive the round trip, e.g. not ones with datetime defaults
+            json.dumps(parameters)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._entries[key] = {
+                "fingerprint": fingerprint,
+                "description": description,
+                "parameters": parameters,
+                "names": definition_names(parameters),
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the entries to the cache file if they changed since it was read or last saved."""
+        with self._lock:
+            if not self._dirty:
+                return
+            content = json.dumps({"version": _FORMAT_VERSION, "entries": self._entries})
+            self._dirty = False
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                # the loaded metadata is immutable, like generated metadata, without converting it again
+                content = json.load(file, object_pairs_hook=_frozen_object)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(content, dict) or content.get("version") != _FORMAT_VERSION:
+            return {}
+        return dict(content.get("entries", {}))
+
+    @staticmethod
+    def _key(func: Callable, is_bound: bool) -> Tuple[Optional[str], Optional[str]]:
+        func = getattr(func, "__func__", func)
+        unwrapped = inspect.unwrap(func)
+        code = getattr(unwrapped, "__code__", None)
+        qualname = getattr(func, "__qualname__", None)
+        if code is None or qualname is None:
+            return None, None
+
+        key = f"{func.__module__}.{qualname}{'#bound' if is_bound else ''}"
+        signature = (
+            code.co_argcount,
+            code.co_posonlyargcount,
+            code.co_kwonlyargcount,
+            code.co_flags,
+            code.co_varnames[: code.co_nlocals],
+            getattr(unwrapped, "__defaults__", None),
+            getattr(unwrapped, "__kwdefaults__", None),
+            getattr(unwrapped, "__annotations__", None),
+        )
+        fingerprint = hashlib.sha256(
+            repr((signature, code.co_code, func.__doc__, _annotation_fingerprint(unwrapped))).encode("utf-8")
+        ).hexdigest()
+        return key, fingerprint
+
+
+def _frozen_object(pairs: list) -> FrozenDict:
+    # nested objects are already frozen, as they are decoded first
+    return FrozenDict([(key, freeze(value)) if type(value) is list else (key, value) for key, value in pairs])
+
+
+_NAME = re.compile(r"[A-Za-z_][\w.]*")
+
+
+def _annotation_fingerprint(func: Callable) -> Tuple:
+    """
+    Returns the fields of the classes the annotations of a function reference, directly or through fields.
+
+    Schemas change with these fields, e.g. when a dataclass gets a field, while the annotations still
+    look the same. Only attributes are read, without generating the schemas again.
+    """
+    classes: Dict[type, Any] = {}
+    namespace = getattr(func, "__globals__", {})
+    for annotation in (getattr(func, "__annotations__", None) or {}).values():
+        _collect_classes(annotation, namespace, classes)
+    return tuple(classes.values())
+
+
+def _collect_classes(annotation: Any, namespace: Dict[str, Any], classes: Dict[type, Any]) -> None:
+    if isinstance(annotation, typing.ForwardRef):
+        annotation = annotation.__forward_arg__
+    if isinstance(annotation, str):
+        # string annotations are not evaluated, the classes are looked up by the names they contain
+        for name in _NAME.findall(annotation):
+            value = _lookup(name, namespace)
+            if value is not None and not isinstance(value, str):
+                _collect_classes(value, namespace, classes)
+        return
+    args = typing.get_args(annotation)
+    if args:
+        for arg in args:
+            # strings among the arguments are Literal values or Annotated descriptions, not types
+            if not isinstance(arg, str):
+                _collect_classes(arg, namespace, classes)
+        return
+    if not isinstance(annotation, type) or annotation in classes or annotation.__module__ == "builtins":
+        return
+
+    classes[annotation] = None
+    class_namespace = getattr(sys.modules.get(annotation.__module__), "__dict__", {})
+    fields = []
+    for base in reversed(annotation.__mro__):
+        for name, hint in vars(base).get("__annotations__", {}).items():
+            fields.append((name, repr(hint)))
+            _collect_classes(hint, class_namespace, classes)
+    classes[annotation] = (
+        annotation.__module__,
+        annotation.__qualname__,
+        tuple(fields),
+        _class_details(annotation),
+    )
+
+
+def _class_details(cls: type) -> Any:
+    """Returns what the schema of a class depends on, besides the annotations of its fields."""
+    if issubclass(cls, enum.Enum):
+        return tuple((member.name, repr(member.value)) for member in cls)
+    if dataclasses.is_dataclass(cls):
+        return tuple(
+            (
+                field.name,
+                field.init,
+                field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING,
+            )
+            for field in dataclasses.fields(cls)
+        )
+    # TypedDicts, and pydantic 2 and 1 models respectively
+    required_keys = getattr(cls, "__required_keys__", None)
+    if required_keys is not None:
+        return tuple(sorted(required_keys))
+    return repr(getattr(cls, "model_fields", None) or getattr(cls, "__fields__", None))
+
+
+def _lookup(name: str, namespace: Dict[str, Any]) -> Any:
+    head, *attributes = name.split(".")
+    value = namespace.get(head)
+    for attribute in attributes:
+        value = getattr(value, attribute, None)
+    return value
@@ -0,0 +1,193 @@
+"""Deduplication of repeated sub-schemas in tool descriptions into shared definitions."""
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+from openai_functools.openai_types import canonical_json, map_sub_schemas, schema_type_name
+from openai_functools.utils.frozen import FrozenDict, freeze
+
+# keys that describe how a schema is used rather than its structure, kept next to the reference
+_USAGE_KEYS = frozenset(("description", "default", "title"))
+
+_REFERENCE_PATTERN = re.compile(rb'"\$ref":"#/\$defs/([^"]+)"')
+
+
+def _split(schema: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    core = {key: value for key, value in schema.items() if key not in _USAGE_KEYS}
+    usage = {key: value for key, value in schema.items() if key in _USAGE_KEYS}
+    return core, usage
+
+
+class SchemaInterner:
+    """
+    Interning table of the sub-schemas shared by tool descriptions.
+
+    Structurally identical sub-schemas that are repeated within the parameters of a tool, e.g. two
+    `Address` parameters, are moved to the `$defs` of the parameters and referenced, when that makes the
+    parameters smaller. OpenAI resolves references per tool, so every tool carries the definitions it
+    uses, but each definition is stored once in the table and has the same name in every tool. Names are
+    taken from the classes the schemas were generated from.
+    """
+
+    def __init__(self) -> None:
+        # the names of the definitions, keyed by the canonical JSON of the sub-schema they replace
+        self._names: Dict[str, str] = {}
+        self._used_names: Set[str] = set()
+        # the definitions, keyed by their canonical JSON
+        self._definitions: Dict[str, FrozenDict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._definitions)
+
+    def deduplicate(self, parameters: Dict[str, Any]) -> FrozenDict:
+        """
+        Moves the repeated sub-schemas of a parameters schema to its `$defs`.
+
+        Args:
+            parameters (Dict[str, Any]): The "parameters" object of the function metadata.
+
+        Returns:
+            FrozenDict: The parameters with references to shared definitions, or the parameters
+                themselves if nothing is repeated.
+        """
+        counts: Counter = Counter()
+
+        def count(schema: Dict[str, Any]) -> Dict[str, Any]:
+            counts[canonical_json(_split(schema)[0])] += 1
+            map_sub_schemas(schema, count)
+            return schema
+
+        map_sub_schemas(parameters, count)
+        hoisted = {key for key, occurrences in counts.items() if occurrences > 1}
+
+        # sub-schemas nested in hoisted ones are referenced less often than they occur, so drop
+        # those that no longer pay for their definition until the result is stable
+        while hoisted:
+            references: Counter = Counter()
+            definitions: Dict[str, Any] = {}
+            rewritten = self._rewrite(parameters, hoisted, references, definitions)
+            unprofitable = {key for key in hoisted if not self._saves(key, references[key])}
+            if not unprofitable:
+                break
+            hoisted -= unprofitable
+
+        if not hoisted:
+            return parameters if isinstance(parameters, FrozenDict) else freeze(parameters)
+        rewritten["$defs"] = {
+            self._names[key]: self._intern(definition) for key, definition in definitions.items()
+        }
+        return freeze(rewritten)
+
+    def _rewrite(
+        self,
+        parameters: Dict[str, Any],
+        hoisted: Set[str],
+        references: Counter,
+        definitions: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        def visit(schema: Dict[str, Any]) -> Dict[str, Any]:
+            core, usage = _split(schema)
+            key = canonical_json(core)
+            if key not in hoisted:
+                return map_sub_schemas(schema, visit)
+            references[key] += 1
+            if key not in definitions:
+                definitions[key] = None
+                definitions[key] = map_sub_schemas(core, visit)
+            return {"$ref": f"#/$defs/{self._name(key, core)}", **usage}
+
+        return map_sub_schemas(parameters, visit)
+
+    def _saves(self, key: str, references: int) -> bool:
+        """Whether referencing a sub-schema, whose canonical JSON is `key`, is smaller than inlining it."""
+        if references < 2:
+            return False
+        name = self._names[key]
+        reference_size = len('{"$ref":"#/$defs/"}') + len(name)
+        definition_size = len('"":,') + len(name) + len(key)
+        return references * len(key) > references * reference_size + definition_size
+
+    def _name(self, key: str, core: Dict[str, Any]) -> str:
+        name = self._names.get(key)
+        if name is None:
+            with self._lock:
+                name = self._names.get(key)
+                if name is None:
+                    base = schema_type_name(core) or (
+                        "Schema_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+                    )
+                    name = base
+                    number = 1
+                    while name in self._used_names:
+                        number += 1
+                        name = f"{base}_{number}"
+                    self._used_names.add(name)
+                    self._names[key] = name
+        return name
+
+    def _intern(self, definition: Dict[str, Any]) -> FrozenDict:
+        # keyed by the rewritten definition, as the sub-schemas it references differ between tools
+        key = canonical_json(definition)
+        interned = self._definitions.get(key)
+        if interned is None:
+            with self._lock:
+                interned = self._definitions.setdefault(key, freeze(definition))
+        return interned
+
+
+def definition_names(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Returns the names that repeated sub-schemas of a parameters schema get as shared definitions.
+
+    The names are taken from the classes the sub-schemas were generated from, which are only known in the
+    process that generated them, so they are stored alongside cached metadata, see `register_schema_names`.
+
+    Args:
+        parameters (Dict[str, Any]): The "parameters" object of the function metadata.
+
+    Returns:
+        Dict[str, str]: The names of the classes, keyed by the canonical JSON of their schemas.
+    """
+    names: Dict[str, str] = {}
+
+    def visit(schema: Dict[str, Any]) -> Dict[str, Any]:
+        core = _split(schema)[0]
+        name = schema_type_name(core)
+        if name is not None:
+            names[canonical_json(core)] = name
+        map_sub_schemas(schema, visit)
+        return schema
+
+    map_sub_schemas(parameters, visit)
+    return names
+
+
+def definitions_report(
+    tools: List[Dict[str, Any]], deduplicated_tools: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Reports the size of tool descriptions before and after deduplicating their sub-schemas.
+
+    Args:
+        tools (List[Dict[str, Any]]): The tool descriptions with inline sub-schemas.
+        deduplicated_tools (List[Dict[str, Any]]): The tool descriptions with shared definitions.
+
+    Returns:
+        Dict[str, Any]: The original, deduplicated and saved bytes of the JSON payload, and the number of
+            references to each definition.
+    """
+    original = json.dumps(tools, separators=(",", ":")).encode("utf-8")
+    deduplicated = json.dumps(deduplicated_tools, separators=(",", ":")).encode("utf-8")
+    references = Counter(
+        name.decode("utf-8") for name in _REFERENCE_PATTERN.findall(deduplicated)
+    )
+    return {
+        "original_bytes": len(original),
+        "deduplicated_bytes": len(deduplicated),
+        "saved_bytes": len(original) - len(deduplicated),
+        "references": dict(references),
+    }
@@ -0,0 +1,126 @@
+"""Execution of tool calls from streamed responses."""
+import json
+from concurrent import futures
+from typing import Any, Dict, List, Optional, Tuple
+
+from openai_functools.functions_orchestrator import CallStart, FunctionsOrchestrator
+
+
+class _PartialToolCall:
+    __slots__ = ("id", "name", "arguments", "dispatched")
+
+    def __init__(self) -> None:
+        self.id: Optional[str] = None
+        self.name = ""
+        self.arguments = ""
+        self.dispatched = False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.name, "arguments": self.arguments},
+        }
+
+
+class ToolCallStreamAccumulator:
+    """
+    Rebuilds the tool calls of a streamed response and executes each one as soon as it is complete.
+
+    Feed every chunk of a `stream=True` response to `add_chunk`. A tool call is dispatched to the
+    orchestrator's executor the moment its arguments form a complete JSON object (or the stream moves
+    on to the next tool call or finishes), so tool execution overlaps with the rest of the generation.
+    """
+
+    def __init__(self, orchestrator: FunctionsOrchestrator) -> None:
+        """
+        Initializes the accumulator.
+
+        Args:
+            orchestrator (FunctionsOrchestrator): The orchestrator executing the tool calls.
+        """
+        self.orchestrator = orchestrator
+        self.finish_reason: Optional[str] = None
+        self._content: List[str] = []
+        self._tool_calls: Dict[int, _PartialToolCall] = {}
+        self._pending: Dict[str, Tuple[futures.Future, CallStart]] = {}
+
+    def add_chunk(self, chunk: Any) -> None:
+        """
+        Adds a chunk of the stream.
+
+        Args:
+            chunk (Any): A chunk of a streamed chat completion.
+        """
+        if not chunk.choices:
+            return
+        choice = chunk.choices[0]
+        delta = choice.delta
+
+        if delta.content:
+            self._content.append(delta.content)
+
+        for tool_call_delta in delta.tool_calls or ():
+            index = tool_call_delta.index
+            tool_call = self._tool_calls.get(index)
+            if tool_call is None:
+                # calls are streamed one after another, so the previous ones are complete
+                for previous in self._tool_calls.values():
+                    self._dispatch(previous)
+                tool_call = self._tool_calls[index] = _PartialToolCall()
+            if tool_call_delta.id:
+                tool_call.id = tool_call_delta.id
+            function = tool_call_delta.function
+            if function is not None:
+                if function.name:
+                    tool_call.name += function.name
+                if function.arguments:
+                    tool_call.arguments += function.arguments
+                    if self._is_complete(tool_call.arguments):
+                        self._dispatch(tool_call)
+
+        if choice.finish_reason is not None:
+            self.finish_reason = choice.finish_reason
+            for tool_call in self._tool_calls.values():
+                self._dispatch(tool_call)
+
+    @property
+    def content(self) -> Optional[str]:
+        """The text content of the response so far."""
+        return "".join(self._content) if self._content else None
+
+    @property
+    def tool_calls(self) -> List[dict]:
+        """The tool calls of the response so far, in the format of the API."""
+        return [
+            self._tool_calls[index].to_dict() for index in sorted(self._tool_calls)
+        ]
+
+    def results(self) -> dict:
+        """
+        Waits for the dispatched tool calls to complete.
+
+        Tool calls that are still incomplete are dispatched first. A tool call that fails or exceeds the
+        orchestrator's timeout has its exception returned in place of its result.
+
+        Returns:
+            dict: The result of every tool call keyed by its id.
+        """
+        for tool_call in self._tool_calls.values():
+            self._dispatch(tool_call)
+        return self.orchestrator._collect_results(self._pending)
+
+    def _dispatch(self, tool_call: _PartialToolCall) -> None:
+        if tool_call.dispatched:
+            return
+        tool_call.dispatched = True
+        self._pending[tool_call.id] = self.orchestrator._submit(tool_call.name, tool_call.arguments or "{}")
+
+    @staticmethod
+    def _is_complete(arguments: str) -> bool:
+        if not arguments.rstrip().endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads(arguments), dict)
+        except ValueError:
+            return False
@@ -0,0 +1,171 @@
+"""An offline BM25 index to select the tools that are relevant to a message."""
+import heapq
+import math
+import operator
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+# terms in more than this share of the tools have their weights stored for every tool, which are
+# added up in one pass
+_DENSE_SHARE = 0.125
+
+_STOP_WORDS = frozenset(
+    """a an and are as at be by can could do for from how i in is it me my of on or please that the
+    this to what when where which who why will with would you your""".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a text, or a function name, into normalized terms.
+
+    Names are split at underscores and case changes, e.g. `getCurrent_weather` into get, current and
+    weather. Terms are lower cased, plurals are reduced to the singular and stop words are dropped.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: The terms.
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text):
+        term = token.lower()
+        if term in _STOP_WORDS:
+            continue
+        if len(term) > 4 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ToolIndex:
+    """
+    A BM25 index over the names and descriptions of tools.
+
+    The BM25 weight of every term in every tool is computed when the index is built, so scoring a
+    message only adds up the weights of its terms. If NumPy is installed the weights are added up
+    vectorized, which is faster for large registries.
+    """
+
+    def __init__(
+        self,
+        documents: Dict[str, str],
+        k1: float = 1.2,
+        b: float = 0.75,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        """
+        Builds the index.
+
+        Args:
+            documents (Dict[str, str]): The text to index for every tool, keyed by tool name.
+            k1 (float): The BM25 term frequency saturation.
+            b (float): The BM25 document length normalization.
+            use_numpy (Optional[bool]): Whether to score with NumPy. If None, NumPy is used if it is installed.
+        """
+        self.names: Tuple[str, ...] = tuple(documents)
+        term_frequencies = [Counter(tokenize(text)) for text in documents.values()]
+        lengths = [sum(frequencies.values()) for frequencies in term_frequencies]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        document_frequencies: Counter = Counter()
+        for frequencies in term_frequencies:
+            document_frequencies.update(frequencies.keys())
+
+        count = len(self.names)
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, frequencies in enumerate(term_frequencies):
+            norm = k1 * (1 - b + b * lengths[index] / average_length) if average_length else k1
+            for term, frequency in frequencies.items():
+                document_frequency = document_frequencies[term]
+                idf = math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+                weight = idf * frequency * (k1 + 1) / (frequency + norm)
+                postings.setdefault(term, []).append((index, weight))
+
+        numpy = _import_numpy() if use_numpy is not False else None
+        if use_numpy and numpy is None:
+            raise ImportError("Scoring with NumPy requires the numpy package.")
+        self._numpy = numpy
+        # per term the indices of the tools it occurs in, None if dense, and their weights
+        self._postings: Dict[str, Tuple[Any, Any]] = {}
+        for term, entries in postings.items():
+            if numpy is not None:
+                self._postings[term] = (
+                    numpy.fromiter((index for index, _ in entries), dtype=numpy.intp, count=len(entries)),
+                    numpy.fromiter((weight for _, weight in entries), dtype=numpy.float64, count=len(entries)),
+                )
+            elif len(entries) > count * _DENSE_SHARE:
+                weights = [0.0] * count
+                for index, weight in entries:
+                    weights[index] = weight
+                self._postings[term] = (None, tuple(weights))
+            else:
+                self._postings[term] = (
+                    tuple(index for index, _ in entries),
+                    tuple(weight for _, weight in entries),
+                )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, top_k: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Returns the tools that are most relevant to a query.
+
+        Args:
+            query (str): The query, e.g. the message of a user.
+            top_k (int): The maximum number of tools to return.
+            min_score (float): The minimum score of a returned tool. Tools that share no term with the query
+                score 0 and are never returned.
+
+        Returns:
+            List[Tuple[str, float]]: The names and scores of the tools, most relevant first.
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+        if not terms or top_k <= 0:
+            return []
+        if self._numpy is not None:
+            return self._search_numpy(terms, top_k, min_score)
+
+        scores = [0.0] * len(self.names)
+        for term in terms:
+            indices, weights = self._postings[term]
+            if indices is None:
+                scores = list(map(operator.add, scores, weights))
+            else:
+                for index, weight in zip(indices, weights):
+                    scores[index] += weight
+        # nlargest is stable, so ties are ordered by registration order
+        best = heapq.nlargest(top_k, range(len(scores)), key=scores.__getitem__)
+        return [(self.names[index], scores[index]) for index in best if scores[index] > min_score]
+
+    def _search_numpy(self, terms: List[str], top_k: int, min_score: float) -> List[Tuple[str, float]]:
+        numpy = self._numpy
+        scores = numpy.zeros(len(self.names))
+        for term in terms:
+            indices, weights = self._postings[term]
+            # the indices of a term are unique, so buffered addition is correct
+            scores[indices] += weights
+        if top_k < len(scores):
+            candidates = numpy.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = numpy.arange(len(scores))
+        # ties are ordered by registration order
+        best = sorted(candidates.tolist(), key=lambda index: (-scores[index], index))
+        return [
+            (self.names[index], float(scores[index])) for index in best if scores[index] > min_score
+        ]
@@ -1,23 +1,186 @@
+import json
+from collections import deque
+from itertools import chain
+from typing import Any, Callable, List, Optional
+
+from openai_functools.utils.frozen import freeze
+
+
+class Message:
+    """
+    An immutable chat message.
+
+    Messages are stored with __slots__ to keep long histories small, and are converted to the dict
+    format of the API only when a request is sent. Their JSON serialization is cached.
+    """
+
+    __slots__ = ("role", "content", "name", "tool_calls", "tool_call_id", "_json")
+
+    def __init__(
+        self,
+        role: str,
+        content: Optional[str],
+        name: Optional[str] = None,
+        tool_calls: Optional[List[dict]] = None,
+        tool_call_id: Optional[str] = None,
+    ):
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "tool_calls", freeze(tool_calls))
+        object.__setattr__(self, "tool_call_id", tool_call_id)
+        object.__setattr__(self, "_json", None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    __delattr__ = __setattr__
+
+    def _fields(self) -> tuple:
+        return (self.role, self.content, self.name, self.tool_calls, self.tool_call_id)
+
+    def __reduce__(self):
+        return type(self), self._fields()
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash((self.role, self.content, self.name, self.tool_call_id))
+
+    def __repr__(self) -> str:
+        return (
+            f"Message(role={self.role!r}, content={self.content!r}, name={self.name!r}, "
+            f"tool_calls={self.tool_calls!r}, tool_call_id={self.tool_call_id!r})"
+        )
+
+    def to_dict(self) -> dict:
+        message = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            message["name"] = self.name
+        if self.tool_calls is not None:
+            message["tool_calls"] = self.tool_calls
+        if self.tool_call_id is not None:
+            message["tool_call_id"] = self.tool_call_id
+        return message
+
+    def to_json(self) -> bytes:
+        if self._json is None:
+            serialized = json.dumps(
+                self.to_dict(), separators=(",", ":"), ensure_ascii=False
+            ).encode("utf-8")
+            object.__setattr__(self, "_json", serialized)
+        return self._json
+
+
+def estimate_tokens(message: Message) -> int:
+    """Roughly estimates the number of prompt tokens of a message, at ~4 characters per token."""
+    characters = len(message.content or "") + len(message.name or "")
+    for tool_call in message.tool_calls or ():
+        function = tool_call.get("function") or {}
+        characters += len(function.get("name") or "") + len(function.get("arguments") or "")
+    return 4 + characters // 4
+
+
 class Conversation:
-    def __init__(self):
-        self.conversation_history = []
+    """
+    The message history of a conversation.
+
+    By default the history is unbounded. With `max_messages` and/or `max_tokens` the oldest messages
+    are dropped as new ones are added, except for pinned messages (by default the system messages),
+    which are always kept in front of the history.
+    """
+
+    def __init__(
+        self,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        token_estimator: Callable[[Message], int] = estimate_tokens,
+        pin_system_messages: bool = True,
+    ):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.token_estimator = token_estimator
+        self.pin_system_messages = pin_system_messages
+        self._pinned = []
+        self._messages = deque()
+        self._token_counts = deque()
+        self._pinned_tokens = 0
+        self._tokens = 0
+        self.dropped_messages = 0
+        self._last_message = None
+        self._json = None
+
+    @property
+    def conversation_history(self):
+        return [message.to_dict() for message in self.messages]
+
+    @property
+    def messages(self):
+        return self._pinned + list(self._messages)
 
-    def add_message(self, role, content, function_name=None):
-        # conditionally build message:
-        if function_name is None:
-            message = {"role": role, "content": content}
+    def to_json(self) -> bytes:
+        """
+        Returns the history serialized as the JSON array of the `messages` of a request.
+
+        Every message is serialized the first time this is called after it was added, and keeps its
+        serialization, so later calls only serialize the new messages and concatenate the cached fragments.
+        """
+        if self._json is None:
+            fragments = chain(self._pinned, self._messages)
+            self._json = b"[" + b",".join(message.to_json() for message in fragments) + b"]"
+        return self._json
+
+    @property
+    def token_count(self) -> int:
+        """The estimated number of prompt tokens of the history."""
+        return self._pinned_tokens + self._tokens
+
+    def __len__(self):
+        return len(self._pinned) + len(self._messages)
+
+    def add_message(self, role, content, function_name=None, pinned=None):
+        self.append(Message(role, content, function_name), pinned)
+
+    def append(self, message: Message, pinned: Optional[bool] = None):
+        if pinned is None:
+            pinned = self.pin_system_messages and message.role == "system"
+        self._last_message = message
+        self._json = None
+        tokens = self.token_estimator(message)
+        if pinned:
+            self._pinned.append(message)
+            self._pinned_tokens += tokens
         else:
-            message = {
-                "role": role,
-                "content": content,
-                "name": function_name,
-            }
-        self.conversation_history.append(message)
+            self._messages.append(message)
+            self._token_counts.append(tokens)
+            self._tokens += tokens
+        self._trim()
+
+    def _trim(self):
+        messages = self._messages
+        if self.max_messages is not None:
+            while len(messages) > self.max_messages:
+                self._drop_oldest()
+        if self.max_tokens is not None:
+            # the newest message is kept even if it exceeds the budget on its own
+            while len(messages) > 1 and self.token_count > self.max_tokens:
+                self._drop_oldest()
+        # tool results without the message that requested them are rejected by the API
+        while len(messages) > 1 and messages[0].role in ("tool", "function"):
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        self._messages.popleft()
+        self._tokens -= self._token_counts.popleft()
+        self.dropped_messages += 1
 
     def display_conversation(self):
-        for message in self.conversation_history:
-            print(f"{message['role']}: {message['content']}\n\n")
+        for message in self.messages:
+            print(f"{message.role}: {message.content}\n\n")
 
     def display_last_message(self):
-        last_message = self.conversation_history[-1]
-        print(f"{last_message['role']}: {last_message['content']}\n\n")
+        last_message = self._last_message
+        print(f"{last_message.role}: {last_message.content}\n\n")
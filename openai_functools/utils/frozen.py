@@ -0,0 +1,88 @@
+"""Immutable containers for metadata that is shared between callers."""
+from typing import Any, NoReturn
+
+
+def _immutable(self: Any, *args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+
+class FrozenDict(dict):
+    """
+    A dict that cannot be modified after creation.
+
+    It compares equal to, and serializes like, a regular dict. `copy()` and `copy.deepcopy` return
+    mutable copies.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        return thaw(self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+
+class FrozenList(list):
+    """
+    A list that cannot be modified after creation.
+
+    It compares equal to, and serializes like, a regular list. `copy()` and `copy.deepcopy` return
+    mutable copies.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    clear = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    reverse = _immutable
+    sort = _immutable
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+    def __deepcopy__(self, memo: dict) -> list:
+        return thaw(self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list.__repr__(self)})"
+
+
+def freeze(value: Any) -> Any:
+    """Recursively converts dicts and lists to their immutable counterparts."""
+    if isinstance(value, FrozenDict) or isinstance(value, FrozenList):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively converts (frozen) dicts and lists to regular, mutable ones."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
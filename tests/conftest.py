@@ -159,3 +159,23 @@ def expected_function_with_literal_metadata():
             "required": [],
         },
     }
+
+
+@fixture
+def tool_calls_response():
+    """Builds a mocked chat response carrying tool calls from (id, name, arguments) tuples."""
+
+    def build(*tool_calls):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.function_call = None
+        mock_tool_calls = []
+        for tool_call_id, name, arguments in tool_calls:
+            mock_tool_call = MagicMock()
+            mock_tool_call.id = tool_call_id
+            mock_tool_call.function.name = name
+            mock_tool_call.function.arguments = arguments
+            mock_tool_calls.append(mock_tool_call)
+        mock_response.choices[0].message.tool_calls = mock_tool_calls
+        return mock_response
+
+    return build
@@ -0,0 +1,193 @@
+import __future__
+import dataclasses
+import enum
+from typing import Dict, List, Optional
+
+import pytest
+
+from openai_functools import ArgumentValidator, InvalidArgumentsError
+from openai_functools.metadata_generator import extract_openai_function_metadata
+
+
+@pytest.fixture
+def validator():
+    return ArgumentValidator(
+        {
+            "type": "object",
+            "properties": {
+                "location": {"type": "string", "description": "location"},
+                "days": {"type": "integer", "description": "days", "default": 1},
+                "detailed": {"type": "boolean", "description": "detailed"},
+                "unit": {
+                    "type": "string",
+                    "description": "unit",
+                    "enum": ["celsius", "fahrenheit"],
+                    "default": "celsius",
+                },
+            },
+            "required": ["location"],
+        }
+    )
+
+
+def test_valid_arguments_get_defaults(validator):
+    assert validator({"location": "Boston"}) == {
+        "location": "Boston",
+        "days": 1,
+        "unit": "celsius",
+    }
+
+
+def test_arguments_are_coerced(validator):
+    assert validator({"location": "Boston", "days": "3", "detailed": "true"}) == {
+        "location": "Boston",
+        "days": 3,
+        "detailed": True,
+        "unit": "celsius",
+    }
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        [],
+        {},
+        {"location": 3},
+        {"location": "Boston", "days": "three"},
+        {"location": "Boston", "days": True},
+        {"location": "Boston", "unit": "kelvin"},
+        {"location": "Boston", "country": "US"},
+    ],
+)
+def test_invalid_arguments_are_rejected(validator, arguments):
+    with pytest.raises(InvalidArgumentsError):
+        validator(arguments)
+
+
+def test_validator_from_generated_metadata(function_with_literal):
+    metadata = extract_openai_function_metadata(function_with_literal)
+    validator = ArgumentValidator(metadata["parameters"])
+
+    assert validator({}) == {"string_literal": "foo"}
+    with pytest.raises(InvalidArgumentsError):
+        validator({"string_literal": "baz"})
+
+
+def test_union_types_keep_matching_values():
+    validator = ArgumentValidator(
+        {
+            "type": "object",
+            "properties": {
+                "days": {"type": ["integer", "null"]},
+                "label": {"type": ["integer", "string"]},
+            },
+            "required": [],
+        }
+    )
+
+    assert validator({"days": None, "label": "5"}) == {"days": None, "label": "5"}
+    assert validator({"days": "5", "label": 5}) == {"days": 5, "label": 5}
+    with pytest.raises(InvalidArgumentsError):
+        validator({"days": "soon"})
+
+
+def test_parameters_without_annotation_are_not_type_checked():
+    def tag(name, count: int, labels=None):
+        return name
+
+    validator = ArgumentValidator(extract_openai_function_metadata(tag)["parameters"], tag)
+
+    assert validator({"name": 5, "count": "2", "labels": ["a"]}) == {
+        "name": 5,
+        "count": 2,
+        "labels": ["a"],
+    }
+    with pytest.raises(InvalidArgumentsError):
+        validator({"name": 5, "count": "two"})
+
+
+def test_variadic_parameters_are_optional_and_collect_unknown_arguments():
+    def kw(x: int, *args, **kwargs):
+        return x, kwargs
+
+    def positional(x: int, *args):
+        return x
+
+    kw_validator = ArgumentValidator(extract_openai_function_metadata(kw)["parameters"], kw)
+    positional_validator = ArgumentValidator(extract_openai_function_metadata(positional)["parameters"], positional)
+
+    assert kw_validator({"x": "1", "y": 2}) == {"x": 1, "y": 2}
+    assert kw(**kw_validator({"x": 1, "y": 2})) == (1, {"y": 2})
+    assert positional_validator({"x": 1}) == {"x": 1}
+    with pytest.raises(InvalidArgumentsError):
+        positional_validator({"x": 1, "y": 2})
+
+
+def define_with_string_annotations(source: str):
+    namespace = {"List": List}
+    exec(compile(source, "<tools>", "exec", flags=__future__.annotations.compiler_flag), namespace)
+    return namespace["f"]
+
+
+def test_string_annotations_are_resolved():
+    f = define_with_string_annotations("def f(count: int, names: List[str], missing: Undefined = None): pass")
+
+    parameters = extract_openai_function_metadata(f)["parameters"]
+    validator = ArgumentValidator(parameters, f)
+
+    assert parameters["properties"]["count"]["type"] == "integer"
+    assert parameters["properties"]["names"]["items"] == {"type": "string"}
+    # the annotation that cannot be resolved is not checked
+    assert validator({"count": 5, "names": ["a"], "missing": 3}) == {"count": 5, "names": ["a"], "missing": 3}
+
+
+class Priority(enum.Enum):
+    LOW = 1
+    HIGH = 2
+
+
+@dataclasses.dataclass
+class Item:
+    name: str
+    priority: Priority = Priority.LOW
+
+
+@dataclasses.dataclass
+class Order:
+    items: List[Item]
+    gift: Optional[Item] = None
+
+
+class Model:
+    def __init__(self, **fields):
+        self.fields = fields
+
+    @classmethod
+    def model_json_schema(cls):
+        return {"type": "object", "properties": {"text": {"type": "string"}}}
+
+    @classmethod
+    def model_validate(cls, value):
+        return cls(**value)
+
+
+def test_values_of_types_are_rebuilt():
+    def place(order: Order, rush: Dict[str, Priority], note: Optional[Model] = None, level: Priority = Priority.HIGH):
+        pass
+
+    validator = ArgumentValidator(extract_openai_function_metadata(place)["parameters"], place)
+
+    arguments = validator(
+        {
+            "order": {"items": [{"name": "a", "priority": 2}], "gift": {"name": "b"}},
+            "rush": {"a": 1},
+            "note": {"text": "thanks"},
+        }
+    )
+
+    assert arguments["order"] == Order(items=[Item("a", Priority.HIGH)], gift=Item("b"))
+    assert arguments["rush"] == {"a": Priority.LOW}
+    assert arguments["note"].fields == {"text": "thanks"}
+    assert arguments["level"] is Priority.HIGH
+    with pytest.raises(InvalidArgumentsError):
+        validator({"order": {"items": [{"name": "a", "priority": 3}]}, "rush": {}})
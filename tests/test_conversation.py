@@ -0,0 +1,116 @@
+import json
+import pickle
+
+import pytest
+
+from openai_functools.utils.conversation import Conversation, Message, estimate_tokens
+
+
+def test_unbounded_conversation():
+    conversation = Conversation()
+    conversation.add_message("system", "You are a helpful assistant.")
+    conversation.add_message("user", "What's the weather like in Boston?")
+    conversation.add_message("function", "sunny", function_name="get_current_weather")
+
+    assert conversation.conversation_history == [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "What's the weather like in Boston?"},
+        {"role": "function", "content": "sunny", "name": "get_current_weather"},
+    ]
+
+
+def test_trim_by_message_count_keeps_system_messages():
+    conversation = Conversation(max_messages=2)
+    conversation.add_message("system", "You are a helpful assistant.")
+    for i in range(5):
+        conversation.add_message("user", f"message {i}")
+
+    assert conversation.conversation_history == [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "message 3"},
+        {"role": "user", "content": "message 4"},
+    ]
+    assert conversation.dropped_messages == 3
+
+
+def test_trim_by_token_budget():
+    conversation = Conversation(max_tokens=30)
+    conversation.add_message("system", "x" * 40)
+    for i in range(10):
+        conversation.add_message("user", "y" * 20)
+
+    assert conversation.token_count <= 30
+    assert conversation.conversation_history[0]["role"] == "system"
+    assert conversation.token_count == sum(
+        estimate_tokens(message) for message in conversation.messages
+    )
+
+
+def test_token_estimate_counts_tool_calls():
+    arguments = json.dumps({"location": "Boston, MA", "notes": "x" * 400})
+    message = Message(
+        "assistant",
+        None,
+        tool_calls=[
+            {
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "get_current_weather", "arguments": arguments},
+            }
+        ],
+    )
+
+    assert estimate_tokens(message) == 4 + (len("get_current_weather") + len(arguments)) // 4
+    assert estimate_tokens(message) > estimate_tokens(Message("assistant", None))
+
+
+def test_trim_drops_orphaned_function_results():
+    conversation = Conversation(max_messages=2)
+    conversation.add_message("user", "What's the weather like in Boston?")
+    conversation.add_message("assistant", "Let me check.")
+    conversation.add_message("function", "sunny", function_name="get_current_weather")
+    conversation.add_message("assistant", "It is sunny.")
+
+    assert [message["role"] for message in conversation.conversation_history] == [
+        "assistant"
+    ]
+
+
+def test_display_last_message(capsys):
+    conversation = Conversation(max_messages=1)
+    conversation.add_message("user", "Hello")
+    conversation.add_message("assistant", "Hi!")
+    conversation.display_last_message()
+
+    assert capsys.readouterr().out == "assistant: Hi!\n\n\n"
+
+
+def test_messages_are_immutable_and_slotted():
+    message = Message("function", "sunny", "get_current_weather")
+
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.content = "rainy"
+    assert pickle.loads(pickle.dumps(message)) == message
+    assert message.to_dict() == {
+        "role": "function",
+        "content": "sunny",
+        "name": "get_current_weather",
+    }
+
+
+def test_json_serialization_is_cached_per_message():
+    conversation = Conversation(max_messages=2)
+    conversation.add_message("system", "You are a helpful assistant.")
+    conversation.add_message("user", "Hello, wörld")
+    # messages are only serialized once the history is
+    assert all(message._json is None for message in conversation.messages)
+    serialized = conversation.to_json()
+
+    assert json.loads(serialized) == conversation.conversation_history
+    assert conversation.to_json() is serialized
+
+    conversation.add_message("assistant", "Hi!")
+    conversation.add_message("user", "Bye")
+    assert json.loads(conversation.to_json()) == conversation.conversation_history
+    assert all(message._json is not None for message in conversation.messages)
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from openai_functools import FunctionsOrchestrator
+from openai_functools.function_spec import FunctionSpec
+
+
+def process_id() -> int:
+    return os.getpid()
+
+
+def square(value: int) -> int:
+    return value * value
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_process_execution(tool_calls_response):
+    with FunctionsOrchestrator(process_workers=2) as orchestrator:
+        orchestrator.register(process_id, execution="process")
+        orchestrator.register(square, execution="process")
+        response = tool_calls_response(
+            ("call_1", "process_id", "{}"), ("call_2", "square", '{"value": 7}')
+        )
+
+        sequential = orchestrator.call_function(response)
+        concurrent = orchestrator.call_function(response, concurrent=True)
+        asynchronous = asyncio.run(orchestrator.acall_function(response))
+
+    for results in (sequential, concurrent, asynchronous):
+        assert results["call_1"] != os.getpid()
+        assert results["call_2"] == 49
+    assert orchestrator._process_pool is None
+
+
+def test_inline_execution_runs_in_the_calling_thread(tool_calls_response):
+    with FunctionsOrchestrator() as orchestrator:
+        orchestrator.register(thread_name, execution="inline")
+        response = tool_calls_response(("call_1", "thread_name", "{}"))
+
+        concurrent = orchestrator.call_function(response, concurrent=True)
+        asynchronous = asyncio.run(orchestrator.acall_function(response))
+
+    assert concurrent["call_1"] == threading.current_thread().name
+    assert asynchronous["call_1"] == threading.current_thread().name
+
+
+def test_set_execution(tool_calls_response):
+    with FunctionsOrchestrator(functions=[thread_name]) as orchestrator:
+        response = tool_calls_response(("call_1", "thread_name", "{}"))
+        assert orchestrator.call_function(response, concurrent=True)["call_1"] != (
+            threading.current_thread().name
+        )
+
+        orchestrator.set_execution("thread_name", "inline")
+
+        assert orchestrator.call_function(response, concurrent=True)["call_1"] == (
+            threading.current_thread().name
+        )
+        with pytest.raises(ValueError):
+            orchestrator.set_execution("unknown", "inline")
+
+
+def test_invalid_execution_policies():
+    def nested() -> None:
+        pass
+
+    async def coroutine() -> None:
+        pass
+
+    orchestrator = FunctionsOrchestrator()
+    with pytest.raises(ValueError):
+        orchestrator.register(square, execution="cluster")
+    with pytest.raises(ValueError):
+        orchestrator.register(nested, execution="process")
+    with pytest.raises(ValueError):
+        FunctionSpec("coroutine", coroutine, is_coroutine=True, execution="process")
+    assert orchestrator._functions == {}
@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from openai_functools import (
+    FunctionsOrchestrator,
+    HistogramCollector,
+    Instrumentation,
+    OpenTelemetryInstrumentation,
+)
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self):
+        self.events = []
+
+    def before_call(self, event):
+        self.events.append(("before", event.function_name, event.argument_size))
+
+    def after_call(self, event):
+        self.events.append(("after", event.function_name, event.result_size))
+
+    def on_error(self, event):
+        self.events.append(("error", event.function_name, type(event.error).__name__))
+
+
+@pytest.fixture
+def orchestrator():
+    def echo(text: str) -> str:
+        return text
+
+    def fails():
+        raise RuntimeError("boom")
+
+    return FunctionsOrchestrator(functions=[echo, fails])
+
+
+def test_hooks_are_called(orchestrator, tool_calls_response):
+    recording = RecordingInstrumentation()
+    orchestrator.add_instrumentation(recording)
+
+    response = tool_calls_response(("call_1", "echo", '{"text": "hello"}'))
+    orchestrator.call_function(response)
+    with pytest.raises(RuntimeError):
+        orchestrator.call_function(tool_calls_response(("call_2", "fails", "{}")))
+    asyncio.run(orchestrator.acall_function(response))
+
+    assert recording.events == [
+        ("before", "echo", 17),
+        ("after", "echo", 5),
+        ("before", "fails", 2),
+        ("error", "fails", "RuntimeError"),
+        ("before", "echo", 17),
+        ("after", "echo", 5),
+    ]
+
+    orchestrator.remove_instrumentation(recording)
+    orchestrator.call_function(response)
+    assert len(recording.events) == 6
+
+
+def test_histogram_collector(orchestrator, tool_calls_response):
+    collector = HistogramCollector()
+    orchestrator.add_instrumentation(collector)
+
+    for i in range(10):
+        orchestrator.call_function(tool_calls_response((f"call_{i}", "echo", '{"text": "hello"}')))
+    with pytest.raises(RuntimeError):
+        orchestrator.call_function(tool_calls_response(("call_error", "fails", "{}")))
+
+    summary = collector.summary()
+    assert summary["echo"]["calls"] == 10
+    assert summary["echo"]["errors"] == 0
+    assert summary["echo"]["result_bytes"] == 50
+    assert summary["echo"]["p50_duration"] <= summary["echo"]["p99_duration"]
+    assert summary["fails"]["errors"] == 1
+    assert collector.percentile("unknown", 50) is None
+
+
+def test_opentelemetry_instrumentation(orchestrator, tool_calls_response):
+    pytest.importorskip("opentelemetry")
+    meter, tracer = MagicMock(), MagicMock()
+    orchestrator.add_instrumentation(OpenTelemetryInstrumentation(meter=meter, tracer=tracer))
+
+    orchestrator.call_function(tool_calls_response(("call_1", "echo", '{"text": "hello"}')))
+
+    tracer.start_span.assert_called_once_with("tool_call echo")
+    tracer.start_span.return_value.end.assert_called_once()
+    meter.create_histogram.return_value.record.assert_called()
@@ -1,6 +1,16 @@
+import copy
+import gc
+import json
+import weakref
+
+import pytest
+
 from openai_functools.metadata_generator import (
+    _metadata_cache,
     construct_function_name,
     extract_openai_function_metadata,
+    invalidate_metadata_cache,
+    LazyMetadata,
     openai_function,
 )
 
@@ -61,11 +71,91 @@ def test_function_with_literal_should_become_enum(
 def test_construct_function_name_instance(duck_class_ref):
     duck = duck_class_ref()
 
-    constructed_name = construct_function_name(duck.quack)
-    assert constructed_name == f"{duck.__hash__()}__quack"
+    assert construct_function_name(duck.quack) == "Duck__quack"
+    assert construct_function_name(duck.quack, alias="donald") == "donald__quack"
+    assert (
+        construct_function_name(duck.quack, alias="donald", namespace="pond")
+        == "pond__donald__quack"
+    )
+    assert construct_function_name(len) == "len"
+    with pytest.raises(ValueError):
+        construct_function_name(duck.quack, alias="donald.duck")
 
 
 def test_construct_function_name_function(weather_function):
     constructed_name = construct_function_name(weather_function)
 
     assert constructed_name == "get_current_weather"
+
+
+def test_metadata_is_cached_and_immutable(weather_function, expected_metadata):
+    metadata = extract_openai_function_metadata(weather_function)
+
+    assert extract_openai_function_metadata(weather_function) is metadata
+    assert json.loads(json.dumps(metadata)) == expected_metadata
+    with pytest.raises(TypeError):
+        metadata["name"] = "other"
+    with pytest.raises(TypeError):
+        metadata["parameters"]["required"].append("unit")
+
+    mutable_copy = copy.deepcopy(metadata)
+    mutable_copy["parameters"]["required"].append("unit")
+    assert metadata == expected_metadata
+
+
+def test_metadata_cache_invalidation(weather_function):
+    metadata = extract_openai_function_metadata(weather_function)
+    weather_function.__doc__ = "Get the weather, changed."
+
+    assert extract_openai_function_metadata(weather_function) is metadata
+
+    invalidate_metadata_cache(weather_function)
+    assert (
+        extract_openai_function_metadata(weather_function)["description"]
+        == "Get the weather, changed."
+    )
+
+
+def test_metadata_cache_is_shared_between_instances(duck_class_ref):
+    duck1, duck2 = duck_class_ref(), duck_class_ref()
+
+    metadata1 = extract_openai_function_metadata(duck1.quack)
+    metadata2 = extract_openai_function_metadata(duck2.quack, name="Duck_2__quack")
+
+    assert (metadata1["name"], metadata2["name"]) == ("Duck__quack", "Duck_2__quack")
+    assert metadata1["parameters"] is metadata2["parameters"]
+    assert "self" in extract_openai_function_metadata(duck_class_ref.quack)["parameters"]["properties"]
+
+
+def test_metadata_cache_does_not_keep_functions_alive():
+    def plugin_function(value: int):
+        return value
+
+    extract_openai_function_metadata(plugin_function)
+    reference = weakref.ref(plugin_function)
+    assert reference in _metadata_cache.keyrefs()
+
+    del plugin_function
+    gc.collect()
+    assert reference() is None
+    assert reference not in _metadata_cache.keyrefs()
+
+
+def test_decorator_returns_the_function_itself(weather_function, expected_metadata):
+    decorated_function = openai_function(weather_function)
+
+    assert decorated_function is weather_function
+    assert not hasattr(decorated_function, "__wrapped__")
+    assert decorated_function.openai_metadata == expected_metadata
+
+
+def test_lazy_decorator(weather_function, expected_metadata):
+    decorated_function = openai_function(lazy=True)(weather_function)
+
+    assert decorated_function is weather_function
+    assert isinstance(decorated_function.openai_metadata, LazyMetadata)
+    assert not decorated_function.openai_metadata.is_loaded
+
+    assert decorated_function.openai_metadata == expected_metadata
+    assert decorated_function.openai_metadata.is_loaded
+    assert json.loads(json.dumps(dict(decorated_function.openai_metadata))) == expected_metadata
@@ -0,0 +1,85 @@
+import pytest
+
+from openai_functools import FunctionsOrchestrator
+from openai_functools.minification import minify_metadata, shorten_description
+
+
+def get_forecast(location: str, days: int = 1, unit_system: str = "metric"):
+    """
+    Get the weather forecast for a location. The forecast is produced by an ensemble of models and is
+    updated every hour, so repeated calls within an hour return the same forecast.
+
+    :param location: The city and state, e.g. San Francisco, CA.
+    :param unit_system: Unit system
+    """
+
+
+def ping():
+    pass
+
+
+def test_shorten_description():
+    assert shorten_description("Short.", 20) == "Short."
+    assert shorten_description("First sentence. Second sentence.", 20) == "First sentence."
+    assert shorten_description("one two three four five six", 16) == "one two three..."
+    assert len(shorten_description("x" * 50, 10)) == 10
+
+
+def test_minify_metadata():
+    orchestrator = FunctionsOrchestrator(functions=[get_forecast, ping])
+    forecast, ping_metadata = (spec.parameters for spec in orchestrator.function_specs)
+
+    assert minify_metadata(forecast, max_description_length=60) == {
+        "name": "get_forecast",
+        "description": "Get the weather forecast for a location.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city and state, e.g. San Francisco, CA.",
+                },
+                "days": {"type": "integer", "default": 1},
+                "unit_system": {"type": "string", "default": "metric"},
+            },
+            "required": ["location"],
+        },
+    }
+    assert minify_metadata(ping_metadata) == {
+        "name": "ping",
+        "parameters": {"type": "object"},
+    }
+
+
+def test_compact_tools_descriptions():
+    orchestrator = FunctionsOrchestrator(functions=[get_forecast, ping], max_description_length=60)
+    orchestrator.define_tool_set("health", ["ping"])
+
+    compact = orchestrator.create_tools_descriptions(compact=True)
+
+    assert compact[0]["function"]["description"] == "Get the weather forecast for a location."
+    assert orchestrator.create_tools_descriptions(compact=True) == compact
+    assert orchestrator.create_tools_descriptions(["ping"], compact=True) == [compact[1]]
+    assert orchestrator.create_tools_descriptions(tool_set="health", compact=True) == [compact[1]]
+    assert orchestrator.create_tools_descriptions()[1]["function"]["description"] == "ping"
+    with pytest.raises(ValueError):
+        orchestrator.create_tools_descriptions(tool_set="unknown", compact=True)
+
+
+def test_estimate_tool_tokens():
+    orchestrator = FunctionsOrchestrator(functions=[get_forecast, ping])
+
+    full = orchestrator.estimate_tool_tokens()
+    compact = orchestrator.estimate_tool_tokens(compact=True)
+
+    assert list(full["tools"]) == ["get_forecast", "ping"]
+    assert full["total"] >= sum(full["tools"].values())
+    assert compact["total"] < full["total"]
+    ping_json = (
+        '{"type":"function","function":{"name":"ping","description":"ping",'
+        '"parameters":{"type":"object","properties":{},"required":[]}}}'
+    )
+    assert orchestrator.estimate_tool_tokens(["ping"], token_estimator=len) == {
+        "tools": {"ping": len(ping_json)},
+        "total": len(ping_json) + 2,
+    }
@@ -0,0 +1,169 @@
+import collections
+import dataclasses
+import enum
+import sys
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict, Union
+
+import pytest
+
+from openai_functools.metadata_generator import extract_openai_function_metadata
+from openai_functools.openai_types import (
+    python_type_to_openapi_type,
+    register_type_schema,
+    type_to_schema,
+)
+
+
+class Unit(str, enum.Enum):
+    CELSIUS = "celsius"
+    FAHRENHEIT = "fahrenheit"
+
+
+@dataclasses.dataclass
+class Address:
+    street: str
+    city: str
+    zip_code: Optional[str] = None
+    tags: List[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class TreeNode:
+    value: int
+    children: List["TreeNode"] = dataclasses.field(default_factory=list)
+
+
+class TimeRange(TypedDict, total=False):
+    start: int
+    end: int
+
+
+def test_primitive_types():
+    assert python_type_to_openapi_type(str) == "string"
+    assert python_type_to_openapi_type(int) == "integer"
+    assert python_type_to_openapi_type(float) == "number"
+    assert python_type_to_openapi_type(bool) == "boolean"
+    assert python_type_to_openapi_type(list) == "array"
+    assert python_type_to_openapi_type(dict) == "object"
+    assert python_type_to_openapi_type(object) == "string"
+    assert type_to_schema(Any) == {}
+
+
+@pytest.mark.parametrize(
+    "python_type, schema",
+    [
+        (List[int], {"type": "array", "items": {"type": "integer"}}),
+        (Sequence[float], {"type": "array", "items": {"type": "number"}}),
+        (
+            Dict[str, List[int]],
+            {
+                "type": "object",
+                "additionalProperties": {"type": "array", "items": {"type": "integer"}},
+            },
+        ),
+        (Tuple[int, ...], {"type": "array", "items": {"type": "integer"}}),
+        (
+            Tuple[int, str],
+            {
+                "type": "array",
+                "prefixItems": [{"type": "integer"}, {"type": "string"}],
+                "minItems": 2,
+                "maxItems": 2,
+            },
+        ),
+        (Optional[str], {"type": ["string", "null"]}),
+        (
+            Union[int, List[int]],
+            {"anyOf": [{"type": "integer"}, {"type": "array", "items": {"type": "integer"}}]},
+        ),
+        (Literal["a", "b"], {"type": "string", "enum": ["a", "b"]}),
+        (Literal[1, "a"], {"enum": [1, "a"]}),
+        (Unit, {"type": "string", "enum": ["celsius", "fahrenheit"]}),
+    ],
+)
+def test_typing_constructs(python_type, schema):
+    assert type_to_schema(python_type) == schema
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="Annotated and generic builtins require Python 3.9")
+def test_annotated_and_generic_builtins():
+    from typing import Annotated
+
+    assert type_to_schema(eval("list[str]")) == {"type": "array", "items": {"type": "string"}}
+    assert type_to_schema(Annotated[int, "The number of days."]) == {
+        "type": "integer",
+        "description": "The number of days.",
+    }
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="X | Y unions require Python 3.10")
+def test_union_operator():
+    assert type_to_schema(eval("int | None")) == {"type": ["integer", "null"]}
+
+
+def test_dataclasses_and_typed_dicts():
+    assert type_to_schema(Address) == {
+        "type": "object",
+        "properties": {
+            "street": {"type": "string"},
+            "city": {"type": "string"},
+            "zip_code": {"type": ["string", "null"]},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["street", "city"],
+    }
+    assert type_to_schema(TimeRange) == {
+        "type": "object",
+        "properties": {"start": {"type": "integer"}, "end": {"type": "integer"}},
+        "required": [],
+    }
+    assert type_to_schema(TreeNode)["properties"]["children"] == {
+        "type": "array",
+        "items": {"type": "object"},
+    }
+
+
+def test_pydantic_style_models_have_their_references_inlined():
+    class Model:
+        @classmethod
+        def model_json_schema(cls):
+            return {
+                "type": "object",
+                "properties": {"address": {"$ref": "#/$defs/Address"}},
+                "$defs": {"Address": {"type": "object", "properties": {"city": {"type": "string"}}}},
+            }
+
+    assert type_to_schema(Model) == {
+        "type": "object",
+        "properties": {"address": {"type": "object", "properties": {"city": {"type": "string"}}}},
+    }
+
+
+def test_schemas_are_memoized_and_immutable():
+    schema = type_to_schema(List[Address])
+
+    assert type_to_schema(List[Address]) is schema
+    with pytest.raises(TypeError):
+        schema["type"] = "object"
+
+
+def test_register_type_schema():
+    register_type_schema(collections.deque, lambda deque_type: type_to_schema(List[deque_type.__args__[0]]))
+
+    assert type_to_schema(collections.deque[int]) == {"type": "array", "items": {"type": "integer"}}
+
+
+def test_parameters_use_the_type_schemas():
+    def schedule(address: Address, unit: Unit = Unit.CELSIUS, days: Optional[int] = None):
+        pass
+
+    properties = extract_openai_function_metadata(schedule)["parameters"]["properties"]
+
+    assert properties["address"]["properties"]["city"] == {"type": "string"}
+    assert properties["unit"] == {
+        "type": "string",
+        "enum": ["celsius", "fahrenheit"],
+        "description": "unit",
+        "default": "celsius",
+    }
+    assert properties["days"] == {"type": ["integer", "null"], "description": "days", "default": None}
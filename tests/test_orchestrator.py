@@ -1,6 +1,14 @@
+import asyncio
+import dataclasses
+import enum
+import json
+import threading
+import time
+from concurrent import futures
+
 import pytest
 
-from openai_functools import FunctionsOrchestrator
+from openai_functools import FunctionsOrchestrator, InvalidArgumentsError
 
 from unittest.mock import MagicMock
 
@@ -100,8 +108,8 @@ def test_register_single_instance(duck_class_ref):
     orchestrator.register_instance(duck)
 
     expected_description = {
-        "name": f"{duck.__hash__()}__quack",
-        "description": f"{duck.__hash__()}__quack",
+        "name": "Duck__quack",
+        "description": "Duck__quack",
         "parameters": {
             "type": "object",
             "properties": {"someParam": {"type": "string", "description": "someParam"}},
@@ -119,8 +127,8 @@ def test_register_multiple_instances(duck_class_ref):
     orchestrator.register_instances_all([duck1, duck2])
 
     expected_description_1 = {
-        "name": f"{duck1.__hash__()}__quack",
-        "description": f"{duck1.__hash__()}__quack",
+        "name": "Duck__quack",
+        "description": "Duck__quack",
         "parameters": {
             "type": "object",
             "properties": {"someParam": {"type": "string", "description": "someParam"}},
@@ -128,8 +136,8 @@ def test_register_multiple_instances(duck_class_ref):
         },
     }
     expected_description_2 = {
-        "name": f"{duck2.__hash__()}__quack",
-        "description": f"{duck2.__hash__()}__quack",
+        "name": "Duck_2__quack",
+        "description": "Duck_2__quack",
         "parameters": {
             "type": "object",
             "properties": {"someParam": {"type": "string", "description": "someParam"}},
@@ -139,3 +147,497 @@ def test_register_multiple_instances(duck_class_ref):
 
     assert expected_description_1 in orchestrator.function_descriptions
     assert expected_description_2 in orchestrator.function_descriptions
+
+
+def test_instance_aliases_and_namespace(duck_class_ref, tool_calls_response):
+    donald, daisy = duck_class_ref(), duck_class_ref()
+    orchestrator = FunctionsOrchestrator(namespace="pond")
+
+    orchestrator.register_instances_all({"donald": donald, "daisy": daisy})
+
+    assert list(orchestrator.functions) == ["pond__donald__quack", "pond__daisy__quack"]
+    response = tool_calls_response(("call_1", "pond__daisy__quack", '{"someParam": "x"}'))
+    assert orchestrator.call_function(response) == {"call_1": "Quack!"}
+    with pytest.raises(ValueError):
+        orchestrator.register_instance(duck_class_ref(), alias="donald")
+    with pytest.raises(ValueError):
+        orchestrator.register_instance(donald, alias="scrooge")
+    with pytest.raises(ValueError):
+        orchestrator.register_instance(donald)
+    with pytest.raises(ValueError):
+        orchestrator.register_instance(duck_class_ref(), alias="not a name")
+
+
+def test_tools_payload_is_identical_across_orchestrators(duck_class_ref):
+    payloads = []
+    for _ in range(2):
+        orchestrator = FunctionsOrchestrator()
+        orchestrator.register_instances_all([duck_class_ref(), duck_class_ref()])
+        payloads.append(orchestrator.tools_payload_json)
+
+    assert payloads[0] == payloads[1]
+
+
+class Pond:
+    evaluated = 0
+
+    def __init__(self):
+        def helper() -> str:
+            return "assigned in __init__"
+
+        self.helper = helper
+
+    @property
+    def depth(self):
+        Pond.evaluated += 1
+        return 3
+
+    def feed(self, amount: int) -> str:
+        """Feeds the ducks."""
+        return f"fed {amount}"
+
+    @classmethod
+    def create(cls, name: str) -> str:
+        """Creates a pond."""
+        return name
+
+    @staticmethod
+    def measure(unit: str) -> str:
+        """Measures a pond."""
+        return unit
+
+
+def test_register_many_instances_shares_class_introspection():
+    ponds = [Pond() for _ in range(50)]
+    orchestrator = FunctionsOrchestrator()
+
+    orchestrator.register_instances_all(ponds)
+
+    assert Pond.evaluated == 0
+    assert len(orchestrator.functions) == 200
+    assert {"Pond__create", "Pond__feed", "Pond__helper", "Pond__measure", "Pond_50__feed"} <= set(
+        orchestrator.functions
+    )
+    specs = [orchestrator.functions[f"Pond_{number}__feed"] for number in range(2, 51)]
+    first = orchestrator.functions["Pond__feed"]
+    assert all(spec.parameters["parameters"] is first.parameters["parameters"] for spec in specs)
+    assert all(spec.argument_validator is first.argument_validator for spec in specs)
+    assert orchestrator.functions["Pond_7__feed"].func_ref.__self__ is ponds[6]
+
+
+def test_register_instance_registers_the_same_methods_as_register_instances_all():
+    single, bulk = FunctionsOrchestrator(), FunctionsOrchestrator()
+
+    single.register_instance(Pond())
+    bulk.register_instances_all([Pond()])
+
+    assert list(single.functions) == list(bulk.functions)
+
+
+def test_register_instances_rejects_duplicates_before_registering():
+    pond = Pond()
+    orchestrator = FunctionsOrchestrator()
+
+    with pytest.raises(ValueError):
+        orchestrator.register_instances_all([pond, pond])
+
+    assert orchestrator.functions == {}
+
+
+def test_call_tool_calls_sequentially(tool_calls_response, weather_function):
+    orchestrator = FunctionsOrchestrator(functions=[weather_function])
+    response = tool_calls_response(
+        ("call_1", "get_current_weather", '{"location": "Boston"}'),
+        ("call_2", "get_current_weather", '{"location": "Tokyo", "unit": "celsius"}'),
+    )
+
+    results = orchestrator.call_function(response)
+
+    assert list(results.keys()) == ["call_1", "call_2"]
+    assert '"Tokyo"' in results["call_2"]
+
+
+def test_call_tool_calls_concurrently(tool_calls_response):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(value: int) -> int:
+        barrier.wait()
+        return value
+
+    with FunctionsOrchestrator(
+        functions=[wait_for_others], concurrent=True, max_workers=3
+    ) as orchestrator:
+        response = tool_calls_response(
+            *[(f"call_{i}", "wait_for_others", f'{{"value": {i}}}') for i in range(3)]
+        )
+        results = orchestrator.call_function(response)
+
+    assert results == {"call_0": 0, "call_1": 1, "call_2": 2}
+
+
+def test_concurrent_failure_keeps_other_results(tool_calls_response):
+    def fails():
+        raise RuntimeError("boom")
+
+    def succeeds():
+        return "ok"
+
+    with FunctionsOrchestrator(functions=[fails, succeeds]) as orchestrator:
+        response = tool_calls_response(
+            ("call_1", "fails", "{}"), ("call_2", "succeeds", "{}")
+        )
+        results = orchestrator.call_function(response, concurrent=True)
+
+    assert isinstance(results["call_1"], RuntimeError)
+    assert results["call_2"] == "ok"
+
+
+def test_concurrent_timeout(tool_calls_response):
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "slow"
+
+    def fast():
+        return "fast"
+
+    with FunctionsOrchestrator(
+        functions=[slow, fast], concurrent=True, timeout=0.05
+    ) as orchestrator:
+        response = tool_calls_response(("call_1", "slow", "{}"), ("call_2", "fast", "{}"))
+        results = orchestrator.call_function(response)
+        release.set()
+
+    assert isinstance(results["call_1"], futures.TimeoutError)
+    assert results["call_2"] == "fast"
+
+
+def test_concurrent_timeout_starts_when_the_call_runs(tool_calls_response):
+    ran = []
+
+    def nap(label: str) -> str:
+        time.sleep(0.1)
+        ran.append(label)
+        return label
+
+    with FunctionsOrchestrator(
+        functions=[nap], concurrent=True, max_workers=1, timeout=0.25
+    ) as orchestrator:
+        response = tool_calls_response(
+            *((f"call_{index}", "nap", json.dumps({"label": str(index)})) for index in range(3))
+        )
+        results = orchestrator.call_function(response)
+
+    # the calls run one after another for longer than the timeout, but each one is within it
+    assert results == {"call_0": "0", "call_1": "1", "call_2": "2"}
+    assert ran == ["0", "1", "2"]
+
+
+def test_concurrent_timeout_cancels_calls_queued_behind_a_hung_tool(tool_calls_response):
+    release = threading.Event()
+    ran = []
+
+    def hang():
+        # never returns within the test, unless the wait is unbounded
+        release.wait(5)
+
+    def fast():
+        ran.append("fast")
+        return "fast"
+
+    orchestrator = FunctionsOrchestrator(functions=[hang, fast], concurrent=True, max_workers=1, timeout=0.1)
+    response = tool_calls_response(("call_1", "hang", "{}"), ("call_2", "fast", "{}"))
+    started = time.monotonic()
+    results = orchestrator.call_function(response)
+    elapsed = time.monotonic() - started
+    release.set()
+    orchestrator.shutdown()
+
+    assert elapsed < 1
+    assert isinstance(results["call_1"], futures.TimeoutError)
+    assert isinstance(results["call_2"], futures.TimeoutError)
+    # the call queued behind the hung tool was cancelled before it started
+    assert ran == []
+
+
+def test_acall_function_awaits_coroutines_and_offloads_sync_tools(tool_calls_response):
+    async def fetch(value: int) -> int:
+        await asyncio.sleep(0)
+        return value * 2
+
+    def blocking() -> str:
+        return threading.current_thread().name
+
+    with FunctionsOrchestrator(functions=[fetch, blocking]) as orchestrator:
+        assert orchestrator._functions["fetch"].is_coroutine
+        assert not orchestrator._functions["blocking"].is_coroutine
+
+        response = tool_calls_response(
+            ("call_1", "fetch", '{"value": 21}'), ("call_2", "blocking", "{}")
+        )
+        results = asyncio.run(orchestrator.acall_function(response))
+
+    assert results["call_1"] == 42
+    assert results["call_2"] != threading.current_thread().name
+
+
+def test_acall_function_bounds_concurrency(tool_calls_response):
+    running = 0
+    peak = 0
+
+    async def tracked() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    orchestrator = FunctionsOrchestrator(functions=[tracked])
+    response = tool_calls_response(*[(f"call_{i}", "tracked", "{}") for i in range(6)])
+    results = asyncio.run(orchestrator.acall_function(response, max_concurrency=2))
+
+    assert len(results) == 6
+    assert peak == 2
+
+
+def test_acall_function_timeout_keeps_other_results(tool_calls_response):
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def fast():
+        return "fast"
+
+    orchestrator = FunctionsOrchestrator(functions=[slow, fast], timeout=0.05)
+    response = tool_calls_response(("call_1", "slow", "{}"), ("call_2", "fast", "{}"))
+    results = asyncio.run(orchestrator.acall_function(response))
+
+    assert isinstance(results["call_1"], futures.TimeoutError)
+    assert results["call_2"] == "fast"
+
+
+def test_call_function_rejects_coroutine_functions(weather_chat_response):
+    async def get_current_weather(location: str) -> str:
+        return location
+
+    orchestrator = FunctionsOrchestrator(functions=[get_current_weather])
+    with pytest.raises(TypeError):
+        orchestrator.call_function(weather_chat_response)
+
+
+def test_tools_payload_is_precomputed_per_registry_version(
+    weather_function, expected_metadata
+):
+    orchestrator = FunctionsOrchestrator(functions=[weather_function])
+    version = orchestrator.registry_version
+
+    payload = orchestrator.tools_payload
+    assert payload == [{"type": "function", "function": expected_metadata}]
+    assert orchestrator.tools_payload is payload
+    assert json.loads(orchestrator.tools_payload_json) == payload
+    assert orchestrator.create_tools_descriptions() == payload
+    with pytest.raises(TypeError):
+        payload.append({})
+
+    def say_hello():
+        return "Hello, world!"
+
+    orchestrator.register(say_hello)
+
+    assert orchestrator.registry_version != version
+    assert orchestrator.tools_payload is not payload
+    assert orchestrator.tools_payload[0] is payload[0]
+    assert [tool["function"]["name"] for tool in orchestrator.tools_payload] == [
+        "get_current_weather",
+        "say_hello",
+    ]
+
+
+def test_tool_descriptions_are_rebuilt_when_parameters_are_replaced(weather_function):
+    orchestrator = FunctionsOrchestrator(functions=[weather_function])
+    orchestrator.define_tool_set("weather", ["get_current_weather"])
+    spec = orchestrator.functions["get_current_weather"]
+    orchestrator.create_tools_descriptions(compact=True)
+    orchestrator.create_tools_descriptions(tool_set="weather")
+    version = orchestrator.registry_version
+
+    spec.parameters = dict(spec.parameters, description="Weather, replaced.")
+
+    assert orchestrator.registry_version != version
+    for tools in (
+        orchestrator.create_tools_descriptions(),
+        orchestrator.create_tools_descriptions(compact=True),
+        orchestrator.create_tools_descriptions(tool_set="weather"),
+        orchestrator.tools_payload,
+    ):
+        assert tools[0]["function"]["description"] == "Weather, replaced."
+
+
+def test_selected_functions_are_looked_up_by_name(weather_function):
+    def say_hello():
+        return "Hello, world!"
+
+    orchestrator = FunctionsOrchestrator(functions=[weather_function, say_hello])
+
+    descriptions = orchestrator.create_tools_descriptions(
+        ["say_hello", "unregistered_function", "say_hello"]
+    )
+    assert [tool["function"]["name"] for tool in descriptions] == ["say_hello"]
+    assert orchestrator.create_function_descriptions(["get_current_weather"]) == [
+        orchestrator._functions["get_current_weather"].parameters
+    ]
+
+
+def test_tool_sets(weather_function):
+    def say_hello():
+        return "Hello, world!"
+
+    orchestrator = FunctionsOrchestrator(functions=[weather_function, say_hello])
+    orchestrator.define_tool_set("greeting", ["say_hello"])
+
+    assert orchestrator.tool_sets == {"greeting": ("say_hello",)}
+    assert orchestrator.create_tools_descriptions(
+        tool_set="greeting"
+    ) == orchestrator.create_tools_descriptions(["say_hello"])
+    assert orchestrator.create_function_descriptions(tool_set="greeting") == [
+        orchestrator._functions["say_hello"].parameters
+    ]
+
+    with pytest.raises(ValueError):
+        orchestrator.define_tool_set("broken", ["unregistered_function"])
+    with pytest.raises(ValueError):
+        orchestrator.create_tools_descriptions(tool_set="undefined")
+
+
+def test_invalid_arguments_are_rejected_before_the_call():
+    calls = []
+
+    def record(count: int):
+        calls.append(count)
+
+    orchestrator = FunctionsOrchestrator(functions=[record])
+    mock_response = MagicMock()
+    mock_response.choices[0].message.function_call.name = "record"
+
+    for arguments in ['{"count": "many"}', "{}", "not json"]:
+        mock_response.choices[0].message.function_call.arguments = arguments
+        with pytest.raises(InvalidArgumentsError):
+            orchestrator.call_function(mock_response)
+
+    assert calls == []
+
+
+def test_arguments_without_annotation_are_not_type_checked():
+    def add(a, b):
+        return a + b
+
+    orchestrator = FunctionsOrchestrator(functions=[add])
+    mock_response = MagicMock()
+    mock_response.choices[0].message.function_call.name = "add"
+    mock_response.choices[0].message.function_call.arguments = '{"a": 1, "b": 2}'
+
+    assert orchestrator.call_function(mock_response) == 3
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+@dataclasses.dataclass
+class Address:
+    street: str
+    city: str
+
+
+def test_typed_arguments_are_rebuilt_before_the_call():
+    def ship(address: Address, stops: list = None) -> str:
+        return f"{address.street}, {address.city}"
+
+    def paint(color: Color = Color.RED) -> str:
+        return color.name
+
+    orchestrator = FunctionsOrchestrator(functions=[ship, paint])
+    mock_response = MagicMock()
+    for name, arguments, result in [
+        ("ship", '{"address": {"street": "Main St", "city": "Boston"}}', "Main St, Boston"),
+        ("paint", "{}", "RED"),
+        ("paint", '{"color": "green"}', "GREEN"),
+    ]:
+        mock_response.choices[0].message.function_call.name = name
+        mock_response.choices[0].message.function_call.arguments = arguments
+        assert orchestrator.call_function(mock_response) == result
+
+    mock_response.choices[0].message.function_call.name = "ship"
+    mock_response.choices[0].message.function_call.arguments = '{"address": {"street": "Main St"}}'
+    with pytest.raises(InvalidArgumentsError):
+        orchestrator.call_function(mock_response)
+
+
+def test_custom_json_decoder(weather_chat_response, weather_function):
+    decoded = []
+
+    def json_loads(arguments):
+        decoded.append(arguments)
+        return json.loads(arguments)
+
+    orchestrator = FunctionsOrchestrator(functions=[weather_function], json_loads=json_loads)
+    orchestrator.call_function(weather_chat_response)
+
+    assert decoded == ['{\n  "location": "Boston"\n}']
+
+
+def test_result_cache(tool_calls_response):
+    calls = []
+
+    def lookup(location: str, unit: str = "celsius") -> str:
+        calls.append(location)
+        return f"{location} in {unit}"
+
+    orchestrator = FunctionsOrchestrator(functions=[lookup])
+    orchestrator.cache_results("lookup", ttl=60)
+    response = tool_calls_response(
+        ("call_1", "lookup", '{"location": "Boston"}'),
+        ("call_2", "lookup", '{"unit": "celsius", "location": "Boston"}'),
+        ("call_3", "lookup", '{"location": "Tokyo"}'),
+    )
+
+    results = orchestrator.call_function(response)
+
+    assert results["call_1"] == results["call_2"] == "Boston in celsius"
+    assert calls == ["Boston", "Tokyo"]
+    assert orchestrator.result_cache_stats == {"lookup": {"hits": 1, "misses": 2}}
+
+    asyncio.run(orchestrator.acall_function(response))
+    assert calls == ["Boston", "Tokyo"]
+
+    with pytest.raises(ValueError):
+        orchestrator.cache_results("unregistered_function")
+
+
+def test_lazy_registration(weather_function, weather_chat_response, expected_metadata):
+    orchestrator = FunctionsOrchestrator(functions=[weather_function], lazy=True)
+    spec = orchestrator._functions["get_current_weather"]
+
+    assert not spec.is_loaded
+    assert orchestrator.call_function(weather_chat_response).startswith('{"location": "Boston"')
+    assert spec.is_loaded
+    assert orchestrator.function_descriptions == [expected_metadata]
+
+
+def test_warm_in_background(weather_function, duck_class_ref):
+    with FunctionsOrchestrator(lazy=True) as orchestrator:
+        orchestrator.register(weather_function)
+        orchestrator.register_instance(duck_class_ref())
+        assert not any(spec.is_loaded for spec in orchestrator.function_specs)
+
+        orchestrator.warm(background=True).result(timeout=5)
+
+        assert all(spec.is_loaded for spec in orchestrator.function_specs)
+        assert all(spec.argument_validator for spec in orchestrator.function_specs)
+
+
+def test_function_specs_are_slotted(weather_function):
+    orchestrator = FunctionsOrchestrator(functions=[weather_function])
+
+    assert not hasattr(orchestrator._functions["get_current_weather"], "__dict__")
@@ -0,0 +1,37 @@
+import time
+
+from openai_functools import InMemoryResultCacheBackend, ResultCache
+
+
+def test_lru_eviction():
+    backend = InMemoryResultCacheBackend(maxsize=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    assert len(backend) == 2
+
+
+def test_ttl_expiry():
+    cache = ResultCache("get_current_weather", ttl=0.01)
+    key = cache.make_key({"location": "Boston"})
+    cache.store(key, "sunny")
+
+    assert cache.lookup(key) == (True, "sunny")
+    time.sleep(0.02)
+    assert cache.lookup(key) == (False, None)
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_keys_are_canonical():
+    cache = ResultCache("get_current_weather")
+
+    assert cache.make_key({"location": "Boston", "unit": "celsius"}) == cache.make_key(
+        {"unit": "celsius", "location": "Boston"}
+    )
+    assert cache.make_key({"location": "Boston"}) != ResultCache("other").make_key(
+        {"location": "Boston"}
+    )
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from openai_functools import FunctionsOrchestrator
+from openai_functools.result_processing import consume, summarize, truncate
+
+
+def test_truncate_modes():
+    result = "a" * 50 + "b" * 50
+
+    assert truncate(10, mode="head", marker="|")(result) == "a" * 10 + "|"
+    assert truncate(10, mode="tail", marker="|")(result) == "|" + "b" * 10
+    assert truncate(10, marker="|")(result) == "a" * 5 + "|" + "b" * 5
+    assert truncate(10)("short") == "short"
+    assert truncate(10)({"not": "a string"}) == {"not": "a string"}
+    assert "[90 bytes omitted]" in truncate(10)(result)
+    with pytest.raises(ValueError):
+        truncate(10, mode="middle")
+
+
+def test_truncate_does_not_split_characters():
+    assert truncate(5, mode="head", marker="")("ééééé") == "éé"
+
+
+def test_consume_stops_at_the_byte_budget():
+    produced = []
+
+    def lines():
+        for i in range(1000):
+            produced.append(i)
+            yield f"line {i}"
+
+    result = consume(20, separator="\n", marker="|")(lines())
+
+    assert result == "line 0\nline 1\nline 2|"
+    assert len(produced) == 4
+    assert consume(100)(iter(["a", "b"])) == "ab"
+    assert consume(100)(["not", "an", "iterator"]) == ["not", "an", "iterator"]
+
+
+def test_summarize():
+    summarizer = summarize(lambda result: f"{len(result)} characters", threshold_bytes=10)
+
+    assert summarizer("x" * 100) == "100 characters"
+    assert summarizer("short") == "short"
+
+
+def test_orchestrator_applies_processors(tool_calls_response):
+    def generate_logs(count: int):
+        for i in range(count):
+            yield f"log line {i}"
+
+    def echo(text: str) -> str:
+        return text
+
+    orchestrator = FunctionsOrchestrator(
+        functions=[generate_logs, echo], result_processors=[truncate(12, mode="head", marker="|")]
+    )
+    orchestrator.add_result_processor(consume(100, separator="\n"), "generate_logs")
+    response = tool_calls_response(
+        ("call_1", "generate_logs", '{"count": 1000000}'),
+        ("call_2", "echo", '{"text": "short"}'),
+    )
+
+    assert orchestrator.call_function(response) == {"call_1": "log line 0\nl|", "call_2": "short"}
+    assert asyncio.run(orchestrator.acall_function(response)) == {
+        "call_1": "log line 0\nl|",
+        "call_2": "short",
+    }
+    with pytest.raises(ValueError):
+        orchestrator.add_result_processor(truncate(10), "unregistered_function")
@@ -0,0 +1,117 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from openai_functools import (
+    ConversationRunner,
+    FunctionsOrchestrator,
+    MaxIterationsExceededError,
+)
+from openai_functools.utils.conversation import Conversation
+
+
+def answer_response(content):
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = content
+    mock_response.choices[0].message.function_call = None
+    mock_response.choices[0].message.tool_calls = None
+    return mock_response
+
+
+class FakeClient:
+    """Returns the given responses in order and records the requests."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, **request):
+        self.requests.append(json.loads(json.dumps(request)))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def orchestrator(weather_function):
+    def fails():
+        raise RuntimeError("boom")
+
+    with FunctionsOrchestrator(functions=[weather_function, fails]) as orchestrator:
+        yield orchestrator
+
+
+def test_run_until_answer(orchestrator, tool_calls_response):
+    tool_calls = tool_calls_response(
+        ("call_1", "get_current_weather", '{"location": "Boston"}'),
+        ("call_2", "fails", "{}"),
+    )
+    tool_calls.choices[0].message.content = None
+    client = FakeClient(tool_calls, answer_response("It is sunny in Boston."))
+    conversation = Conversation()
+    conversation.add_message("user", "What's the weather like in Boston?")
+
+    response = ConversationRunner(orchestrator, client, model="gpt-4", temperature=0).run(
+        conversation
+    )
+
+    assert response.choices[0].message.content == "It is sunny in Boston."
+    assert len(client.requests) == 2
+    assert client.requests[0]["temperature"] == 0
+    assert len(client.requests[0]["tools"]) == 2
+    history = conversation.conversation_history
+    assert [message["role"] for message in history] == [
+        "user",
+        "assistant",
+        "tool",
+        "tool",
+        "assistant",
+    ]
+    assert history[1]["tool_calls"][0]["function"]["name"] == "get_current_weather"
+    assert history[2]["tool_call_id"] == "call_1"
+    assert '"Boston"' in history[2]["content"]
+    assert history[3]["content"] == "Error: RuntimeError: boom"
+    assert client.requests[1]["messages"] == history[:-1]
+
+
+def test_run_stops_after_max_iterations(orchestrator, tool_calls_response):
+    tool_calls = tool_calls_response(("call_1", "get_current_weather", '{"location": "Boston"}'))
+    tool_calls.choices[0].message.content = None
+    client = FakeClient(tool_calls, tool_calls)
+
+    with pytest.raises(MaxIterationsExceededError):
+        ConversationRunner(orchestrator, client, model="gpt-4", max_iterations=2).run(
+            Conversation()
+        )
+
+
+def test_arun(orchestrator, tool_calls_response):
+    tool_calls = tool_calls_response(("call_1", "get_current_weather", '{"location": "Boston"}'))
+    tool_calls.choices[0].message.content = None
+    responses = [tool_calls, answer_response("Sunny.")]
+
+    async def create(**request):
+        return responses.pop(0)
+
+    conversation = Conversation()
+    response = asyncio.run(ConversationRunner(orchestrator, create, model="gpt-4").arun(conversation))
+
+    assert response.choices[0].message.content == "Sunny."
+    assert [message.role for message in conversation.messages] == ["assistant", "tool", "assistant"]
+
+
+def test_run_offers_the_tools_relevant_to_the_user_message(weather_function):
+    def book_flight(origin: str, destination: str):
+        """Book a flight between two airports."""
+
+    client = FakeClient(answer_response("Booked."), answer_response("Hello!"))
+    with FunctionsOrchestrator(functions=[weather_function, book_flight]) as orchestrator:
+        runner = ConversationRunner(orchestrator, client, model="gpt-4", top_k_tools=1)
+        conversation = Conversation()
+        conversation.add_message("user", "Book a flight from Boston to Tokyo")
+        runner.run(conversation)
+        conversation.add_message("user", "Hi")
+        runner.run(conversation)
+
+    assert [tool["function"]["name"] for tool in client.requests[0]["tools"]] == ["book_flight"]
+    assert "tools" not in client.requests[1]
@@ -0,0 +1,115 @@
+import dataclasses
+from unittest.mock import patch
+
+from openai_functools import (
+    FunctionsOrchestrator,
+    SchemaCache,
+    extract_openai_function_metadata,
+    invalidate_metadata_cache,
+)
+from openai_functools import metadata_generator
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get current weather."""
+    return location
+
+
+def build_orchestrator(schema_cache):
+    invalidate_metadata_cache()
+    return FunctionsOrchestrator(
+        functions=[get_current_weather], schema_cache=schema_cache
+    )
+
+
+def test_metadata_is_loaded_from_the_cache_file(tmp_path):
+    path = str(tmp_path / "schemas.json")
+    schema_cache = SchemaCache(path, autosave=False)
+    expected = build_orchestrator(schema_cache).function_descriptions
+    schema_cache.save()
+
+    reloaded_cache = SchemaCache(path, autosave=False)
+    assert len(reloaded_cache) == 1
+    with patch.object(
+        metadata_generator, "_build_metadata", side_effect=AssertionError
+    ):
+        assert build_orchestrator(reloaded_cache).function_descriptions == expected
+
+
+def test_stale_entries_are_regenerated(tmp_path):
+    path = str(tmp_path / "schemas.json")
+    schema_cache = SchemaCache(path, autosave=False)
+    build_orchestrator(schema_cache)
+
+    original_doc = get_current_weather.__doc__
+    get_current_weather.__doc__ = "Get the weather, changed."
+    try:
+        assert schema_cache.load(get_current_weather, False) is None
+        invalidate_metadata_cache()
+        metadata = extract_openai_function_metadata(get_current_weather, schema_cache)
+        assert metadata["description"] == "Get the weather, changed."
+    finally:
+        get_current_weather.__doc__ = original_doc
+        invalidate_metadata_cache()
+
+
+def make_address(with_zip_code: bool) -> type:
+    fields = [("street", str)] + ([("zip_code", int)] if with_zip_code else [])
+    return dataclasses.make_dataclass("Address", fields)
+
+
+def ship(address) -> str:
+    """Ship to an address."""
+    return address.street
+
+
+def test_entries_are_regenerated_when_referenced_types_change(tmp_path):
+    schema_cache = SchemaCache(str(tmp_path / "schemas.json"), autosave=False)
+    ship.__annotations__["address"] = make_address(False)
+    try:
+        invalidate_metadata_cache()
+        extract_openai_function_metadata(ship, schema_cache)
+
+        # the changed class has the same name and repr, only its schema differs
+        ship.__annotations__["address"] = make_address(True)
+        assert schema_cache.load(ship, False) is None
+        invalidate_metadata_cache()
+        metadata = extract_openai_function_metadata(ship, schema_cache)
+        assert "zip_code" in metadata["parameters"]["properties"]["address"]["properties"]
+    finally:
+        invalidate_metadata_cache()
+
+
+def test_entries_are_regenerated_when_types_referenced_by_fields_change(tmp_path):
+    schema_cache = SchemaCache(str(tmp_path / "schemas.json"), autosave=False)
+    ship.__annotations__["address"] = dataclasses.make_dataclass("Order", [("address", make_address(False))])
+    try:
+        invalidate_metadata_cache()
+        extract_openai_function_metadata(ship, schema_cache)
+
+        # only the class of a field of the annotated class changed
+        ship.__annotations__["address"] = dataclasses.make_dataclass("Order", [("address", make_address(True))])
+        assert schema_cache.load(ship, False) is None
+    finally:
+        ship.__annotations__.pop("address")
+        invalidate_metadata_cache()
+
+
+def test_argument_validators_are_built_on_first_call(tmp_path):
+    orchestrator = build_orchestrator(SchemaCache(str(tmp_path / "schemas.json"), autosave=False))
+    spec = orchestrator.functions["get_current_weather"]
+
+    assert spec.argument_validator is None
+    assert spec.validate_arguments({"location": "Boston"}) == {"location": "Boston", "unit": "fahrenheit"}
+    assert spec.argument_validator is not None
+
+
+def test_schema_cache_from_environment(tmp_path, monkeypatch):
+    path = str(tmp_path / "schemas.json")
+    monkeypatch.setenv("OPENAI_FUNCTOOLS_SCHEMA_CACHE", path)
+
+    orchestrator = build_orchestrator(None)
+
+    assert orchestrator.schema_cache is SchemaCache.open(path)
+    orchestrator.warm()
+    assert len(SchemaCache(path, autosave=False)) == 1
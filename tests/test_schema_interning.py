@@ -0,0 +1,120 @@
+import dataclasses
+import json
+from typing import List, Optional
+from unittest.mock import patch
+
+from openai_functools import FunctionsOrchestrator, SchemaCache, invalidate_metadata_cache, metadata_generator
+from openai_functools.openai_types import clear_type_schema_cache
+from openai_functools.schema_interning import SchemaInterner
+
+
+@dataclasses.dataclass
+class Address:
+    street: str
+    city: str
+    zip_code: Optional[str] = None
+
+
+@dataclasses.dataclass
+class TimeRange:
+    start: int
+    end: int
+
+
+def ship(origin: Address, destination: Address, stops: List[Address], window: TimeRange):
+    pass
+
+
+def deliver(address: Address, fallback: Address):
+    pass
+
+
+def add(a: int, b: int):
+    pass
+
+
+def test_repeated_sub_schemas_are_referenced():
+    orchestrator = FunctionsOrchestrator(functions=[ship, add], shared_definitions=True)
+
+    ship_parameters, add_parameters = (
+        tool["function"]["parameters"] for tool in orchestrator.tools_payload
+    )
+
+    assert ship_parameters["properties"]["origin"] == {
+        "$ref": "#/$defs/Address",
+        "description": "origin",
+    }
+    assert ship_parameters["properties"]["stops"]["items"] == {"$ref": "#/$defs/Address"}
+    assert ship_parameters["$defs"]["Address"]["required"] == ["street", "city"]
+    # sub-schemas that occur once, or are too small to pay for a definition, stay inline
+    assert ship_parameters["properties"]["window"]["properties"]["start"] == {"type": "integer"}
+    assert "$defs" not in add_parameters
+    # arguments are still validated against the inline schemas
+    assert orchestrator._functions["ship"].parameters["parameters"]["properties"]["origin"]["type"] == (
+        "object"
+    )
+
+
+def test_definitions_are_shared_between_tools():
+    orchestrator = FunctionsOrchestrator(functions=[ship, deliver], shared_definitions=True)
+
+    ship_tool, deliver_tool = orchestrator.tools_payload
+
+    assert (
+        ship_tool["function"]["parameters"]["$defs"]["Address"]
+        is deliver_tool["function"]["parameters"]["$defs"]["Address"]
+    )
+
+
+def test_shared_definitions_report():
+    orchestrator = FunctionsOrchestrator(functions=[ship, deliver, add])
+
+    report = orchestrator.shared_definitions_report()
+
+    assert report["original_bytes"] == len(orchestrator.tools_payload_json)
+    assert report["saved_bytes"] == report["original_bytes"] - report["deduplicated_bytes"] > 0
+    assert report["references"] == {"Address": 5}
+
+    deduplicated = FunctionsOrchestrator(functions=[ship, deliver, add], shared_definitions=True)
+    assert len(deduplicated.tools_payload_json) == report["deduplicated_bytes"]
+
+
+def test_nested_repetitions_are_only_hoisted_when_referenced_repeatedly():
+    interner = SchemaInterner()
+    inner = {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in ("name", "value", "unit", "source")},
+    }
+    outer = {"type": "object", "properties": {"first": inner, "second": inner}}
+
+    parameters = interner.deduplicate(
+        {"type": "object", "properties": {"a": outer, "b": outer}, "required": []}
+    )
+
+    definitions = parameters["$defs"]
+    assert len(definitions) == 2
+    assert json.dumps(parameters).count("#/$defs/") == 4
+    assert interner.deduplicate({"type": "object", "properties": {}}) == {
+        "type": "object",
+        "properties": {},
+    }
+
+
+def test_definition_names_are_the_same_when_loaded_from_the_schema_cache(tmp_path):
+    path = str(tmp_path / "schemas.json")
+    invalidate_metadata_cache()
+    cold_cache = SchemaCache(path, autosave=False)
+    cold = FunctionsOrchestrator(functions=[ship], schema_cache=cold_cache, shared_definitions=True)
+    cold_payload = cold.tools_payload_json
+    cold_cache.save()
+
+    # a new process, which loads the metadata instead of generating the schemas of the classes
+    invalidate_metadata_cache()
+    clear_type_schema_cache()
+    with patch.object(metadata_generator, "_build_metadata", side_effect=AssertionError):
+        warm = FunctionsOrchestrator(
+            functions=[ship], schema_cache=SchemaCache(path, autosave=False), shared_definitions=True
+        )
+        assert warm.tools_payload_json == cold_payload
+    assert "Address" in warm.tools_payload[0]["function"]["parameters"]["$defs"]
+    invalidate_metadata_cache()
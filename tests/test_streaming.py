@@ -0,0 +1,103 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from openai_functools import (
+    ConversationRunner,
+    FunctionsOrchestrator,
+    ToolCallStreamAccumulator,
+)
+from openai_functools.utils.conversation import Conversation
+
+
+def chunk(content=None, tool_calls=None, finish_reason=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)]
+    )
+
+
+def tool_call_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments)
+    )
+
+
+def stream_tool_calls(*tool_calls):
+    """Streams (id, name, arguments) tool calls in small argument fragments."""
+    for index, (tool_call_id, name, arguments) in enumerate(tool_calls):
+        yield chunk(tool_calls=[tool_call_delta(index, tool_call_id, name, "")])
+        for start in range(0, len(arguments), 4):
+            yield chunk(
+                tool_calls=[tool_call_delta(index, arguments=arguments[start : start + 4])]
+            )
+    yield chunk(finish_reason="tool_calls")
+
+
+@pytest.fixture
+def orchestrator():
+    dispatched = threading.Event()
+
+    def get_current_weather(location: str) -> str:
+        dispatched.set()
+        return f"sunny in {location}"
+
+    with FunctionsOrchestrator(functions=[get_current_weather]) as orchestrator:
+        orchestrator.dispatched = dispatched
+        yield orchestrator
+
+
+def test_tool_call_is_dispatched_as_soon_as_its_arguments_are_complete(orchestrator):
+    accumulator = ToolCallStreamAccumulator(orchestrator)
+    stream = stream_tool_calls(
+        ("call_1", "get_current_weather", '{"location": "Boston"}'),
+        ("call_2", "get_current_weather", '{"location": "Tokyo"}'),
+    )
+
+    for stream_chunk in stream:
+        accumulator.add_chunk(stream_chunk)
+        if accumulator._tool_calls[0].arguments == '{"location": "Boston"}':
+            break
+    assert orchestrator.dispatched.wait(5)
+    assert 1 not in accumulator._tool_calls
+
+    for stream_chunk in stream:
+        accumulator.add_chunk(stream_chunk)
+
+    assert accumulator.finish_reason == "tool_calls"
+    assert accumulator.tool_calls[1] == {
+        "id": "call_2",
+        "type": "function",
+        "function": {"name": "get_current_weather", "arguments": '{"location": "Tokyo"}'},
+    }
+    assert accumulator.results() == {
+        "call_1": "sunny in Boston",
+        "call_2": "sunny in Tokyo",
+    }
+
+
+def test_streaming_runner(orchestrator):
+    streams = [
+        stream_tool_calls(("call_1", "get_current_weather", '{"location": "Boston"}')),
+        iter([chunk(content="It is "), chunk(content="sunny."), chunk(finish_reason="stop")]),
+    ]
+
+    def create(**request):
+        assert request["stream"] is True
+        return streams.pop(0)
+
+    conversation = Conversation()
+    conversation.add_message("user", "What's the weather like in Boston?")
+    final = ConversationRunner(orchestrator, create, model="gpt-4", stream=True).run(
+        conversation
+    )
+
+    assert final.content == "It is sunny."
+    assert [message["role"] for message in conversation.conversation_history] == [
+        "user",
+        "assistant",
+        "tool",
+        "assistant",
+    ]
+    assert conversation.conversation_history[2]["content"] == "sunny in Boston"
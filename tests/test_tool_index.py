@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from openai_functools import FunctionsOrchestrator
+from openai_functools.tool_index import ToolIndex, tokenize
+
+
+def get_current_weather(location: str):
+    """
+    Get the current weather in a location.
+
+    :param location: The city and state, e.g. San Francisco, CA.
+    """
+
+
+def book_flight(origin: str, destination: str):
+    """Book a flight between two airports."""
+
+
+def cancel_flight(booking_id: str):
+    """Cancel a booked flight."""
+
+
+def convert_currency(amount: float, currency: str):
+    """Convert an amount of money to another currency."""
+
+
+def test_tokenize():
+    assert tokenize("getCurrent_weather") == ["get", "current", "weather"]
+    assert tokenize("What are the HTTPServer replies?") == ["http", "server", "reply"]
+    assert tokenize("Cancel 2 flights") == ["cancel", "2", "flight"]
+
+
+def test_search_ranks_relevant_tools():
+    orchestrator = FunctionsOrchestrator(
+        functions=[get_current_weather, book_flight, cancel_flight, convert_currency]
+    )
+
+    assert orchestrator.select_tools("Is it raining in Boston? What's the weather?", top_k=2) == [
+        "get_current_weather"
+    ]
+    assert orchestrator.select_tools("Please cancel my flight", top_k=2) == [
+        "cancel_flight",
+        "book_flight",
+    ]
+    assert orchestrator.select_tools("How many euros is 100 dollars in another currency?") == [
+        "convert_currency"
+    ]
+    assert orchestrator.select_tools("Tell me a joke") == []
+
+
+def test_index_is_rebuilt_when_functions_are_registered():
+    orchestrator = FunctionsOrchestrator(functions=[get_current_weather])
+    index = orchestrator.tool_index
+
+    assert orchestrator.tool_index is index
+    orchestrator.register(book_flight)
+    assert orchestrator.tool_index is not index
+    assert orchestrator.select_tools("flight") == ["book_flight"]
+
+
+def test_search_is_fast_for_large_registries():
+    documents = {
+        f"tool_{number}": f"Manage resource {number} of service {number % 50} in region {number % 7}"
+        for number in range(2000)
+    }
+    index = ToolIndex(documents, use_numpy=False)
+
+    started_at = time.perf_counter()
+    results = index.search("restart service 12 in region 3", top_k=5)
+    elapsed = time.perf_counter() - started_at
+
+    assert len(results) == 5
+    assert elapsed < 0.05
+
+
+def test_numpy_scoring_matches_python_scoring():
+    pytest.importorskip("numpy")
+    documents = {
+        f"tool_{number}": f"Manage resource {number} of service {number % 50} in region {number % 7}"
+        for number in range(500)
+    }
+    query = "restart service 12 in region 3"
+
+    python_results = ToolIndex(documents, use_numpy=False).search(query, top_k=5)
+    numpy_results = ToolIndex(documents, use_numpy=True).search(query, top_k=5)
+
+    assert [name for name, _ in numpy_results] == [name for name, _ in python_results]
+    assert [score for _, score in numpy_results] == pytest.approx(
+        [score for _, score in python_results]
+    )